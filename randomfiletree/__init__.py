@@ -1,7 +1,36 @@
+from pathlib import Path
+
+with (Path(__file__).parent / "version.txt").open() as vf:
+    __version__ = vf.read().strip()
+
 from randomfiletree.core import (  # noqa F401
     iterative_tree,
     iterative_gaussian_tree,
     choose_random_elements,
     sample_random_elements,
     random_string,
+    ScanCache,
 )
+from randomfiletree.manifest import Manifest  # noqa F401
+from randomfiletree.remove import remove_tree  # noqa F401
+from randomfiletree.churn import churn  # noqa F401
+from randomfiletree.cache import TreeCache  # noqa F401
+from randomfiletree.weighted import (  # noqa F401
+    WeightedSelector,
+    choose_weighted_elements,
+    sample_weighted_elements,
+)
+from randomfiletree.bulk import bulk_sample_elements  # noqa F401
+from randomfiletree.stats import TreeStats  # noqa F401
+from randomfiletree.spec import (  # noqa F401
+    TreeSpec,
+    iterative_distribution_tree,
+)
+from randomfiletree.striped import striped_tree  # noqa F401
+from randomfiletree.flat import flat_tree  # noqa F401
+from randomfiletree.read import read_workload  # noqa F401
+from randomfiletree.metadata import Metadata  # noqa F401
+from randomfiletree.verify import verify  # noqa F401
+from randomfiletree.content import ContentPayload  # noqa F401
+from randomfiletree.profile import TreeProfile, clone_tree  # noqa F401
+from randomfiletree.links import Links  # noqa F401
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+from typing import Any, List, Optional, Tuple, Union
+import random
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import _scan_tree_strings
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+# Up to this number of random keys, samples without replacement are drawn
+# for all rows at once.
+_MAX_VECTORIZED_KEYS = 2**24
+
+
+class BulkSample:
+    """
+    Result of :func:`bulk_sample_elements`: Many independent samples of
+    directories and files of the same tree.
+
+    Path objects are only built for the samples that are accessed.
+
+    Attributes:
+        all_dirs: All directories of the tree (as strings)
+        all_files: All files of the tree (as strings)
+        dir_indices: ``n_samples x n_dirs`` indices into ``all_dirs``
+            (NumPy array if NumPy is available, else list of lists)
+        file_indices: ``n_samples x n_files`` indices into ``all_files``
+    """
+
+    def __init__(
+        self,
+        all_dirs: List[str],
+        all_files: List[str],
+        dir_indices: Any,
+        file_indices: Any,
+    ):
+        self.all_dirs = all_dirs
+        self.all_files = all_files
+        self.dir_indices = dir_indices
+        self.file_indices = file_indices
+
+    def __len__(self) -> int:
+        return len(self.dir_indices)
+
+    def __getitem__(self, i: int) -> Tuple[List[Path], List[Path]]:
+        return self.dirs(i), self.files(i)
+
+    def dirs(self, i: int) -> List[Path]:
+        """Directories of the ``i``-th sample."""
+        return [Path(self.all_dirs[j]) for j in self.dir_indices[i]]
+
+    def files(self, i: int) -> List[Path]:
+        """Files of the ``i``-th sample."""
+        return [Path(self.all_files[j]) for j in self.file_indices[i]]
+
+
+def _n_selected(
+    n: int, available: int, replace: bool, what: str, onfail: str
+) -> int:
+    """Number of elements to pick per sample."""
+    if onfail not in ("raise", "ignore"):
+        raise ValueError("Unknown value for 'onfail' parameter.")
+    if not n:
+        return 0
+    if replace and not available or not replace and available < n:
+        if onfail == "raise":
+            raise ValueError(f"Not enough {what} to select from.")
+        return 0 if replace else available
+    return n
+
+
+def _numpy_indices(
+    rng: Any, n_samples: int, n_available: int, k: int, replace: bool
+) -> Any:
+    if replace or not k:
+        return rng.integers(0, max(n_available, 1), size=(n_samples, k))
+    if n_samples * n_available <= _MAX_VECTORIZED_KEYS:
+        keys = rng.random((n_samples, n_available))
+        if k == n_available:
+            return keys.argsort(axis=1)
+        return keys.argpartition(k - 1, axis=1)[:, :k]
+    return numpy.stack(
+        [rng.choice(n_available, k, replace=False) for _ in range(n_samples)]
+    )
+
+
+def _python_indices(
+    n_samples: int, n_available: int, k: int, replace: bool
+) -> List[List[int]]:
+    population = range(n_available)
+    if replace:
+        return [random.choices(population, k=k) for _ in range(n_samples)]
+    return [random.sample(population, k) for _ in range(n_samples)]
+
+
+def bulk_sample_elements(
+    basedir: Union[str, PurePath],
+    n_samples: int,
+    n_dirs: int,
+    n_files: int,
+    replace: bool = False,
+    onfail: str = "raise",
+    use_numpy: Optional[bool] = None,
+) -> BulkSample:
+    """
+    Draw many independent samples of random directories and files at once,
+    e.g. one per simulated client. The tree is only scanned once and all
+    samples are drawn as index arrays with NumPy (if available).
+
+    Args:
+        basedir: Directory to scan
+        n_samples: Number of samples
+        n_dirs: Number of directories per sample
+        n_files: Number of files per sample
+        replace: If False, the elements within each sample are distinct (as
+            with :func:`randomfiletree.core.sample_random_elements`),
+            otherwise they are drawn with replacement (as with
+            :func:`randomfiletree.core.choose_random_elements`)
+        onfail: What to do if there are not enough files or folders to pick
+            from? Either 'raise' (raise ValueError) or 'ignore' (samples with
+            fewer elements)
+        use_numpy: Use NumPy to draw the samples. Default: If installed. The
+            random generator of NumPy is seeded from :mod:`random`, so that
+            results are reproducible with :func:`random.seed`.
+
+    Returns:
+        :class:`BulkSample`
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy and numpy is None:
+        raise ImportError("NumPy is required for 'use_numpy=True'.")
+    all_dirs, all_files = _scan_tree_strings(basedir)
+    k_dirs = _n_selected(n_dirs, len(all_dirs), replace, "subfolders", onfail)
+    k_files = _n_selected(n_files, len(all_files), replace, "files", onfail)
+    if use_numpy:
+        rng = numpy.random.default_rng(random.getrandbits(64))
+        dir_indices = _numpy_indices(
+            rng, n_samples, len(all_dirs), k_dirs, replace
+        )
+        file_indices = _numpy_indices(
+            rng, n_samples, len(all_files), k_files, replace
+        )
+    else:
+        dir_indices = _python_indices(n_samples, len(all_dirs), k_dirs, replace)
+        file_indices = _python_indices(
+            n_samples, len(all_files), k_files, replace
+        )
+    return BulkSample(all_dirs, all_files, dir_indices, file_indices)
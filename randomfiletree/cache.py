@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+
+from typing import Any, Counter, Dict, List, Optional, Tuple, Union
+import collections
+import errno
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+import uuid
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree import __version__
+from randomfiletree.core import iterative_gaussian_tree
+from randomfiletree.distributions import DEFAULT_BACKEND
+from randomfiletree.durability import Syncer
+from randomfiletree.manifest import Manifest
+from randomfiletree.remove import remove_tree
+from randomfiletree.stats import TreeStats
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover (Windows)
+    fcntl = None  # type: ignore
+
+#: ioctl request to share the data blocks of a file with another one (Linux)
+FICLONE = 0x40049409
+
+#: Clone methods, see :meth:`TreeCache.iterative_gaussian_tree`
+CLONE_METHODS = ("reflink", "hardlink", "copy")
+
+# Clone methods that are tried with "auto", in this order. Hardlinks share
+# their content with the cache, so they are only used if asked for.
+_AUTO_METHODS = ("reflink", "copy")
+
+# Errors that mean that a clone method is not available for the given pair of
+# files
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EPERM,
+    errno.EMLINK,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+    getattr(errno, "ENOTSUP", errno.EINVAL),
+}
+
+
+def default_cache_dir() -> Path:
+    """``$XDG_CACHE_HOME/randomfiletree`` (or ``~/.cache/randomfiletree``)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "randomfiletree"
+
+
+def _reflink(source: str, target: str) -> None:
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported", target)
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _hardlink(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        os.unlink(target)
+        os.link(source, target)
+
+
+def _copy(source: str, target: str) -> None:
+    shutil.copyfile(source, target)
+
+
+_CLONE_FUNCTIONS = {
+    "reflink": _reflink,
+    "hardlink": _hardlink,
+    "copy": _copy,
+}
+
+
+def _disk_usage(path: str) -> int:
+    """Bytes allocated by a directory tree."""
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            st = os.lstat(os.path.join(root, name))
+            total += getattr(st, "st_blocks", 0) * 512 or st.st_size
+    return total
+
+
+def _sync_tree(
+    syncer: Syncer, basedir: Path, dirs: List[Path], files: List[Path]
+) -> None:
+    """Flush a cloned tree according to the policy of ``syncer``."""
+    new_files: Dict[str, List[str]] = {str(basedir): []}
+    n_subdirs: Counter[str] = collections.Counter()
+    for d in dirs:
+        new_files.setdefault(str(d), [])
+        n_subdirs[str(d.parent)] += 1
+    for f in files:
+        path = str(f)
+        new_files[os.path.dirname(path)].append(path)
+        syncer.file_created(path, os.path.dirname(path), None)
+    for dir_path, paths in new_files.items():
+        syncer.directory_filled(dir_path, None, paths, n_subdirs[dir_path])
+    syncer.finish([str(basedir)])
+
+
+class TreeCache:
+    """
+    Cache of generated trees, keyed by the generator parameters and the
+    random seed.
+
+    On a cache hit, the tree is materialized by cloning the cached files: By
+    reflink (copy on write clone of the data, Linux only) where the file
+    system supports it, else by copying. Optionally, files are hardlinked
+    instead. Note that hardlinked files share their content with the cache,
+    so they must not be modified in place.
+
+    If the total size of the cache exceeds ``max_size``, the least recently
+    used trees are removed.
+
+    Args:
+        cache_dir: Directory to keep the cached trees in. Default:
+            :func:`default_cache_dir`
+        max_size: Maximal total size of the cache in bytes
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, PurePath]] = None,
+        max_size: int = 1024**3,
+    ):
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.max_size = max_size
+
+    @staticmethod
+    def key(**params: Any) -> str:
+        """
+        Cache key for the given generator parameters. It also depends on the
+        version of randomfiletree and on whether NumPy is used to draw
+        random values, as both can change the tree generated from a seed.
+        """
+        params = dict(params, version=__version__, backend=DEFAULT_BACKEND)
+        encoded = json.dumps(params, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(last use, size, path) of all cached trees."""
+        entries: List[Tuple[float, int, Path]] = []
+        if not self.cache_dir.is_dir():
+            return entries
+        for path in self.cache_dir.iterdir():
+            info = path / "info.json"
+            try:
+                with info.open() as f:
+                    size = json.load(f)["size"]
+                entries.append((info.stat().st_mtime, size, path))
+            except (OSError, ValueError, KeyError):
+                # Incomplete entry, e.g. currently being generated
+                continue
+        return entries
+
+    @property
+    def size(self) -> int:
+        """Total size of all cached trees in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Remove least recently used trees until the cache is not larger than
+        ``max_size``.
+
+        Args:
+            keep: Key of a tree that must not be removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            if path.name == keep:
+                continue
+            # Invalidate entry first, so that it is not used while removing
+            os.unlink(str(path / "info.json"))
+            remove_tree(path)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove all cached trees."""
+        if self.cache_dir.is_dir():
+            remove_tree(self.cache_dir)
+
+    def _generate(self, key: str, seed: Any, params: Dict[str, Any]) -> Path:
+        """Generate tree into the cache and return path of the entry."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f"tmp-{uuid.uuid4().hex}"
+        manifest = Manifest(tmp / "tree")
+        stats = TreeStats()
+        state = random.getstate()
+        random.seed(seed)
+        try:
+            iterative_gaussian_tree(
+                tmp / "tree", manifest=manifest, stats=stats, **params
+            )
+        finally:
+            random.setstate(state)
+        manifest.basedir = Path("tree")
+        manifest.save(tmp / "manifest.jsonl")
+        info = {
+            "size": _disk_usage(str(tmp)),
+            "params": params,
+            "stats": stats.to_dict(),
+        }
+        with (tmp / "info.json").open("w") as f:
+            json.dump(info, f)
+        entry = self.cache_dir / key
+        try:
+            os.rename(str(tmp), str(entry))
+        except OSError:
+            # Generated concurrently by somebody else
+            remove_tree(tmp)
+        return entry
+
+    def _materialize(
+        self, entry: Path, basedir: Path, clone: str
+    ) -> Tuple[List[Path], List[Path]]:
+        cached = Manifest.load(entry / "manifest.jsonl", basedir=basedir)
+        source_dir = str(entry / "tree")
+        dirs = cached.dirs
+        basedir.mkdir(parents=True, exist_ok=True)
+        for d in sorted(dirs, key=lambda d: len(d.parts)):
+            d.mkdir(exist_ok=True)
+        methods = list(_AUTO_METHODS) if clone == "auto" else [clone]
+        files = []
+        for rel, info in cached.entries.items():
+            if info["type"] != "file":
+                continue
+            source = os.path.join(source_dir, rel)
+            target = os.path.join(str(basedir), rel)
+            while True:
+                try:
+                    _CLONE_FUNCTIONS[methods[0]](source, target)
+                    break
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED or len(methods) == 1:
+                        raise
+                    # Don't try this method again for the remaining files
+                    methods.pop(0)
+            files.append(Path(target))
+        return dirs, files
+
+    def iterative_gaussian_tree(
+        self,
+        basedir: Union[str, PurePath],
+        seed: Any,
+        nfiles: int = 2,
+        nfolders: int = 1,
+        repeat: int = 1,
+        maxdepth: Optional[int] = None,
+        sigma_folders: int = 1,
+        sigma_files: int = 1,
+        min_folders: int = 0,
+        min_files: int = 0,
+        clone: str = "auto",
+        manifest: Optional[Manifest] = None,
+        stats: Optional[TreeStats] = None,
+        durability: str = "none",
+    ) -> Tuple[List[Path], List[Path]]:
+        """
+        Like :func:`randomfiletree.core.iterative_gaussian_tree` with random
+        seed ``seed``, but the tree is only generated if it is not in the
+        cache yet. The global random state is not changed. Unlike the
+        uncached function, it can't add to an existing tree, so ``basedir``
+        must not exist or be empty.
+
+        Args:
+            basedir: Directory to create files and folders in
+            seed: Random seed (anything accepted by :func:`random.seed` that
+                can be serialized to JSON)
+            clone: How to create the files from the cached ones: ``"auto"``
+                (try ``"reflink"``, then ``"copy"``), ``"reflink"``,
+                ``"copy"`` or ``"hardlink"`` (the files share their content
+                with the cache and must not be modified)
+            manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+                created directories and files in
+            stats: :class:`~randomfiletree.stats.TreeStats` to add the
+                statistics of the tree to (as recorded when the tree was
+                generated, but with the time needed to clone it)
+            durability: When to flush the cloned entries to disk, see
+                :func:`randomfiletree.core.iterative_tree`
+
+            For the other arguments, see
+            :func:`randomfiletree.core.iterative_gaussian_tree`.
+
+        Returns:
+            (List of dirs, List of files), all as :class:`pathlib.Path`
+            objects.
+        """
+        if clone != "auto" and clone not in CLONE_METHODS:
+            raise ValueError("Unknown value for 'clone' parameter.")
+        if os.path.isdir(str(basedir)) and os.listdir(str(basedir)):
+            raise ValueError(f"'{basedir}' is not empty.")
+        sync_stats = TreeStats()
+        syncer = Syncer(durability, sync_stats)
+        params = dict(
+            nfiles=nfiles,
+            nfolders=nfolders,
+            repeat=repeat,
+            maxdepth=maxdepth,
+            sigma_folders=sigma_folders,
+            sigma_files=sigma_files,
+            min_folders=min_folders,
+            min_files=min_files,
+        )
+        key = self.key(seed=seed, **params)
+        entry = self.cache_dir / key
+        info = entry / "info.json"
+        if info.is_file():
+            # Mark as recently used
+            os.utime(str(info))
+        else:
+            entry = self._generate(key, seed, params)
+            self.evict(keep=key)
+        start = time.perf_counter()
+        dirs, files = self._materialize(entry, Path(basedir), clone)
+        _sync_tree(syncer, Path(basedir), dirs, files)
+        if stats is not None:
+            with info.open() as fh:
+                cached_stats = TreeStats.from_dict(json.load(fh)["stats"])
+            cached_stats.elapsed = time.perf_counter() - start
+            cached_stats.sync_time = sync_stats.sync_time
+            cached_stats.n_syncs = sync_stats.n_syncs
+            stats.merge(cached_stats)
+        if manifest is not None:
+            for d in dirs:
+                manifest.add(d, "dir")
+            manifest.add_files(files)
+        return dirs, files
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+import os
+import random
+import time
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import _scan_tree, random_string
+from randomfiletree.latency import LatencyRecorder
+
+T = TypeVar("T")
+
+# New names are drawn this often if they are taken by directories
+_MAX_DRAWS = 100
+
+#: Default mix of operations (relative weights)
+DEFAULT_MIX = {
+    "create": 1.0,
+    "delete": 1.0,
+    "rename": 1.0,
+    "append": 1.0,
+    "truncate": 1.0,
+}
+
+
+class IndexedList(Generic[T]):
+    """
+    List of unique elements that supports adding, removing and choosing a
+    random element in O(1).
+    """
+
+    def __init__(self, elements: Optional[List[T]] = None):
+        self._elements: List[T] = []
+        self._positions: Dict[T, int] = {}
+        for element in elements or []:
+            self.add(element)
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def __contains__(self, element: object) -> bool:
+        return element in self._positions
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._elements)
+
+    def add(self, element: T) -> None:
+        if element in self._positions:
+            return
+        self._positions[element] = len(self._elements)
+        self._elements.append(element)
+
+    def remove(self, element: T) -> None:
+        # Move the last element into the gap, so that we don't have to shift
+        # all following elements.
+        position = self._positions.pop(element)
+        last = self._elements.pop()
+        if position < len(self._elements):
+            self._elements[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> T:
+        return random.choice(self._elements)
+
+
+class ChurnReport:
+    """
+    Result of :func:`churn`.
+
+    Attributes:
+        latency: :class:`~randomfiletree.latency.LatencyRecorder` with the
+            latency of every operation (measured from the time at which the
+            operation was scheduled, i.e. including time spent waiting for
+            previous operations)
+        elapsed: Total run time in seconds
+        dirs: Directories of the tree after the run
+        files: Files of the tree after the run
+    """
+
+    def __init__(self) -> None:
+        self.latency = LatencyRecorder()
+        self.elapsed = 0.0
+        self.dirs: List[Path] = []
+        self.files: List[Path] = []
+
+    @property
+    def n_ops(self) -> int:
+        """Number of operations that were performed."""
+        return sum(len(v) for v in self.latency.latencies.values())
+
+    @property
+    def ops_per_second(self) -> float:
+        """Achieved rate of operations."""
+        return self.n_ops / self.elapsed if self.elapsed else 0.0
+
+
+class _Churner:
+    """Performs the individual operations and keeps the index of
+    directories and files up to date.
+    """
+
+    def __init__(
+        self,
+        basedir: str,
+        write_size: int,
+        filename: Callable[[], str],
+    ):
+        dirs, files = _scan_tree(basedir)
+        self.dirs = IndexedList([basedir] + [str(d) for d in dirs])
+        self.files = IndexedList([str(f) for f in files])
+        self.data = os.urandom(write_size)
+        self.filename = filename
+
+    def _target(self, attempt: Callable[[str], T]) -> Tuple[str, T]:
+        """Call ``attempt`` with new random file paths until one is not
+        taken by a directory. Returns the path that worked and the result.
+        """
+        for _ in range(_MAX_DRAWS):
+            path = os.path.join(self.dirs.choice(), self.filename())
+            try:
+                return path, attempt(path)
+            except OSError:
+                # Renaming onto a directory fails with EISDIR, ENOTEMPTY or
+                # EEXIST depending on the directory and the platform
+                if not os.path.isdir(path):
+                    raise
+        raise IsADirectoryError(
+            f"No free file name found in {_MAX_DRAWS} attempts."
+        )
+
+    def create(self) -> None:
+        path, fd = self._target(
+            lambda path: os.open(
+                path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666
+            )
+        )
+        try:
+            os.write(fd, self.data)
+        finally:
+            os.close(fd)
+        self.files.add(path)
+
+    def delete(self) -> None:
+        path = self.files.choice()
+        os.unlink(path)
+        self.files.remove(path)
+
+    def rename(self) -> None:
+        source = self.files.choice()
+        target, _ = self._target(lambda path: os.rename(source, path))
+        self.files.remove(source)
+        self.files.add(target)
+
+    def append(self) -> None:
+        fd = os.open(self.files.choice(), os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, self.data)
+        finally:
+            os.close(fd)
+
+    def truncate(self) -> None:
+        fd = os.open(self.files.choice(), os.O_WRONLY)
+        try:
+            os.ftruncate(fd, random.randint(0, os.fstat(fd).st_size))
+        finally:
+            os.close(fd)
+
+
+def churn(
+    basedir: Union[str, PurePath],
+    n_ops: int,
+    rate: Optional[float] = None,
+    mix: Optional[Dict[str, float]] = None,
+    write_size: int = 4096,
+    filename: Callable[[], str] = random_string,
+) -> ChurnReport:
+    """
+    Apply a random mix of file operations to an existing tree.
+
+    The tree is scanned once, afterwards an in-memory index of all
+    directories and files is kept up to date, so that the targets of the
+    operations are chosen without walking the tree again.
+
+    Operations are scheduled open loop: The ``i``-th operation is due
+    ``i / rate`` seconds after the start, independent of how long previous
+    operations took. If the file system can't keep up, latencies grow instead
+    of the rate silently dropping.
+
+    Args:
+        basedir: Directory with the existing tree
+        n_ops: Number of operations to perform
+        rate: Target number of operations per second. If None, operations
+            are performed as fast as possible.
+        mix: Relative weights of the operations ``create`` (new file in a
+            random directory), ``delete`` (random file), ``rename`` (random
+            file to a new name in a random directory), ``append`` (to random
+            file) and ``truncate`` (random file to random smaller size).
+            Default: All equally likely. Operations that need a file are
+            replaced by ``create`` while there are no files.
+        write_size: Number of bytes written by ``create`` and ``append``
+        filename: Callable to generate names of new files
+
+    Returns:
+        :class:`ChurnReport`
+    """
+    if mix is None:
+        mix = DEFAULT_MIX
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    if rate is not None and rate <= 0:
+        raise ValueError("'rate' must be positive.")
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    churner = _Churner(str(basedir), write_size, filename)
+    report = ChurnReport()
+    start = time.perf_counter()
+    for i, op in enumerate(random.choices(ops, weights, k=n_ops)):
+        if op != "create" and not churner.files:
+            op = "create"
+        if rate is None:
+            due = time.perf_counter()
+        else:
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        getattr(churner, op)()
+        report.latency.record(op, time.perf_counter() - due)
+    report.elapsed = time.perf_counter() - start
+    report.dirs = [Path(d) for d in churner.dirs]
+    report.files = [Path(f) for f in churner.files]
+    return report
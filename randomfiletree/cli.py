@@ -7,12 +7,100 @@ are created based on set probabilities in all subfolders of the target folder.
 """
 
 import argparse
+import os
+import random
+import sys
+from randomfiletree.cache import TreeCache
+from randomfiletree.content import (
+    CONTENT_TYPES,
+    ContentPayload,
+    parse_content_types,
+)
 from randomfiletree.core import iterative_gaussian_tree
-from typing import no_type_check
+from randomfiletree.durability import DURABILITY_POLICIES
+from randomfiletree.flat import NAME_SCHEMES, flat_tree
+from randomfiletree.links import Links
+from randomfiletree.manifest import Manifest
+from randomfiletree.metadata import Metadata, parse_modes
+from randomfiletree.profile import TreeProfile
+from randomfiletree.read import READ_METHODS, read_workload
+from randomfiletree.remove import remove_tree
+from randomfiletree.distributions import BatchSampler, parse_distribution
+from randomfiletree.spec import TreeSpec, iterative_distribution_tree
+from randomfiletree.stats import TreeStats
+from randomfiletree.verify import verify
+from randomfiletree.striped import striped_tree
+from typing import Optional, no_type_check
+
+_subcommands_help = """subcommands:
+  clean     remove a generated tree (see 'randomfiletree clean -h')
+  clone     replicate the shape of a tree (see 'randomfiletree clone -h')
+  flat      fill one directory with many files (see 'randomfiletree flat -h')
+  profile   profile the shape of a tree (see 'randomfiletree profile -h')
+  read      read random files of a tree (see 'randomfiletree read -h')
+  verify    check a tree against its manifest (see 'randomfiletree verify -h')
+
+To create a tree in a directory with the name of a subcommand, prefix it with
+its path, e.g. 'randomfiletree ./clean'.
+"""
+
+
+def _add_metadata_arguments(_parser: argparse.ArgumentParser) -> None:
+    for name, what in (("mtime", "modification"), ("atime", "access")):
+        _parser.add_argument(
+            f"--{name}-distribution",
+            default=None,
+            dest=f"{name}_distribution",
+            metavar="DIST",
+            help=f"Distribution of the age of the {what} time of the files in "
+            "seconds, e.g. 'uniform:low=0,high=31536000'"
+            + (
+                ". Default: Same as modification time."
+                if name == "atime"
+                else ""
+            ),
+            type=parse_distribution,
+        )
+    _parser.add_argument(
+        "--modes",
+        default=None,
+        help="Permissions of the files, either one octal mode or a mix of modes "
+        "and their weights, e.g. '644:0.9,600:0.1'",
+        type=parse_modes,
+    )
+
+
+def _metadata(args: argparse.Namespace) -> Optional[Metadata]:
+    if (
+        args.mtime_distribution is None
+        and args.atime_distribution is None
+        and args.modes is None
+    ):
+        return None
+    return Metadata(
+        mtime=args.mtime_distribution,
+        atime=args.atime_distribution,
+        mode=args.modes,
+    )
+
+
+def _links(args: argparse.Namespace) -> Optional[Links]:
+    if not (args.hardlinks or args.symlinks or args.dangling_symlinks):
+        return None
+    return Links(
+        hardlinks=args.hardlinks,
+        symlinks=args.symlinks,
+        dangling=args.dangling_symlinks,
+        pool_size=args.link_pool,
+    )
 
 
 def parser() -> argparse.ArgumentParser:
-    _parser = argparse.ArgumentParser(description=__doc__)
+    _parser = argparse.ArgumentParser(
+        description=__doc__,
+        epilog=_subcommands_help,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
     _parser.add_argument(
         dest="basedir", help="Directory to create file/directory structure in"
     )
@@ -48,6 +136,65 @@ def parser() -> argparse.ArgumentParser:
         help="Spread of number of folders created in each step",
         type=float,
     )
+    for name, what in (
+        ("directories", "number of folders to create in each subfolder"),
+        ("files", "number of files to create in each subfolder"),
+        ("size", "file sizes in bytes"),
+    ):
+        _parser.add_argument(
+            f"--{name}-distribution",
+            default=None,
+            dest=f"{name}_distribution",
+            metavar="DIST",
+            help=f"Distribution of the {what}, e.g. 'poisson:lam=2', "
+            "'negative_binomial:k=2,p=0.3', 'lognormal:mu=8,sigma=2', "
+            "'zipf:a=2.5,max=1000', 'pareto:alpha=1.5'"
+            + (
+                ". Overrides the options for the average and spread."
+                if name != "size"
+                else ". Default: Empty files."
+            ),
+            type=parse_distribution,
+        )
+    _add_metadata_arguments(_parser)
+    _parser.add_argument(
+        "--content",
+        default=None,
+        metavar="TYPES",
+        help="Fill the files with realistic content of these types and their "
+        f"weights, e.g. 'text,json:2,png' (types: {', '.join(CONTENT_TYPES)})",
+        type=parse_content_types,
+    )
+    _parser.add_argument(
+        "--content-size",
+        default=4096,
+        dest="content_size",
+        metavar="DIST",
+        help="Approximate size of the text based files with --content in "
+        "bytes, constant or distribution, e.g. 'lognormal:mu=8,sigma=2'",
+        type=parse_distribution,
+    )
+    for name, what in (
+        ("hardlinks", "hardlinks to a small pool of shared files"),
+        ("symlinks", "symbolic links to files created earlier"),
+        ("dangling-symlinks", "dangling symbolic links"),
+    ):
+        _parser.add_argument(
+            f"--{name}",
+            default=0.0,
+            dest=name.replace("-", "_"),
+            metavar="SHARE",
+            help=f"Share of the files that are created as {what}",
+            type=float,
+        )
+    _parser.add_argument(
+        "--link-pool",
+        default=16,
+        dest="link_pool",
+        metavar="N",
+        help="Number of shared files that hardlinks point to",
+        type=int,
+    )
     _parser.add_argument(
         "-r",
         "--repeat",
@@ -62,14 +209,508 @@ def parser() -> argparse.ArgumentParser:
         help="Maximal depth of file/directory structure to create",
         type=int,
     )
+    _parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Write manifest of the created directories and files to this "
+        "file",
+    )
+    _parser.add_argument(
+        "--checksum",
+        default=None,
+        metavar="ALGORITHM",
+        help="Record sizes and checksums of the files in the manifest, so "
+        "that copies of the tree can be verified (e.g. crc32, blake2b, "
+        "sha256)",
+    )
+    _parser.add_argument(
+        "--durability",
+        default="none",
+        choices=DURABILITY_POLICIES,
+        help="When to flush the created files and directories to disk: "
+        "never, after every file, once per directory or with one syncfs at "
+        "the end. The time spent is reported with --stats.",
+    )
+    _parser.add_argument(
+        "--stripe",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Additional base directory (e.g. on another disk) to distribute "
+        "the top level folders of the tree over. Can be given several times.",
+    )
+    _parser.add_argument(
+        "--workers-per-root",
+        default=4,
+        dest="workers_per_root",
+        help="Number of parallel workers per base directory with --stripe",
+        type=int,
+    )
+    _parser.add_argument(
+        "--spec",
+        default=None,
+        help="JSON or TOML file describing the tree to create per depth. "
+        "Overrides the options for the numbers of files and folders, "
+        "--repeat and --maxdepth.",
+    )
+    _parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print statistics of the created directories and files",
+    )
+    _parser.add_argument(
+        "--seed",
+        default=None,
+        help="Random seed",
+        type=int,
+    )
+    _parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help="Clone the tree from a cache of trees generated with the same "
+        "arguments and seed (requires --seed). The output folder must be "
+        "empty. Optionally takes the cache directory.",
+    )
+    return _parser
+
+
+def clean_parser() -> argparse.ArgumentParser:
+    _parser = argparse.ArgumentParser(
+        prog="randomfiletree clean",
+        description="Remove a (generated) directory tree in parallel.",
+    )
+    _parser.add_argument(dest="basedir", help="Directory to remove")
+    _parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Manifest written during generation. If given, the tree is not "
+        "scanned.",
+    )
+    _parser.add_argument(
+        "-j",
+        "--workers",
+        default=None,
+        help="Number of parallel workers",
+        type=int,
+    )
+    return _parser
+
+
+@no_type_check
+def clean_cli(args=None):
+    if not args:
+        args = clean_parser().parse_args(sys.argv[2:])
+    manifest = None
+    if args.manifest:
+        manifest = Manifest.load(args.manifest, basedir=args.basedir)
+    try:
+        remove_tree(args.basedir, manifest=manifest, workers=args.workers)
+    except ValueError as e:
+        clean_parser().error(str(e))
+
+
+def flat_parser() -> argparse.ArgumentParser:
+    _parser = argparse.ArgumentParser(
+        prog="randomfiletree flat",
+        description="Fill a single directory with a huge number of files and "
+        "report the creation rate as the directory grows.",
+    )
+    _parser.add_argument(dest="basedir", help="Directory to fill")
+    _parser.add_argument(
+        "-n",
+        "--entries",
+        default=100000,
+        dest="n_entries",
+        help="Number of files to create",
+        type=int,
+    )
+    _parser.add_argument(
+        "-j",
+        "--workers",
+        default=4,
+        help="Number of parallel workers",
+        type=int,
+    )
+    _parser.add_argument(
+        "--batch-size",
+        default=1000,
+        dest="batch_size",
+        help="Number of files created by a worker at once",
+        type=int,
+    )
+    _parser.add_argument(
+        "--names",
+        default="random",
+        choices=NAME_SCHEMES,
+        help="Random looking or sequential file names",
+    )
+    _parser.add_argument(
+        "--prefix", default="", help="Prefix of all file names"
+    )
+    _parser.add_argument(
+        "--size",
+        default=0,
+        help="Size of every file in bytes",
+        type=int,
+    )
+    _parser.add_argument(
+        "--report-every",
+        default=None,
+        dest="report_every",
+        help="Report the creation rate every time this many more files were "
+        "created",
+        type=int,
+    )
+    _parser.add_argument(
+        "--seed",
+        default=None,
+        help="Random seed, so that the same names are generated again",
+        type=int,
+    )
+    _parser.add_argument(
+        "--durability",
+        default="none",
+        choices=DURABILITY_POLICIES,
+        help="When to flush the created files to disk",
+    )
+    _add_metadata_arguments(_parser)
+    _parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Write manifest of the created files to this file",
+    )
+    _parser.add_argument(
+        "--checksum",
+        default=None,
+        metavar="ALGORITHM",
+        help="Record sizes and checksums of the files in the manifest, so "
+        "that copies of the tree can be verified (e.g. crc32, blake2b, "
+        "sha256)",
+    )
     return _parser
 
 
+@no_type_check
+def flat_cli(args=None):
+    if not args:
+        args = flat_parser().parse_args(sys.argv[2:])
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.checksum and not args.manifest:
+        flat_parser().error("--checksum requires --manifest")
+    manifest = None
+    if args.manifest:
+        manifest = Manifest(args.basedir, checksum=args.checksum)
+    report = flat_tree(
+        args.basedir,
+        args.n_entries,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        names=args.names,
+        prefix=args.prefix,
+        size=args.size,
+        report_every=args.report_every,
+        manifest=manifest,
+        durability=args.durability,
+        metadata=_metadata(args),
+    )
+    if manifest is not None:
+        manifest.save(args.manifest)
+    print(report.format())
+
+
+def read_parser() -> argparse.ArgumentParser:
+    _parser = argparse.ArgumentParser(
+        prog="randomfiletree read",
+        description="Read random files of an existing tree with a pool of "
+        "readers and report the throughput and latency percentiles.",
+    )
+    _parser.add_argument(dest="basedir", help="Directory to read files from")
+    _parser.add_argument(
+        "-n",
+        "--reads",
+        default=None,
+        dest="n_reads",
+        help="Total number of files to read",
+        type=int,
+    )
+    _parser.add_argument(
+        "--duration",
+        default=None,
+        help="Stop after this many seconds (default: 10 s if --reads is not "
+        "given)",
+        type=float,
+    )
+    _parser.add_argument(
+        "-j",
+        "--workers",
+        default=4,
+        help="Number of parallel readers",
+        type=int,
+    )
+    _parser.add_argument(
+        "--weight",
+        default="uniform",
+        choices=["uniform", "size", "depth", "zipf"],
+        help="Probability of a file to be selected",
+    )
+    _parser.add_argument(
+        "--exponent",
+        default=1.0,
+        help="Exponent for the depth and zipf weights",
+        type=float,
+    )
+    _parser.add_argument(
+        "--method",
+        default="buffer",
+        choices=READ_METHODS,
+        help="Read into a reused buffer or through mmap",
+    )
+    _parser.add_argument(
+        "--buffer-size",
+        default=1024**2,
+        dest="buffer_size",
+        help="Size of the buffer of every reader in bytes",
+        type=int,
+    )
+    _parser.add_argument(
+        "--seed",
+        default=None,
+        help="Random seed, so that the same files are selected again",
+        type=int,
+    )
+    return _parser
+
+
+@no_type_check
+def read_cli(args=None):
+    if not args:
+        args = read_parser().parse_args(sys.argv[2:])
+    if args.seed is not None:
+        random.seed(args.seed)
+    duration = args.duration
+    if duration is None and args.n_reads is None:
+        duration = 10.0
+    report = read_workload(
+        args.basedir,
+        n_reads=args.n_reads,
+        duration=duration,
+        workers=args.workers,
+        weight=None if args.weight == "uniform" else args.weight,
+        exponent=args.exponent,
+        method=args.method,
+        buffer_size=args.buffer_size,
+    )
+    print(report.format())
+
+
+def verify_parser() -> argparse.ArgumentParser:
+    _parser = argparse.ArgumentParser(
+        prog="randomfiletree verify",
+        description="Check that a (copied) tree matches the manifest written "
+        "during generation. Mismatches are printed as they are found. Exits "
+        "with status 1 if there are any.",
+    )
+    _parser.add_argument(dest="basedir", help="Directory to check")
+    _parser.add_argument(
+        "--manifest",
+        required=True,
+        help="Manifest written during generation (with --checksum to compare "
+        "the contents of the files)",
+    )
+    _parser.add_argument(
+        "-j",
+        "--workers",
+        default=None,
+        help="Number of parallel workers",
+        type=int,
+    )
+    _parser.add_argument(
+        "--no-checksums",
+        action="store_false",
+        dest="checksums",
+        help="Only check existence, types and sizes",
+    )
+    return _parser
+
+
+@no_type_check
+def verify_cli(args=None):
+    if not args:
+        args = verify_parser().parse_args(sys.argv[2:])
+    report = verify(
+        args.basedir,
+        Manifest.load(args.manifest),
+        workers=args.workers,
+        checksums=args.checksums,
+        on_mismatch=lambda mismatch: print(mismatch, flush=True),
+    )
+    print(report.format())
+    if not report.ok:
+        sys.exit(1)
+
+
+def profile_parser() -> argparse.ArgumentParser:
+    _parser = argparse.ArgumentParser(
+        prog="randomfiletree profile",
+        description="Profile the shape of an existing tree (per depth "
+        "distributions of the numbers of subdirectories and files and of the "
+        "file sizes) in one pass. The profile does not contain any names.",
+    )
+    _parser.add_argument(dest="source", help="Directory to profile")
+    _parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Write profile to this JSON file (input of 'randomfiletree "
+        "clone')",
+    )
+    _parser.add_argument(
+        "-j",
+        "--workers",
+        default=8,
+        help="Number of directories that are read in parallel",
+        type=int,
+    )
+    return _parser
+
+
+@no_type_check
+def profile_cli(args=None):
+    if not args:
+        args = profile_parser().parse_args(sys.argv[2:])
+    profile = TreeProfile.scan(args.source, workers=args.workers)
+    if args.output:
+        profile.save(args.output)
+    print(profile.format())
+
+
+def clone_parser() -> argparse.ArgumentParser:
+    _parser = argparse.ArgumentParser(
+        prog="randomfiletree clone",
+        description="Create an anonymized replica of the shape of an existing "
+        "tree (or of a profile written by 'randomfiletree profile') at a "
+        "scale factor.",
+    )
+    _parser.add_argument(
+        dest="source", help="Directory to clone or profile (JSON file)"
+    )
+    _parser.add_argument(
+        dest="basedir", help="Directory to create the replica in"
+    )
+    _parser.add_argument(
+        "--scale",
+        default=1.0,
+        help="Scale factor of the number of entries, e.g. 0.1 or 10",
+        type=float,
+    )
+    _parser.add_argument(
+        "--scale-depth",
+        default=None,
+        dest="scale_depth",
+        help="Deepest depth of the directories whose numbers of "
+        "subdirectories are scaled. Default: Chosen to keep the variance low.",
+        type=int,
+    )
+    _parser.add_argument(
+        "-j",
+        "--workers",
+        default=8,
+        help="Number of directories that are read in parallel while "
+        "profiling",
+        type=int,
+    )
+    _parser.add_argument(
+        "--seed",
+        default=None,
+        help="Random seed",
+        type=int,
+    )
+    _parser.add_argument(
+        "--durability",
+        default="none",
+        choices=DURABILITY_POLICIES,
+        help="When to flush the created files and directories to disk",
+    )
+    _add_metadata_arguments(_parser)
+    _parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Write manifest of the created directories and files to this "
+        "file",
+    )
+    _parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print statistics of the created directories and files",
+    )
+    return _parser
+
+
+@no_type_check
+def clone_cli(args=None):
+    if not args:
+        args = clone_parser().parse_args(sys.argv[2:])
+    if os.path.isfile(args.source):
+        profile = TreeProfile.load(args.source)
+    else:
+        profile = TreeProfile.scan(args.source, workers=args.workers)
+    if args.seed is not None:
+        random.seed(args.seed)
+    manifest = Manifest(args.basedir) if args.manifest else None
+    stats = TreeStats() if args.stats else None
+    profile.generate(
+        args.basedir,
+        scale=args.scale,
+        scale_depth=args.scale_depth,
+        manifest=manifest,
+        stats=stats,
+        durability=args.durability,
+        metadata=_metadata(args),
+    )
+    if manifest is not None:
+        manifest.save(args.manifest)
+    if stats is not None:
+        print(stats.format())
+
+
+_subcommands = {
+    "clean": clean_cli,
+    "clone": clone_cli,
+    "flat": flat_cli,
+    "profile": profile_cli,
+    "read": read_cli,
+    "verify": verify_cli,
+}
+
+
 @no_type_check  # TODO rewrite function to make mypy happy with Optional args
 def cli(args=None):
     if not args:
+        if len(sys.argv) > 1 and sys.argv[1] in _subcommands:
+            return _subcommands[sys.argv[1]]()
         args = parser().parse_args()
-    iterative_gaussian_tree(
+    roots = [args.basedir] + args.stripe
+    if args.checksum and not args.manifest:
+        parser().error("--checksum requires --manifest")
+    manifest = None
+    if args.manifest:
+        manifest = Manifest(
+            (
+                os.path.commonpath([os.path.abspath(r) for r in roots])
+                if args.stripe
+                else args.basedir
+            ),
+            checksum=args.checksum,
+        )
+    stats = TreeStats() if args.stats else None
+    if args.seed is not None:
+        # Before the samplers of the metadata and the payload are created
+        random.seed(args.seed)
+    kwargs = dict(
         basedir=args.basedir,
         nfiles=args.nfiles,
         nfolders=args.nfolders,
@@ -77,7 +718,126 @@ def cli(args=None):
         maxdepth=args.maxdepth,
         sigma_files=args.files_sigma,
         sigma_folders=args.folders_sigma,
+        manifest=manifest,
+        stats=stats,
+        durability=args.durability,
+        metadata=_metadata(args),
     )
+    links = _links(args)
+    if links is not None:
+        if (
+            args.stripe
+            or args.spec is not None
+            or args.cache is not None
+            or args.directories_distribution
+            or args.files_distribution
+            or args.size_distribution
+        ):
+            parser().error(
+                "Links can't be combined with --stripe, --spec, --cache or "
+                "distributions"
+            )
+        kwargs["links"] = links
+    if args.content is not None:
+        kwargs["payload"] = ContentPayload(
+            args.content, size=args.content_size, manifest=manifest
+        )
+    if args.content is not None and (
+        args.spec is not None
+        or args.cache is not None
+        or args.directories_distribution
+        or args.files_distribution
+        or args.size_distribution
+    ):
+        parser().error(
+            "--content can't be combined with --spec, --cache or "
+            "distributions"
+        )
+    if args.stripe:
+        if (
+            args.spec is not None
+            or args.cache is not None
+            or args.directories_distribution
+            or args.files_distribution
+            or args.size_distribution
+        ):
+            parser().error(
+                "--stripe can't be combined with --spec, --cache or "
+                "distributions"
+            )
+        striped_tree(
+            roots,
+            nfolders_func=BatchSampler(
+                "gauss", mean=args.nfolders, sigma=args.folders_sigma
+            ),
+            nfiles_func=BatchSampler(
+                "gauss", mean=args.nfiles, sigma=args.files_sigma
+            ),
+            repeat=args.repeat,
+            maxdepth=args.maxdepth,
+            workers_per_root=args.workers_per_root,
+            manifest=manifest,
+            stats=stats,
+            durability=args.durability,
+            metadata=kwargs["metadata"],
+            payload=kwargs.get("payload"),
+        )
+    elif args.spec is not None:
+        if args.cache is not None:
+            parser().error("--cache can't be combined with --spec")
+        TreeSpec.load(args.spec).generate(
+            args.basedir,
+            manifest=manifest,
+            stats=stats,
+            durability=args.durability,
+            metadata=kwargs["metadata"],
+        )
+    elif (
+        args.directories_distribution
+        or args.files_distribution
+        or args.size_distribution
+    ):
+        if args.cache is not None:
+            parser().error("--cache can't be combined with distributions")
+        iterative_distribution_tree(
+            args.basedir,
+            folders=args.directories_distribution
+            or dict(
+                distribution="gauss",
+                mean=args.nfolders,
+                sigma=args.folders_sigma,
+            ),
+            files=args.files_distribution
+            or dict(
+                distribution="gauss", mean=args.nfiles, sigma=args.files_sigma
+            ),
+            size=args.size_distribution or 0,
+            repeat=args.repeat,
+            maxdepth=args.maxdepth,
+            manifest=manifest,
+            stats=stats,
+            durability=args.durability,
+            metadata=kwargs["metadata"],
+        )
+    elif args.cache is not None:
+        if args.seed is None:
+            parser().error("--cache requires --seed")
+        if kwargs.pop("metadata") is not None:
+            parser().error(
+                "--cache can't be combined with random timestamps or modes"
+            )
+        try:
+            TreeCache(args.cache or None).iterative_gaussian_tree(
+                seed=args.seed, **kwargs
+            )
+        except ValueError as e:
+            parser().error(str(e))
+    else:
+        iterative_gaussian_tree(**kwargs)
+    if manifest is not None:
+        manifest.save(args.manifest)
+    if stats is not None:
+        print(stats.format())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+
+from typing import Any, Callable, Dict, Generator, Optional, Union
+import copy
+import functools
+import os
+import random
+import struct
+import time
+import zlib
+from pathlib import Path
+
+# ours
+from randomfiletree.core import random_string
+from randomfiletree.distributions import BatchSampler
+from randomfiletree.manifest import Manifest
+
+#: Available content types and the extensions of their files
+CONTENT_TYPES = {
+    "text": ".txt",
+    "log": ".log",
+    "json": ".json",
+    "csv": ".csv",
+    "png": ".png",
+    "pdf": ".pdf",
+}
+
+_WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or "
+    "his from at which but have an they you were her she there been one all "
+    "we their has would when if so no will more can about said what out up "
+    "other into time only some could them these may first then do any like "
+    "my now over such our man me even most made after also did many before "
+    "must through back years where much your way well down should because "
+    "each just those people how too little state good very make world still "
+    "own see men work long get here between both life being under never day "
+    "same another know while last might us great old year off come since "
+    "against go came right used take three"
+).split()
+
+_LEVELS = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+
+_COMPONENTS = ["api", "auth", "db", "cache", "scheduler", "worker", "http"]
+
+# Number of distinct fragments (sentences, names, ...) rendered up front
+_N_FRAGMENTS = 512
+
+# Number of pre-rendered images
+_N_IMAGES = 16
+
+# Log files start within a year after this time (seconds since the epoch)
+_LOG_START = 1_600_000_000
+
+
+def parse_content_types(text: str) -> Dict[str, float]:
+    """
+    Parse content type mix as used by the command line interface, e.g.
+    ``text,json:2,png`` (types and optional weights).
+    """
+    types = {}
+    for item in filter(None, text.split(",")):
+        name, sep, weight = item.partition(":")
+        types[name.strip()] = float(weight) if sep else 1.0
+    return types
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def _png(width: int, height: int) -> bytes:
+    """Small PNG image with random colored stripes (without the final
+    ``IEND`` chunk).
+    """
+    rows = []
+    color = bytes(random.getrandbits(8) for _ in range(3))
+    for y in range(height):
+        if y % 4 == 0:
+            color = bytes(random.getrandbits(8) for _ in range(3))
+        rows.append(b"\0" + color * width)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        )
+        + _png_chunk(b"IDAT", zlib.compress(b"".join(rows)))
+    )
+
+
+class ContentPayload:
+    """
+    Payload that fills files with realistic content of common types (text,
+    log lines, JSON, CSV and small PNG and PDF files), with matching file
+    extensions. Pass an instance as the ``payload`` argument of
+    :func:`randomfiletree.core.iterative_tree`.
+
+    Fragments (sentences, names, images) are rendered once when the payload
+    is created and the templates of the file types are prepared up front, so
+    that a file is assembled from cached pieces with a few joins.
+
+    Args:
+        types: Content type (see :data:`CONTENT_TYPES`) or mapping content
+            type -> weight. Default: All types with equal weights.
+        size: Approximate size of the text based files (text, log, JSON,
+            CSV) in bytes (constant or arguments of
+            :class:`~randomfiletree.distributions.BatchSampler`)
+        filename: Callable to generate file names (without extension)
+        manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+            size and checksum of every file in as it is written, so that the
+            generator does not have to read the files again (pass the same
+            manifest to the generator)
+    """
+
+    def __init__(
+        self,
+        types: Union[str, Dict[str, float], None] = None,
+        size: Union[float, Dict[str, Any]] = 4096,
+        filename: Callable[[], str] = random_string,
+        manifest: Optional[Manifest] = None,
+    ):
+        if types is None:
+            types = {t: 1.0 for t in CONTENT_TYPES}
+        elif isinstance(types, str):
+            types = {types: 1.0}
+        unknown = set(types) - set(CONTENT_TYPES)
+        if unknown:
+            raise ValueError(
+                f"Unknown content types: {', '.join(sorted(unknown))}"
+            )
+        self.types = list(types)
+        self._type = BatchSampler(
+            "choice",
+            values=list(range(len(types))),
+            weights=list(types.values()),
+        )
+        self._size = BatchSampler.from_spec(size)
+        self.filename = filename
+        self.manifest = manifest
+        # Generator of the content, see spawn
+        self._rng: Any = random
+        self._render: Dict[str, Callable[[int], bytes]] = {}
+        self._bind()
+        # Cached fragments
+        self._sentences = [
+            " ".join(
+                random.choices(_WORDS, k=random.randint(4, 16))
+            ).capitalize()
+            + "."
+            for _ in range(_N_FRAGMENTS)
+        ]
+        self._lines = [(s + "\n").encode() for s in self._sentences]
+        self._line_size = sum(map(len, self._lines)) / len(self._lines)
+        self._names = [
+            random.choice(_WORDS) + "_" + random_string(3, 6).lower()
+            for _ in range(_N_FRAGMENTS)
+        ]
+        self._images = [
+            _png(random.choice([8, 16, 32]), random.choice([8, 16, 32]))
+            for _ in range(_N_IMAGES)
+        ]
+        # Templates with the fixed parts of each record
+        self._log_template = "%s.%03dZ %s [%s] %s\n"
+        self._json_template = (
+            '  {"id": %d, "name": "%s", "tags": ["%s", "%s"], '
+            '"score": %.3f, "active": %s, "comment": "%s"}'
+        )
+        self._csv_header = b"id,name,tag,score,active,comment\n"
+        self._csv_template = '%d,%s,%s,%.3f,%s,"%s"\n'
+        self._iend = _png_chunk(b"IEND", b"")
+
+    def _bind(self) -> None:
+        self._render = {
+            "text": self._text,
+            "log": self._log,
+            "json": self._json,
+            "csv": self._csv,
+            "png": self._png,
+            "pdf": self._pdf,
+        }
+
+    def spawn(self, rng: random.Random) -> "ContentPayload":
+        """
+        Copy that shares the cached fragments, but draws the types, sizes,
+        names (if the default ``filename`` is used) and content of its files
+        with ``rng``, e.g. for one of several threads.
+        """
+        other = copy.copy(self)
+        other._rng = rng
+        other._type = self._type.spawn(rng)
+        other._size = self._size.spawn(rng)
+        if self.filename is random_string:
+            other.filename = functools.partial(random_string, rng=rng)
+        other._bind()
+        return other
+
+    def _n(self, size: int, record_size: float) -> int:
+        return max(1, int(size / record_size))
+
+    def _text(self, size: int) -> bytes:
+        return b"".join(
+            self._rng.choices(self._lines, k=self._n(size, self._line_size))
+        )
+
+    def _log(self, size: int) -> bytes:
+        n = self._n(size, self._line_size + 40)
+        # Independent of the current time, so that the content is
+        # reproducible with random.seed
+        t = _LOG_START + self._rng.random() * 86400 * 365
+        template = self._log_template
+        choice = self._rng.choice
+        lines = []
+        second = -1
+        stamp = ""
+        for _ in range(n):
+            t += self._rng.random()
+            if int(t) != second:
+                second = int(t)
+                stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(t))
+            lines.append(
+                template
+                % (
+                    stamp,
+                    int(t * 1000) % 1000,
+                    choice(_LEVELS),
+                    choice(_COMPONENTS),
+                    choice(self._sentences),
+                )
+            )
+        return "".join(lines).encode()
+
+    def _json(self, size: int) -> bytes:
+        n = self._n(size, self._line_size + 100)
+        names = self._names
+        choice = self._rng.choice
+        template = self._json_template
+        records = [
+            template
+            % (
+                i,
+                choice(names),
+                choice(_WORDS),
+                choice(_WORDS),
+                self._rng.random() * 100,
+                choice(("true", "false")),
+                choice(self._sentences),
+            )
+            for i in range(n)
+        ]
+        return ("[\n" + ",\n".join(records) + "\n]\n").encode()
+
+    def _csv(self, size: int) -> bytes:
+        n = self._n(size, self._line_size + 40)
+        names = self._names
+        choice = self._rng.choice
+        template = self._csv_template
+        rows = [
+            template
+            % (
+                i,
+                choice(names),
+                choice(_WORDS),
+                self._rng.random() * 100,
+                choice(("true", "false")),
+                choice(self._sentences),
+            )
+            for i in range(n)
+        ]
+        return self._csv_header + "".join(rows).encode()
+
+    def _png(self, size: int) -> bytes:
+        # A text chunk makes the file unique
+        comment = _png_chunk(
+            b"tEXt", b"Comment\0" + self._rng.choice(self._sentences).encode()
+        )
+        return self._rng.choice(self._images) + comment + self._iend
+
+    def _pdf(self, size: int) -> bytes:
+        text = (
+            self._rng.choice(self._sentences).replace("(", "").replace(")", "")
+        )
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        ]
+        parts = [b"%PDF-1.4\n"]
+        offsets = []
+        position = len(parts[0])
+        for i, obj in enumerate(objects, 1):
+            part = b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+            offsets.append(position)
+            parts.append(part)
+            position += len(part)
+        parts.append(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        parts.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+        parts.append(
+            b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(objects) + 1, position)
+        )
+        return b"".join(parts)
+
+    def render(self, content_type: str, size: Optional[int] = None) -> bytes:
+        """Content of one file of the given type (``size`` only applies to
+        text based types; default: drawn from the size distribution).
+        """
+        return self._render[content_type](
+            self._size() if size is None else size
+        )
+
+    def __call__(self, directory: Path) -> Generator[Path, None, None]:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        while True:
+            content_type = self.types[self._type()]
+            path = directory / (self.filename() + CONTENT_TYPES[content_type])
+            data = self.render(content_type)
+            fd = os.open(str(path), flags, 0o666)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+            finally:
+                os.close(fd)
+            if self.manifest is not None:
+                self.manifest.add_content(path, data)
+            yield path
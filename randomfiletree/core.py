@@ -1,38 +1,182 @@
 #!/usr/bin/env python3
 
 from typing import (
+    Any,
+    Dict,
     List,
     Tuple,
     Callable,
     Optional,
     Union,
     Generator,
-    no_type_check,
+    Set,
 )
+from collections import OrderedDict
 import os
 import random
 import string
+import time
 from pathlib import Path, PurePath
 
+# ours
+from randomfiletree.distributions import BatchSampler
+from randomfiletree.durability import Syncer
+from randomfiletree.links import Links
+from randomfiletree.manifest import Manifest
+from randomfiletree.metadata import Metadata
+from randomfiletree.stats import TreeStats
 
-def random_string(min_length: int = 5, max_length: int = 10) -> str:
+
+def random_string(
+    min_length: int = 5,
+    max_length: int = 10,
+    rng: Optional[random.Random] = None,
+) -> str:
     """
     Get a random string.
 
     Args:
         min_length: Minimal length of string
         max_length: Maximal length of string
+        rng: :class:`random.Random` generator to use. Default: The global
+            generator of :mod:`random`.
 
     Returns:
         Random string of ascii characters
     """
-    length = random.randint(min_length, max_length)
+    generator: Any = random if rng is None else rng
+    length = generator.randint(min_length, max_length)
     return "".join(
-        random.choice(string.ascii_uppercase + string.digits)
+        generator.choice(string.ascii_uppercase + string.digits)
         for _ in range(length)
     )
 
 
+# Use file descriptors of the parent directories to create new entries where
+# the platform supports it, so that the kernel does not have to resolve the
+# full path again for every single entry.
+_HAS_DIR_FD = (
+    os.mkdir in os.supports_dir_fd
+    and os.open in os.supports_dir_fd
+    and os.scandir in os.supports_fd
+    and hasattr(os, "O_DIRECTORY")
+)
+
+
+def _open_dir(path: str) -> Optional[int]:
+    """Open directory and return its file descriptor or None if ``dir_fd``
+    is not supported on this platform.
+    """
+    if not _HAS_DIR_FD:
+        return None
+    return os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+
+
+def _close_dir(fd: Optional[int]) -> None:
+    if fd is not None:
+        os.close(fd)
+
+
+def _list_subdirs(path: str, fd: Optional[int]) -> List[str]:
+    """Names of the subdirectories (not following symlinks) of a
+    directory. Sorted, so that the tree created with a given random seed
+    does not depend on the order in which the file system lists entries.
+    """
+    target: Union[str, int] = path if fd is None else fd
+    with os.scandir(target) as it:
+        return sorted(e.name for e in it if e.is_dir(follow_symlinks=False))
+
+
+def _list_names(path: str, fd: Optional[int]) -> Set[str]:
+    """Names of all entries of a directory."""
+    target: Union[str, int] = path if fd is None else fd
+    with os.scandir(target) as it:
+        return {e.name for e in it}
+
+
+def _mkdir(path: str, fd: Optional[int], name: str) -> bool:
+    """Create directory ``name`` in directory ``path`` (with descriptor
+    ``fd``) if it does not exist yet. Returns True if it was created.
+    """
+    try:
+        if fd is None:
+            os.mkdir(os.path.join(path, name))
+        else:
+            os.mkdir(name, dir_fd=fd)
+    except FileExistsError:
+        return False
+    return True
+
+
+def _touch(
+    path: str,
+    fd: Optional[int],
+    name: str,
+    metadata: Optional[Metadata] = None,
+) -> bool:
+    """Create empty file ``name`` in directory ``path`` (with descriptor
+    ``fd``) if it does not exist yet and apply random ``metadata`` to it
+    (also if it exists already). Returns True if it was created.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    try:
+        if fd is None:
+            file_fd = os.open(os.path.join(path, name), flags, 0o666)
+        else:
+            file_fd = os.open(name, flags, 0o666, dir_fd=fd)
+    except FileExistsError:
+        if metadata is not None:
+            # Instead of the current time, which would replace random
+            # timestamps
+            metadata.apply(os.path.join(path, name), dir_fd=fd)
+            return False
+        # Like Path.touch, update the modification time of existing files
+        if fd is None or os.utime not in os.supports_dir_fd:
+            os.utime(os.path.join(path, name))
+        else:
+            os.utime(name, dir_fd=fd)
+        return False
+    try:
+        if metadata is not None:
+            metadata.apply(os.path.join(path, name), fd=file_fd)
+    finally:
+        os.close(file_fd)
+    return True
+
+
+def _link(
+    links: Optional[Links],
+    path: str,
+    fd: Optional[int],
+    filename: Callable,
+    created: List[Tuple[str, str, str]],
+    syncer: Optional[Syncer] = None,
+    new_files: Optional[List[str]] = None,
+) -> bool:
+    """Draw whether the next file entry in directory ``path`` (with
+    descriptor ``fd``) is a link. If so, create it and record it in
+    ``created``. Like files, created hardlinks are passed to ``syncer`` and
+    appended to ``new_files``. Returns True if the entry is a link.
+    """
+    if links is None:
+        return False
+    kind = links.draw()
+    if kind is None:
+        return False
+    name = filename()
+    link = links.create(kind, path, fd, name)
+    if link is None and not links.pool:
+        # All files of the pool reached the maximal number of links
+        return False
+    if link is not None:
+        created.append((os.path.join(path, name),) + link)
+        if link[0] == "hardlink" and syncer is not None:
+            if new_files is not None:
+                new_files.append(created[-1][0])
+            syncer.file_created(created[-1][0], path, fd)
+    return True
+
+
 def iterative_tree(
     basedir: Union[str, PurePath],
     nfolders_func: Callable,
@@ -41,12 +185,22 @@ def iterative_tree(
     maxdepth: Optional[int] = None,
     filename: Callable = random_string,
     payload: Optional[Callable[[Path], Generator[Path, None, None]]] = None,
+    manifest: Optional[Manifest] = None,
+    stats: Optional[TreeStats] = None,
+    durability: str = "none",
+    metadata: Optional[Metadata] = None,
+    links: Optional[Links] = None,
+    dirname: Callable = random_string,
 ) -> Tuple[List[Path], List[Path]]:
     """
     Create a random set of files and folders by repeatedly walking through the
     current tree and creating random files or subfolders (the number of files
     and folders created is chosen by evaluating a depth dependent function).
 
+    The tree is traversed breadth first, level by level. Where supported, new
+    entries are created relative to an open file descriptor of their parent
+    directory, so that their full path does not have to be resolved again.
+
     Args:
         basedir:  Directory to create files and folders in
         nfolders_func: (depth) that returns the number of folders to be
@@ -66,38 +220,151 @@ def iterative_tree(
             if both are passed. Takes Path object as catalog where to create
             file and yields Path of created file.
             If this option is not specified, all created files will be empty.
+        manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+            created directories and files in
+        stats: :class:`~randomfiletree.stats.TreeStats` to collect
+            statistics of the created directories and files in
+        durability: When to flush the created entries to disk: ``none``,
+            ``file``, ``directory`` or ``end`` (see
+            :class:`~randomfiletree.durability.Syncer`). The time spent is
+            reported in ``stats``.
+        metadata: :class:`~randomfiletree.metadata.Metadata` with random
+            timestamps and permissions to apply to the created files
+        links: :class:`~randomfiletree.links.Links` with the shares of the
+            files that are created as hardlinks or symbolic links instead.
+            Links are recorded in the manifest (with their type
+            ``"hardlink"`` or ``"symlink"`` and their ``target``), but are
+            not part of the returned files or the statistics.
+        dirname: Callable to generate folder names. Default returns short
+            random string
 
     Returns:
         (List of dirs, List of files), all as pathlib.Path objects.
     """
+    syncer = Syncer(durability, stats)
+    sync_files = durability in ("file", "directory")
+    link_syncer = syncer if sync_files else None
     alldirs = []
     allfiles = []
+    # (path, type, target) of the created links
+    alllinks: List[Tuple[str, str, str]] = []
     basedir = Path(basedir)
     basedir.mkdir(parents=True, exist_ok=True)
+    if stats is not None:
+        stats.start()
     for i in range(repeat):
-        for root, dirs, files in os.walk(str(basedir)):
-            depth = os.path.relpath(root, str(basedir)).count(os.sep)
-            if maxdepth and depth >= maxdepth - 1:
-                del dirs[:]
-            n_folders = nfolders_func(depth)
-            n_files = nfiles_func(depth)
-            for _ in range(n_folders):
-                p = Path(root) / random_string()
-                p.mkdir(exist_ok=True)
-                alldirs.append(p)
-            if not payload:
-                for _ in range(n_files):
-                    p = Path(root) / filename()
-                    p.touch(exist_ok=True)
-                    allfiles.append(p)
-            else:
-                payload_generator = payload(Path(root))
-                for _ in range(n_files):
-                    p = next(payload_generator)
-                    allfiles.append(p)
+        # Walk the existing tree breadth first, one level at a time. Folders
+        # created during this pass are not descended into until the next one.
+        level = [str(basedir)]
+        depth = 0
+        while level:
+            next_level: List[str] = []
+            for root in level:
+                fd = _open_dir(root)
+                try:
+                    if not (maxdepth and depth >= maxdepth - 1):
+                        next_level.extend(
+                            os.path.join(root, name)
+                            for name in _list_subdirs(root, fd)
+                        )
+                    n_folders = nfolders_func(depth)
+                    n_files = nfiles_func(depth)
+                    created_folders = 0
+                    for _ in range(n_folders):
+                        name = dirname()
+                        created_folders += _mkdir(root, fd, name)
+                        alldirs.append(Path(root, name))
+                    created_files = 0
+                    size = 0
+                    new_files: List[str] = []
+                    n_links = len(alllinks)
+                    if not payload:
+                        for _ in range(n_files):
+                            if _link(
+                                links,
+                                root,
+                                fd,
+                                filename,
+                                alllinks,
+                                link_syncer,
+                                new_files,
+                            ):
+                                continue
+                            name = filename()
+                            created_files += _touch(root, fd, name, metadata)
+                            allfiles.append(Path(root, name))
+                            if links is not None:
+                                links.add(os.path.join(root, name))
+                            if sync_files:
+                                new_files.append(os.path.join(root, name))
+                                syncer.file_created(new_files[-1], root, fd)
+                    else:
+                        payload_generator = payload(Path(root))
+                        # Payloads create their files before yielding them,
+                        # so list the existing ones to count only new files
+                        existing: Set[str] = set()
+                        if stats is not None:
+                            existing = {
+                                os.path.join(root, name)
+                                for name in _list_names(root, fd)
+                            }
+                        for _ in range(n_files):
+                            if _link(
+                                links,
+                                root,
+                                fd,
+                                random_string,
+                                alllinks,
+                                link_syncer,
+                                new_files,
+                            ):
+                                continue
+                            p = next(payload_generator)
+                            allfiles.append(p)
+                            if links is not None:
+                                links.add(str(p))
+                            if metadata is not None:
+                                # Payloads may create files outside of root
+                                in_root = p.parent == Path(root)
+                                metadata.apply(
+                                    str(p), dir_fd=fd if in_root else None
+                                )
+                            if stats is not None and str(p) not in existing:
+                                existing.add(str(p))
+                                created_files += 1
+                                size += os.stat(str(p)).st_size
+                            if sync_files:
+                                new_files.append(str(p))
+                                syncer.file_created(new_files[-1], root, fd)
+                    if sync_files:
+                        n_symlinks = sum(
+                            kind == "symlink"
+                            for _, kind, _ in alllinks[n_links:]
+                        )
+                        syncer.directory_filled(
+                            root, fd, new_files, created_folders, n_symlinks
+                        )
+                    if stats is not None:
+                        stats.add_dirs(depth + 1, created_folders)
+                        stats.add_files(depth + 1, created_files, size)
+                finally:
+                    _close_dir(fd)
+            level = next_level
+            depth += 1
+    syncer.finish([str(basedir)])
+    if stats is not None:
+        stats.stop()
 
     alldirs = list(set(alldirs))
     allfiles = list(set(allfiles))
+    if manifest is not None:
+        for d in alldirs:
+            manifest.add(d, "dir")
+        manifest.add_files(allfiles)
+        for path, kind, target in alllinks:
+            if kind == "hardlink":
+                target = os.path.relpath(target, str(manifest.basedir))
+            manifest.add(path, kind, target=target)
     return alldirs, allfiles
 
 
@@ -113,6 +380,11 @@ def iterative_gaussian_tree(
     min_files: int = 0,
     filename: Callable = random_string,
     payload: Optional[Callable[[Path], Generator[Path, None, None]]] = None,
+    manifest: Optional[Manifest] = None,
+    stats: Optional[TreeStats] = None,
+    durability: str = "none",
+    metadata: Optional[Metadata] = None,
+    links: Optional[Links] = None,
 ) -> Tuple[List[Path], List[Path]]:
     """
     Create a random set of files and folders by repeatedly walking through the
@@ -140,21 +412,34 @@ def iterative_gaussian_tree(
             if both are passed. Takes Path object as catalog where to create
             file and returns Path of created file.
             If this option is not specified, all created files will be empty.
+        manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+            created directories and files in
+        stats: :class:`~randomfiletree.stats.TreeStats` to collect
+            statistics of the created directories and files in
+        durability: When to flush the created entries to disk, see
+            :func:`iterative_tree`
+        metadata: Random timestamps and permissions of the created files,
+            see :func:`iterative_tree`
+        links: Shares of the files that are created as hardlinks or
+            symbolic links, see :func:`iterative_tree`
 
     Returns:
        (List of dirs, List of files), all as :class:`pathlib.Path` objects.
     """
 
-    # noinspection PyUnusedLocal
-    @no_type_check
-    def nfolders_func(*args):
-        return max(min_folders, int(random.gauss(nfolders, sigma_folders)))
-
-    # noinspection PyUnusedLocal
-    @no_type_check
-    def nfiles_func(*args):
-        return max(min_files, int(random.gauss(nfiles, sigma_files)))
-
+    # Draw the numbers in batches instead of once per directory. Always with
+    # :mod:`random`, so that the tree for a given seed does not depend on
+    # whether NumPy is installed.
+    nfolders_func = BatchSampler(
+        "gauss",
+        mean=nfolders,
+        sigma=sigma_folders,
+        min=min_folders,
+        use_numpy=False,
+    )
+    nfiles_func = BatchSampler(
+        "gauss", mean=nfiles, sigma=sigma_files, min=min_files, use_numpy=False
+    )
     return iterative_tree(
         basedir=basedir,
         nfiles_func=nfiles_func,
@@ -163,11 +448,215 @@ def iterative_gaussian_tree(
         maxdepth=maxdepth,
         filename=filename,
         payload=payload,
+        manifest=manifest,
+        stats=stats,
+        durability=durability,
+        metadata=metadata,
+        links=links,
     )
 
 
+def _scan_tree_strings(
+    basedir: Union[str, PurePath],
+) -> Tuple[List[str], List[str]]:
+    """All directories and files below ``basedir`` as strings (cheaper than
+    building pathlib.Path objects if only few of them are used).
+
+    Returns:
+        (List of dirs, List of files)
+    """
+    alldirs = []
+    allfiles = []
+    for root, dirs, files in os.walk(str(basedir)):
+        for d in dirs:
+            alldirs.append(os.path.join(root, d))
+        for file in files:
+            allfiles.append(os.path.join(root, file))
+    return alldirs, allfiles
+
+
+def _scan_tree(basedir: Union[str, PurePath]) -> Tuple[List[Path], List[Path]]:
+    """All directories and files below ``basedir``.
+
+    Returns:
+        (List of dirs, List of files), all as pathlib.Path objects.
+    """
+    alldirs, allfiles = _scan_tree_strings(basedir)
+    return [Path(d) for d in alldirs], [Path(f) for f in allfiles]
+
+
+class _DirRecord:
+    """Listing of a single directory as seen by :class:`ScanCache`."""
+
+    __slots__ = ("mtime_ns", "racy", "dirs", "files", "links")
+
+    def __init__(self, path: str, racy_ns: int):
+        listed_ns = time.time_ns()
+        self.mtime_ns = os.stat(path).st_mtime_ns
+        # Changes within the timestamp granularity of the file system don't
+        # necessarily change the mtime, so don't trust recent mtimes.
+        self.racy = self.mtime_ns + racy_ns >= listed_ns
+        self.dirs: List[str] = []
+        self.files: List[str] = []
+        # Symlinks to directories: Listed as directories, but (as with
+        # os.walk) not descended into
+        self.links: List[str] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    self.dirs.append(entry.name)
+                    if entry.is_symlink():
+                        self.links.append(entry.name)
+                else:
+                    self.files.append(entry.name)
+
+
+class _Scan:
+    """Cached scan of one tree."""
+
+    def __init__(self, basedir: str, racy_ns: int):
+        self.basedir = basedir
+        self.racy_ns = racy_ns
+        self.records: Dict[str, _DirRecord] = {}
+        self.result: Optional[Tuple[List[Path], List[Path]]] = None
+        self._add(basedir)
+
+    def _add(self, path: str) -> None:
+        """Scan subtree of ``path``."""
+        stack = [path]
+        while stack:
+            path = stack.pop()
+            try:
+                record = _DirRecord(path, self.racy_ns)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            self.records[path] = record
+            stack.extend(
+                os.path.join(path, d)
+                for d in record.dirs
+                if d not in record.links
+            )
+
+    def _drop(self, path: str) -> None:
+        """Forget subtree of ``path``."""
+        stack = [path]
+        while stack:
+            path = stack.pop()
+            record = self.records.pop(path, None)
+            if record is not None:
+                stack.extend(
+                    os.path.join(path, d)
+                    for d in record.dirs
+                    if d not in record.links
+                )
+
+    def refresh(self) -> None:
+        """Rescan all directories whose mtime changed."""
+        for path in list(self.records):
+            old = self.records.get(path)
+            if old is None:
+                # Parent directory was removed in the meantime
+                continue
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                self._drop(path)
+                self.result = None
+                continue
+            if mtime_ns == old.mtime_ns and not old.racy:
+                continue
+            try:
+                new = _DirRecord(path, self.racy_ns)
+            except (FileNotFoundError, NotADirectoryError):
+                self._drop(path)
+                self.result = None
+                continue
+            self.records[path] = new
+            if (new.dirs, new.files, new.links) == (
+                old.dirs,
+                old.files,
+                old.links,
+            ):
+                continue
+            self.result = None
+            old_descended = set(old.dirs) - set(old.links)
+            new_descended = set(new.dirs) - set(new.links)
+            for d in old_descended - new_descended:
+                self._drop(os.path.join(path, d))
+            for d in new_descended - old_descended:
+                self._add(os.path.join(path, d))
+
+    def get(self) -> Tuple[List[Path], List[Path]]:
+        if self.result is None:
+            alldirs = []
+            allfiles = []
+            for path, record in self.records.items():
+                for d in record.dirs:
+                    alldirs.append(Path(path, d))
+                for f in record.files:
+                    allfiles.append(Path(path, f))
+            self.result = alldirs, allfiles
+        return self.result
+
+
+class ScanCache:
+    """
+    Least recently used cache of the directories and files of trees, e.g. to
+    speed up repeated calls of :func:`choose_random_elements` and
+    :func:`sample_random_elements` on the same tree.
+
+    Before a cached scan is used, the modification times of all of its
+    directories are checked and only directories that changed are listed
+    again, so the result stays correct if the tree changes. Directories
+    modified less than ``racy_seconds`` before they were listed are always
+    listed again, because changes within the timestamp granularity of the
+    file system might not be visible in their modification times.
+
+    Args:
+        maxsize: Maximal number of trees to keep
+        racy_seconds: See above
+    """
+
+    def __init__(self, maxsize: int = 8, racy_seconds: float = 1.0):
+        self.maxsize = maxsize
+        self.racy_ns = int(racy_seconds * 1e9)
+        self._scans: "OrderedDict[str, _Scan]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._scans)
+
+    def clear(self) -> None:
+        self._scans.clear()
+
+    def scan(
+        self, basedir: Union[str, PurePath]
+    ) -> Tuple[List[Path], List[Path]]:
+        """
+        All directories and files below ``basedir``.
+
+        Returns:
+            (List of dirs, List of files), all as pathlib.Path objects. The
+            lists are shared between calls and must not be modified.
+        """
+        key = os.path.abspath(str(basedir))
+        scan = self._scans.get(key)
+        if scan is None:
+            scan = _Scan(str(basedir), self.racy_ns)
+            self._scans[key] = scan
+            while len(self._scans) > self.maxsize:
+                self._scans.popitem(last=False)
+        else:
+            self._scans.move_to_end(key)
+            scan.refresh()
+        return scan.get()
+
+
 def choose_random_elements(
-    basedir: str, n_dirs: int, n_files: int, onfail: str = "raise"
+    basedir: str,
+    n_dirs: int,
+    n_files: int,
+    onfail: str = "raise",
+    cache: Optional[ScanCache] = None,
 ) -> Tuple[List[Path], List[Path]]:
     """
     Select random files and directories. If all directories and files must be
@@ -179,16 +668,14 @@ def choose_random_elements(
         n_files: Number of files to pick
         onfail: What to do if there are no files or folders to pick from?
             Either 'raise' (raise ValueError) or 'ignore' (return empty list)
+        cache: :class:`ScanCache` to reuse the scan of previous calls
     Returns:
         (List of dirs, List of files), all as pathlib.Path objects.
     """
-    alldirs = []
-    allfiles = []
-    for root, dirs, files in os.walk(str(basedir)):
-        for d in dirs:
-            alldirs.append(Path(root) / d)
-        for file in files:
-            allfiles.append(Path(root) / file)
+    if cache is None:
+        alldirs, allfiles = _scan_tree(basedir)
+    else:
+        alldirs, allfiles = cache.scan(basedir)
     if n_dirs and not alldirs:
         if onfail == "raise":
             raise ValueError(
@@ -215,7 +702,11 @@ def choose_random_elements(
 
 
 def sample_random_elements(
-    basedir: str, n_dirs: int, n_files: int, onfail: str = "raise"
+    basedir: str,
+    n_dirs: int,
+    n_files: int,
+    onfail: str = "raise",
+    cache: Optional[ScanCache] = None,
 ) -> Tuple[List[Path], List[Path]]:
     """
     Select random distinct files and directories. If the directories and files
@@ -228,16 +719,14 @@ def sample_random_elements(
         onfail: What to do if there are no files or folders to pick from?
             Either 'raise' (raise ValueError) or 'ignore' (return list with
             fewer elements)
+        cache: :class:`ScanCache` to reuse the scan of previous calls
     Returns:
         (List of dirs, List of files), all as pathlib.Path objects.
     """
-    alldirs = []
-    allfiles = []
-    for root, dirs, files in os.walk(str(basedir)):
-        for d in dirs:
-            alldirs.append(Path(root) / d)
-        for file in files:
-            allfiles.append(Path(root) / file)
+    if cache is None:
+        alldirs, allfiles = _scan_tree(basedir)
+    else:
+        alldirs, allfiles = cache.scan(basedir)
     if n_dirs and len(alldirs) < n_dirs:
         if onfail == "raise":
             raise ValueError(
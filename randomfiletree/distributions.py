@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+
+from typing import Any, Callable, Dict, List, Optional, Union
+import math
+import random
+import threading
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+#: Function(generator, n, **params) that draws ``n`` values from a
+#: distribution with a :class:`random.Random` generator (or the module
+#: :mod:`random` itself)
+BatchFunction = Callable[..., List[float]]
+
+
+def _constant(rng: Any, n: int, value: float = 0) -> List[float]:
+    return [value] * n
+
+
+def _uniform(rng: Any, n: int, low: float = 0, high: float = 1) -> List[float]:
+    return [rng.uniform(low, high) for _ in range(n)]
+
+
+def _gauss(rng: Any, n: int, mean: float = 0, sigma: float = 1) -> List[float]:
+    gauss = rng.gauss
+    return [gauss(mean, sigma) for _ in range(n)]
+
+
+def _choice(
+    rng: Any, n: int, values: List[float], weights: Optional[List[float]] = None
+) -> List[float]:
+    return rng.choices(values, weights, k=n)
+
+
+def _poisson_one(rng: Any, lam: float) -> int:
+    if lam < 10:
+        # Knuth: Multiply uniform numbers until the product drops below
+        # exp(-lam)
+        limit = math.exp(-lam)
+        k = 0
+        product = rng.random()
+        while product > limit:
+            k += 1
+            product *= rng.random()
+        return k
+    # Transformed rejection with squeeze (Hoermann, PTRS), as used by NumPy
+    slam = math.sqrt(lam)
+    loglam = math.log(lam)
+    b = 0.931 + 2.53 * slam
+    a = -0.059 + 0.02483 * b
+    invalpha = 1.1239 + 1.1328 / (b - 3.4)
+    vr = 0.9277 - 3.6224 / (b - 2)
+    while True:
+        u = rng.random() - 0.5
+        v = rng.random()
+        us = 0.5 - abs(u)
+        k = math.floor((2 * a / us + b) * u + lam + 0.43)
+        if us >= 0.07 and v <= vr:
+            return k
+        if k < 0 or (us < 0.013 and v > us):
+            continue
+        if math.log(v) + math.log(invalpha) - math.log(
+            a / (us * us) + b
+        ) <= -lam + k * loglam - math.lgamma(k + 1):
+            return k
+
+
+def _poisson(rng: Any, n: int, lam: float = 1) -> List[float]:
+    if lam < 0:
+        raise ValueError("'lam' must not be negative.")
+    return [_poisson_one(rng, lam) for _ in range(n)]
+
+
+def _negative_binomial(
+    rng: Any, n: int, k: float = 1, p: float = 0.5
+) -> List[float]:
+    # Gamma-Poisson mixture: Number of failures before the k-th success
+    if k <= 0 or not 0 < p <= 1:
+        raise ValueError("Need k > 0 and 0 < p <= 1.")
+    scale = (1 - p) / p
+    return [
+        _poisson_one(rng, rng.gammavariate(k, scale)) if scale else 0
+        for _ in range(n)
+    ]
+
+
+def _lognormal(
+    rng: Any, n: int, mu: float = 0, sigma: float = 1
+) -> List[float]:
+    return [rng.lognormvariate(mu, sigma) for _ in range(n)]
+
+
+def _zipf_one(rng: Any, a: float) -> float:
+    # Rejection method of Devroye (Non-Uniform Random Variate Generation)
+    am1 = a - 1
+    b = 2**am1
+    while True:
+        u = 1 - rng.random()
+        v = rng.random()
+        try:
+            x = math.floor(u ** (-1 / am1))
+        except OverflowError:
+            continue
+        t = (1 + 1 / x) ** am1
+        if v * x * (t - 1) / (b - 1) <= t / b:
+            return x
+
+
+def _zipf(rng: Any, n: int, a: float = 2) -> List[float]:
+    if a <= 1:
+        raise ValueError("'a' must be larger than 1.")
+    return [_zipf_one(rng, a) for _ in range(n)]
+
+
+def _pareto(rng: Any, n: int, alpha: float = 1, xmin: float = 1) -> List[float]:
+    if alpha <= 0:
+        raise ValueError("'alpha' must be positive.")
+    return [xmin * rng.paretovariate(alpha) for _ in range(n)]
+
+
+def _histogram(
+    rng: Any,
+    n: int,
+    low: List[float],
+    high: List[float],
+    weights: Optional[List[float]] = None,
+) -> List[float]:
+    if len(low) != len(high) or (
+        weights is not None and len(weights) != len(low)
+    ):
+        raise ValueError("'low', 'high' and 'weights' need the same length.")
+    uniform = rng.uniform
+    return [
+        uniform(low[i], high[i])
+        for i in rng.choices(range(len(low)), weights, k=n)
+    ]
+
+
+def _numpy_histogram(
+    rng: Any,
+    n: int,
+    low: List[float],
+    high: List[float],
+    weights: Optional[List[float]] = None,
+) -> Any:
+    bins = rng.choice(
+        len(low),
+        n,
+        p=None if weights is None else numpy.divide(weights, sum(weights)),
+    )
+    low_ = numpy.asarray(low, dtype=float)[bins]
+    high_ = numpy.asarray(high, dtype=float)[bins]
+    return low_ + rng.random(n) * (high_ - low_)
+
+
+#: Available distributions: name -> function that draws a batch of values
+DISTRIBUTIONS: Dict[str, BatchFunction] = {
+    "constant": _constant,
+    "uniform": _uniform,
+    "gauss": _gauss,
+    "choice": _choice,
+    "poisson": _poisson,
+    "negative_binomial": _negative_binomial,
+    "lognormal": _lognormal,
+    "zipf": _zipf,
+    "pareto": _pareto,
+    "histogram": _histogram,
+}
+
+#: Backend that :class:`BatchSampler` draws values with by default
+DEFAULT_BACKEND = "numpy" if numpy is not None else "python"
+
+#: Vectorized versions of the distributions:
+#: name -> Function(generator, n, **params)
+NUMPY_DISTRIBUTIONS: Dict[str, Callable[..., Any]] = {
+    "constant": lambda rng, n, value=0: numpy.full(n, value),
+    "uniform": lambda rng, n, low=0, high=1: rng.uniform(low, high, n),
+    "gauss": lambda rng, n, mean=0, sigma=1: rng.normal(mean, sigma, n),
+    "choice": lambda rng, n, values, weights=None: rng.choice(
+        values,
+        n,
+        p=None if weights is None else numpy.divide(weights, sum(weights)),
+    ),
+    "poisson": lambda rng, n, lam=1: rng.poisson(lam, n),
+    "negative_binomial": lambda rng, n, k=1, p=0.5: rng.negative_binomial(
+        k, p, n
+    ),
+    "lognormal": lambda rng, n, mu=0, sigma=1: rng.lognormal(mu, sigma, n),
+    "zipf": lambda rng, n, a=2: rng.zipf(a, n),
+    "pareto": lambda rng, n, alpha=1, xmin=1: xmin * (rng.pareto(alpha, n) + 1),
+    "histogram": _numpy_histogram,
+}
+
+
+def parse_distribution(text: str) -> Dict[str, Any]:
+    """
+    Parse short description of a distribution as used by the command line
+    interface, e.g. ``poisson:lam=3`` or ``lognormal:mu=8,sigma=2,max=1e6``.
+    A plain number means a constant.
+
+    Returns:
+        Dictionary of arguments of :class:`BatchSampler`
+    """
+    try:
+        return {"distribution": "constant", "value": float(text)}
+    except ValueError:
+        pass
+    name, _, params = text.partition(":")
+    result: Dict[str, Any] = {"distribution": name}
+    for param in filter(None, params.split(",")):
+        key, sep, value = param.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid parameter '{param}' (need key=value).")
+        result[key.strip()] = float(value)
+    return result
+
+
+class BatchSampler:
+    """
+    Draws integers from a distribution. Values are drawn in batches (with
+    NumPy if available), so that getting the next value is cheap.
+
+    Available distributions and their parameters:
+
+    * ``constant``: ``value``
+    * ``uniform``: ``low``, ``high``
+    * ``gauss``: ``mean``, ``sigma``
+    * ``choice``: ``values``, ``weights`` (optional)
+    * ``poisson``: ``lam``
+    * ``negative_binomial``: ``k`` (number of successes), ``p`` (success
+      probability); number of failures before the ``k``-th success
+    * ``lognormal``: ``mu``, ``sigma`` (of the underlying normal
+      distribution)
+    * ``zipf``: ``a`` (exponent, > 1)
+    * ``pareto``: ``alpha`` (exponent), ``xmin`` (smallest value)
+    * ``histogram``: ``low``, ``high`` (lists of the bounds of the bins),
+      ``weights`` (optional); uniform within the chosen bin, e.g. fitted by
+      :class:`randomfiletree.profile.TreeProfile`
+
+    Args:
+        distribution: Name of the distribution
+        min: Smaller values are replaced by this value
+        max: Larger values are replaced by this value
+        batch_size: Number of values to draw at once
+        use_numpy: Use NumPy to draw values. Default: If installed. The
+            random generator of NumPy is seeded from :mod:`random`, so that
+            results are reproducible with :func:`random.seed`.
+        rng: :class:`random.Random` generator to draw values with (or to
+            seed the generator of NumPy from). Default: The global generator
+            of :mod:`random`.
+        **params: Parameters of the distribution
+
+    Samplers can be shared between threads. For reproducible results, give
+    every thread its own sampler with :meth:`spawn`.
+    """
+
+    def __init__(
+        self,
+        distribution: str = "constant",
+        min: Optional[float] = 0,
+        max: Optional[float] = None,
+        batch_size: int = 1024,
+        use_numpy: Optional[bool] = None,
+        rng: Optional[random.Random] = None,
+        **params: Any,
+    ):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}'.")
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        if use_numpy and numpy is None:
+            raise ImportError("NumPy is required for 'use_numpy=True'.")
+        self.distribution = distribution
+        self._draw = DISTRIBUTIONS[distribution]
+        self._random: Any = random if rng is None else rng
+        # Fail early on invalid parameters
+        self._draw(self._random, 0, **params)
+        self._rng = None
+        if use_numpy:
+            self._rng = numpy.random.default_rng(self._random.getrandbits(64))
+            self._draw_numpy = NUMPY_DISTRIBUTIONS[distribution]
+        self.params = params
+        self.min = min
+        self.max = max
+        self.batch_size = batch_size
+        self._batch: List[int] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: Union[float, Dict[str, Any]]) -> "BatchSampler":
+        """
+        Create sampler from a number (constant) or a dictionary with the key
+        ``distribution`` and the other arguments of :class:`BatchSampler`.
+        """
+        if isinstance(spec, (int, float)):
+            return cls("constant", value=spec)
+        return cls(**spec)
+
+    def spawn(self, rng: random.Random) -> "BatchSampler":
+        """
+        Independent sampler of the same distribution that draws its values
+        with ``rng``, e.g. for one of several threads.
+        """
+        return BatchSampler(
+            self.distribution,
+            min=self.min,
+            max=self.max,
+            batch_size=self.batch_size,
+            use_numpy=self._rng is not None,
+            rng=rng,
+            **self.params,
+        )
+
+    def _refill(self) -> None:
+        if self._rng is not None:
+            values = self._draw_numpy(self._rng, self.batch_size, **self.params)
+            # Avoid overflows when converting to integers
+            high = 2**62 if self.max is None else self.max
+            values = numpy.clip(values, self.min, high)
+            # Values are popped from the end
+            self._batch = values[::-1].astype(numpy.int64).tolist()
+            return
+        values = self._draw(self._random, self.batch_size, **self.params)
+        lo, hi = self.min, self.max
+        batch = []
+        for value in values:
+            if lo is not None and value < lo:
+                value = lo
+            if hi is not None and value > hi:
+                value = hi
+            batch.append(int(value))
+        # Values are popped from the end
+        batch.reverse()
+        self._batch = batch
+
+    def __call__(self, *args: Any) -> int:
+        """Next value. Arguments are ignored, so the sampler can be used
+        as ``nfolders_func`` of :func:`randomfiletree.core.iterative_tree`.
+        """
+        with self._lock:
+            if not self._batch:
+                self._refill()
+            return self._batch.pop()
+
+    def sample(self, n: int) -> List[int]:
+        """Next ``n`` values."""
+        return [self() for _ in range(n)]
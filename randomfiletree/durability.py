@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+from typing import Any, List, Optional, Sequence, Set
+import ctypes
+import os
+import sys
+import time
+
+# ours
+from randomfiletree.stats import TreeStats
+
+#: Available durability policies, see :class:`Syncer`
+DURABILITY_POLICIES = ("none", "file", "directory", "end")
+
+
+def _load_syncfs() -> Any:
+    """``syncfs`` of the C library or None if not available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):  # pragma: no cover
+        return None
+
+
+_syncfs = _load_syncfs()
+
+
+def _fsync_path(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: str, fd: Optional[int]) -> None:
+    """Flush directory entries. Skipped on platforms where directories can't
+    be opened (Windows).
+    """
+    if fd is not None:
+        os.fsync(fd)
+        return
+    try:
+        _fsync_path(path)
+    except (IsADirectoryError, PermissionError):  # pragma: no cover
+        pass
+
+
+def sync_filesystem(path: str) -> None:
+    """
+    Flush all data of the file system that contains ``path`` to disk with
+    ``syncfs``. Where this is not available, all file systems are flushed
+    (``sync``).
+    """
+    if _syncfs is None:
+        os.sync()
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if _syncfs(fd) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+    finally:
+        os.close(fd)
+
+
+class Syncer:
+    """
+    Makes created entries durable according to a policy and measures the
+    time spent for this (added to ``sync_time`` and ``n_syncs`` of a
+    :class:`~randomfiletree.stats.TreeStats`).
+
+    Policies:
+
+    * ``none``: Nothing is flushed explicitly.
+    * ``file``: Every file is flushed (``fsync``) right after it was
+      written, followed by its directory, so that it is durable before the
+      next entry is created.
+    * ``directory``: Once all entries of a directory are created, its new
+      files and then the directory itself are flushed. The file system can
+      write back the files of a directory together.
+    * ``end``: The file systems of the base directories are flushed once at
+      the end (``syncfs`` on Linux, else ``sync``).
+
+    Args:
+        policy: One of :data:`DURABILITY_POLICIES`
+        stats: Statistics to add the time spent for flushing to
+    """
+
+    def __init__(self, policy: str = "none", stats: Optional[TreeStats] = None):
+        if policy not in DURABILITY_POLICIES:
+            raise ValueError(
+                f"Unknown durability policy '{policy}'. Choose from "
+                f"{', '.join(DURABILITY_POLICIES)}."
+            )
+        self.policy = policy
+        self.stats = stats
+        # Without os.sync (Windows), the 'end' policy flushes the files
+        # one by one.
+        self._pending: Optional[List[str]] = None
+        if policy == "end" and _syncfs is None and not hasattr(os, "sync"):
+            self._pending = []  # pragma: no cover
+
+    def _record(self, start: float, n_syncs: int) -> None:
+        if self.stats is not None:
+            self.stats.sync_time += time.perf_counter() - start
+            self.stats.n_syncs += n_syncs
+
+    def file_created(
+        self, path: str, dir_path: str, dir_fd: Optional[int]
+    ) -> None:
+        """Called after file ``path`` in directory ``dir_path`` (with
+        descriptor ``dir_fd``) was written.
+        """
+        if self.policy == "file":
+            start = time.perf_counter()
+            _fsync_path(path)
+            _fsync_dir(dir_path, dir_fd)
+            self._record(start, 2)
+        elif self._pending is not None:
+            self._pending.append(path)  # pragma: no cover
+
+    def directory_filled(
+        self,
+        dir_path: str,
+        dir_fd: Optional[int],
+        files: Sequence[str],
+        n_dirs: int,
+        n_symlinks: int = 0,
+    ) -> None:
+        """Called after ``n_dirs`` subdirectories, ``n_symlinks`` symbolic
+        links and the files ``files`` (including hardlinks) were created in
+        directory ``dir_path``. Symbolic links are durable with their
+        directory.
+        """
+        if self.policy == "directory" and (files or n_dirs or n_symlinks):
+            start = time.perf_counter()
+            for path in files:
+                _fsync_path(path)
+            _fsync_dir(dir_path, dir_fd)
+            self._record(start, len(files) + 1)
+        elif self.policy == "file" and (n_dirs or n_symlinks):
+            # Files already flushed their directory
+            start = time.perf_counter()
+            _fsync_dir(dir_path, dir_fd)
+            self._record(start, 1)
+
+    def finish(self, basedirs: Sequence[str]) -> None:
+        """Called once all entries below ``basedirs`` were created."""
+        if self.policy != "end":
+            return
+        start = time.perf_counter()
+        if self._pending is not None:  # pragma: no cover
+            for path in self._pending:
+                _fsync_path(path)
+            self._record(start, len(self._pending))
+            self._pending = []
+            return
+        if _syncfs is None:
+            os.sync()
+            self._record(start, 1)
+            return
+        devices: Set[int] = set()
+        for basedir in basedirs:
+            device = os.stat(basedir).st_dev
+            if device not in devices:
+                devices.add(device)
+                sync_filesystem(basedir)
+        self._record(start, len(devices))
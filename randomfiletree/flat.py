@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import random
+import time
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import _close_dir, _open_dir
+from randomfiletree.durability import Syncer
+from randomfiletree.manifest import Manifest, new_checksum
+from randomfiletree.metadata import Metadata
+from randomfiletree.stats import TreeStats
+
+#: Name schemes of :func:`flat_tree`
+NAME_SCHEMES = ("random", "sequential")
+
+_MASK = 2**64 - 1
+
+
+class _Names:
+    """Collision-free file names, computed from the index of the entry.
+
+    Random names scramble the index with a bijection of 64 bit integers
+    (multiplication by an odd number and xor with a key), so names can be
+    generated in independent batches without remembering the ones that were
+    already used.
+    """
+
+    def __init__(self, scheme: str, prefix: str, n: int):
+        if scheme not in NAME_SCHEMES:
+            raise ValueError(
+                f"Unknown name scheme '{scheme}'. Choose from "
+                f"{', '.join(NAME_SCHEMES)}."
+            )
+        self.scheme = scheme
+        self.prefix = prefix
+        self.width = len(str(max(n - 1, 0)))
+        self.multiplier = random.getrandbits(64) | 1
+        self.key = random.getrandbits(64)
+
+    def batch(self, start: int, stop: int) -> List[str]:
+        prefix = self.prefix
+        if self.scheme == "sequential":
+            width = self.width
+            return [f"{prefix}{i:0{width}d}" for i in range(start, stop)]
+        multiplier, key = self.multiplier, self.key
+        return [
+            f"{prefix}{(i * multiplier & _MASK) ^ key:016X}"
+            for i in range(start, stop)
+        ]
+
+
+class FlatReport:
+    """
+    Result of :func:`flat_tree`.
+
+    Attributes:
+        basedir: Directory that was filled
+        n_entries: Number of entries that were requested
+        created: Number of entries that were actually created (names that
+            existed already are skipped)
+        elapsed: Total run time in seconds
+        curve: Creation rate as the directory grows: List of (number of
+            entries created so far, entries per second since the previous
+            point)
+    """
+
+    def __init__(self, basedir: Path, n_entries: int, names: _Names):
+        self.basedir = basedir
+        self.n_entries = n_entries
+        self.created = 0
+        self.elapsed = 0.0
+        self.curve: List[Tuple[int, float]] = []
+        self._names = names
+
+    @property
+    def entries_per_second(self) -> float:
+        """Average creation rate."""
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+    def names(self, batch_size: int = 65536) -> Iterator[str]:
+        """Names of all (requested) entries, without building Path
+        objects.
+        """
+        for start in range(0, self.n_entries, batch_size):
+            stop = min(start + batch_size, self.n_entries)
+            yield from self._names.batch(start, stop)
+
+    @property
+    def files(self) -> List[Path]:
+        """All (requested) entries as pathlib.Path objects."""
+        return [self.basedir / name for name in self.names()]
+
+    def format(self) -> str:
+        """Creation rate curve as human readable text."""
+        lines = [
+            f"Created {self.created} entries in {self.elapsed:.3f} s "
+            f"({self.entries_per_second:.0f} entries/s)",
+            f"{'entries':>12} {'entries/s':>12}",
+        ]
+        for n, rate in self.curve:
+            lines.append(f"{n:>12} {rate:>12.0f}")
+        return "\n".join(lines)
+
+
+def _create_batch(
+    basedir: str,
+    fd: Optional[int],
+    names: _Names,
+    start: int,
+    stop: int,
+    data: bytes,
+    durability: str,
+    metadata: Optional[Metadata],
+) -> Tuple[List[str], TreeStats]:
+    """Create the files with the indices ``start`` to ``stop`` in
+    ``basedir``. Returns the names of the created files and the statistics
+    of flushing them to disk.
+    """
+    stats = TreeStats()
+    syncer = Syncer(durability, stats)
+    sync_files = durability in ("file", "directory")
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    created = []
+    synced = []
+    for name in names.batch(start, stop):
+        try:
+            if fd is None:
+                file_fd = os.open(os.path.join(basedir, name), flags, 0o666)
+            else:
+                file_fd = os.open(name, flags, 0o666, dir_fd=fd)
+        except FileExistsError:
+            continue
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(file_fd, view) :]
+            if metadata is not None:
+                metadata.apply(os.path.join(basedir, name), fd=file_fd)
+        finally:
+            os.close(file_fd)
+        created.append(name)
+        if sync_files:
+            synced.append(os.path.join(basedir, name))
+            syncer.file_created(synced[-1], basedir, fd)
+    # Files of a batch are flushed together
+    syncer.directory_filled(basedir, fd, synced, 0)
+    return created, stats
+
+
+def flat_tree(
+    basedir: Union[str, PurePath],
+    n_entries: int,
+    workers: int = 4,
+    batch_size: int = 1000,
+    names: str = "random",
+    prefix: str = "",
+    size: int = 0,
+    report_every: Optional[int] = None,
+    manifest: Optional[Manifest] = None,
+    stats: Optional[TreeStats] = None,
+    durability: str = "none",
+    metadata: Optional[Metadata] = None,
+) -> FlatReport:
+    """
+    Fill a single directory with a huge number of files, e.g. to test the
+    behavior of file systems and tools with millions of entries per
+    directory.
+
+    Names are generated in batches from the index of the entry, so that they
+    are unique without any lookups, and the batches are created in parallel
+    relative to one open file descriptor of the directory (where supported).
+
+    Args:
+        basedir: Directory to fill
+        n_entries: Number of files to create
+        workers: Number of parallel workers
+        batch_size: Number of files created by a worker at once
+        names: ``random`` (random looking, but collision-free 16 character
+            names) or ``sequential`` (zero-padded running numbers)
+        prefix: Prefix of all names
+        size: Size of every file in bytes
+        report_every: Add a point to the creation rate curve every time
+            this many more entries were created. Default: 20 points.
+        manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+            created files in
+        stats: :class:`~randomfiletree.stats.TreeStats` to collect
+            statistics of the created files in
+        durability: When to flush the created files to disk, see
+            :func:`randomfiletree.core.iterative_tree` (with ``directory``,
+            every batch is flushed together)
+        metadata: :class:`~randomfiletree.metadata.Metadata` with random
+            timestamps and permissions to apply to the created files
+
+    Returns:
+        :class:`FlatReport`
+    """
+    if batch_size < 1:
+        raise ValueError("'batch_size' must be positive.")
+    basedir = Path(basedir)
+    basedir.mkdir(parents=True, exist_ok=True)
+    report = FlatReport(basedir, n_entries, _Names(names, prefix, n_entries))
+    syncer = Syncer(durability, stats)
+    if report_every is None:
+        report_every = max(n_entries // 20, 1)
+    data = os.urandom(size)
+    if stats is not None:
+        stats.start()
+    fd = _open_dir(str(basedir))
+    start = time.perf_counter()
+    last_n, last_time = 0, start
+    created_names: List[str] = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            jobs = [
+                executor.submit(
+                    _create_batch,
+                    str(basedir),
+                    fd,
+                    report._names,
+                    i,
+                    min(i + batch_size, n_entries),
+                    data,
+                    durability,
+                    metadata,
+                )
+                for i in range(0, n_entries, batch_size)
+            ]
+            for job in as_completed(jobs):
+                created, sync_stats = job.result()
+                report.created += len(created)
+                if manifest is not None:
+                    created_names.extend(created)
+                if stats is not None:
+                    stats.merge(sync_stats)
+                if report.created - last_n >= report_every:
+                    now = time.perf_counter()
+                    report.curve.append(
+                        (
+                            report.created,
+                            (report.created - last_n) / (now - last_time),
+                        )
+                    )
+                    last_n, last_time = report.created, now
+        if report.created > last_n:
+            now = time.perf_counter()
+            report.curve.append(
+                (report.created, (report.created - last_n) / (now - last_time))
+            )
+        syncer.finish([str(basedir)])
+    finally:
+        _close_dir(fd)
+    report.elapsed = time.perf_counter() - start
+    if stats is not None:
+        stats.add_files(1, report.created, report.created * size)
+        stats.stop()
+    if manifest is not None:
+        # All created files have the same content, so it is hashed only once
+        # instead of reading the files again
+        content: Dict[str, Any] = {}
+        if manifest.checksum:
+            checksum = new_checksum(manifest.checksum)
+            checksum.update(data)
+            content = {"size": size, "checksum": checksum.hexdigest()}
+        for name in created_names:
+            manifest.add(basedir / name, "file", **content)
+        # Files that existed already
+        manifest.add_files(
+            (basedir / name for name in report.names()), workers=workers
+        )
+    return report
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+from typing import Dict, List, Sequence
+import math
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentile of a list of values (nearest rank method).
+
+    Args:
+        values: Values, sorted in ascending order
+        q: Percentile between 0 and 100
+
+    Returns:
+        Percentile or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(values)) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+class LatencyRecorder:
+    """
+    Collect latencies of operations of different kinds and summarize them
+    by percentiles.
+    """
+
+    #: Percentiles reported by :meth:`summary`
+    percentiles = (50, 90, 99, 99.9)
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {}
+
+    def record(self, op: str, seconds: float) -> None:
+        """Record the latency of one operation of kind ``op``."""
+        self.latencies.setdefault(op, []).append(seconds)
+
+    def merge(self, other: "LatencyRecorder") -> None:
+        """Add the latencies recorded by another recorder (e.g. of another
+        thread).
+        """
+        for op, values in other.latencies.items():
+            self.latencies.setdefault(op, []).extend(values)
+
+    def count(self, op: str) -> int:
+        """Number of recorded operations of kind ``op``."""
+        return len(self.latencies.get(op, []))
+
+    def percentile(self, op: str, q: float) -> float:
+        """Percentile ``q`` (between 0 and 100) of the latencies of the
+        operations of kind ``op`` in seconds.
+        """
+        return percentile(sorted(self.latencies.get(op, [])), q)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summary of all latencies.
+
+        Returns:
+            Dictionary op -> {"count": ..., "p50": ..., ..., "max": ...} with
+            latencies in seconds.
+        """
+        result = {}
+        for op, values in self.latencies.items():
+            values = sorted(values)
+            summary = {"count": float(len(values))}
+            for q in self.percentiles:
+                summary[f"p{q:g}"] = percentile(values, q)
+            summary["max"] = values[-1]
+            result[op] = summary
+        return result
+
+    def format(self) -> str:
+        """Summary as human readable table (latencies in milliseconds)."""
+        qs = [f"p{q:g}" for q in self.percentiles] + ["max"]
+        lines = [f"{'op':<10} {'count':>9} " + " ".join(f"{q:>9}" for q in qs)]
+        for op, summary in sorted(self.summary().items()):
+            lines.append(
+                f"{op:<10} {int(summary['count']):>9} "
+                + " ".join(f"{summary[q] * 1000:>9.3f}" for q in qs)
+            )
+        return "\n".join(lines)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+from typing import List, Optional, Tuple
+import errno
+import os
+import random
+
+# ours
+from randomfiletree.distributions import BatchSampler
+
+#: Kinds of links that can be created instead of files, see :class:`Links`
+LINK_TYPES = ("hardlink", "symlink", "dangling")
+
+# Links can be created relative to the descriptor of their directory
+_HAS_DIR_FD = os.link in os.supports_dir_fd and os.symlink in os.supports_dir_fd
+
+
+class Links:
+    """
+    Share of the files of a tree that are created as links instead (pass an
+    instance as the ``links`` argument of
+    :func:`randomfiletree.core.iterative_tree`), e.g. to create trees with
+    many directory entries but few inodes and little data.
+
+    Hardlinks point to a small pool of shared inodes (the first files that
+    were created). Symbolic links point to files that were created earlier,
+    chosen from an in-memory index (a random sample of bounded size of all
+    created files), so that the tree does not have to be scanned for
+    targets. Their targets are relative, so that they stay valid if the tree
+    is moved. Dangling symbolic links point to names that do not exist.
+
+    As long as no files were created yet, regular files are created instead
+    of hardlinks and symbolic links. Files that reached the maximal number
+    of links of the file system are replaced in the pool by files created
+    later.
+
+    Example::
+
+        Links(hardlinks=0.5, symlinks=0.1, dangling=0.01)
+
+    Args:
+        hardlinks: Share of the files that are created as hardlinks
+        symlinks: Share of the files that are created as symbolic links
+        dangling: Share of the files that are created as dangling symbolic
+            links
+        pool_size: Number of shared inodes that hardlinks point to
+        index_size: Maximum number of files kept in the index of symbolic
+            link targets
+    """
+
+    def __init__(
+        self,
+        hardlinks: float = 0.0,
+        symlinks: float = 0.0,
+        dangling: float = 0.0,
+        pool_size: int = 16,
+        index_size: int = 100_000,
+    ):
+        shares = [hardlinks, symlinks, dangling]
+        if min(shares) < 0 or sum(shares) > 1:
+            raise ValueError(
+                "Shares of links must not be negative and add up to at most 1."
+            )
+        if pool_size < 1 or index_size < 1:
+            raise ValueError("'pool_size' and 'index_size' must be positive.")
+        self._kind = BatchSampler(
+            "choice",
+            values=list(range(len(LINK_TYPES) + 1)),
+            weights=[1 - sum(shares)] + shares,
+        )
+        self.pool_size = pool_size
+        self.index_size = index_size
+        #: Targets of hardlinks
+        self.pool: List[str] = []
+        #: Sample of the created files (targets of symbolic links)
+        self.index: List[str] = []
+        self._n_files = 0
+
+    def draw(self) -> Optional[str]:
+        """
+        Draw the kind of the next file entry.
+
+        Returns:
+            One of :data:`LINK_TYPES`, or None for a regular file
+        """
+        kind = self._kind()
+        if not kind or (kind < 3 and not self.pool):
+            return None
+        return LINK_TYPES[kind - 1]
+
+    def add(self, path: str) -> None:
+        """Register a created regular file as a possible link target."""
+        self._n_files += 1
+        if len(self.pool) < self.pool_size:
+            self.pool.append(path)
+        if len(self.index) < self.index_size:
+            self.index.append(path)
+            return
+        # Reservoir sampling keeps a uniform sample of all files
+        i = random.randrange(self._n_files)
+        if i < self.index_size:
+            self.index[i] = path
+
+    def create(
+        self, kind: str, path: str, fd: Optional[int], name: str
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Create link ``name`` of the given kind in directory ``path`` (with
+        descriptor ``fd``).
+
+        Returns:
+            (``"hardlink"`` or ``"symlink"``, target), or None if an entry
+            with this name exists already or if all files of the pool
+            reached the maximal number of links. The target of a hardlink is
+            the path of the linked file, the target of a symbolic link its
+            content.
+        """
+        try:
+            while kind == "hardlink":
+                if not self.pool:
+                    return None
+                target = random.choice(self.pool)
+                try:
+                    if fd is None or not _HAS_DIR_FD:
+                        os.link(target, os.path.join(path, name))
+                    else:
+                        os.link(target, name, dst_dir_fd=fd)
+                except OSError as e:
+                    if e.errno != errno.EMLINK:
+                        raise
+                    # Make room for a new file in the pool
+                    self.pool.remove(target)
+                    continue
+                return kind, target
+            if kind == "symlink":
+                target = os.path.relpath(random.choice(self.index), path)
+            else:
+                target = f"missing_{name}"
+            if fd is None or not _HAS_DIR_FD:
+                os.symlink(target, os.path.join(path, name))
+            else:
+                os.symlink(target, name, dir_fd=fd)
+        except FileExistsError:
+            return None
+        return "symlink", target
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path, PurePath
+
+_CHUNK_SIZE = 1024**2
+
+
+class _Crc32:
+    """CRC32 with the interface of the hash objects of :mod:`hashlib`."""
+
+    def __init__(self) -> None:
+        self.crc = 0
+
+    def update(self, data: Union[bytes, memoryview]) -> None:
+        self.crc = zlib.crc32(data, self.crc)
+
+    def hexdigest(self) -> str:
+        return f"{self.crc:08x}"
+
+
+def new_checksum(algorithm: str) -> Any:
+    """
+    Checksum object to compute the checksum of data as it is written (with
+    the methods ``update`` and ``hexdigest`` of the hash objects of
+    :mod:`hashlib`).
+
+    Args:
+        algorithm: ``crc32`` or any algorithm of :mod:`hashlib`, e.g.
+            ``blake2b`` or ``sha256``
+    """
+    if algorithm == "crc32":
+        return _Crc32()
+    return hashlib.new(algorithm)
+
+
+def file_checksum(path: Union[str, PurePath], algorithm: str) -> str:
+    """
+    Checksum of the content of a file.
+
+    Args:
+        path: File
+        algorithm: ``crc32`` or any algorithm of :mod:`hashlib`, e.g.
+            ``blake2b`` or ``sha256``
+
+    Returns:
+        Hex digest
+    """
+    buffer = bytearray(_CHUNK_SIZE)
+    view = memoryview(buffer)
+    h = new_checksum(algorithm)
+    with open(str(path), "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                return h.hexdigest()
+            h.update(view[:n])
+
+
+class Manifest:
+    """
+    Record of the directories and files of a generated tree.
+
+    Paths are stored relative to ``basedir``, so that the manifest stays
+    valid if the tree is moved or copied elsewhere. Every entry is a
+    dictionary that holds at least its ``type`` (``"dir"``, ``"file"``,
+    ``"hardlink"`` or ``"symlink"``). Links also hold their ``target`` (the
+    linked file relative to ``basedir`` for hardlinks, the content of the
+    link for symbolic links).
+
+    If ``checksum`` is given, the ``size`` and the ``checksum`` of every file
+    are recorded, so that copies of the tree can be verified later
+    (:func:`randomfiletree.verify.verify`) without the original tree.
+    Generators that know the content of a file record it while writing it
+    (:meth:`add_content`), other files are read when they are added (i.e.
+    right after the tree was generated). Files that can't be read are
+    recorded with an ``error`` instead of a checksum.
+
+    Args:
+        basedir: Base directory of the tree
+        checksum: Checksum algorithm for the file contents: ``crc32`` or any
+            algorithm of :mod:`hashlib`. Default: No checksums.
+    """
+
+    def __init__(
+        self, basedir: Union[str, PurePath], checksum: Optional[str] = None
+    ):
+        if checksum is not None and checksum != "crc32":
+            # Fail early on unknown algorithms
+            hashlib.new(checksum)
+        self.basedir = Path(basedir)
+        self.checksum = checksum
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, path: Union[str, PurePath], kind: str, **info: Any) -> None:
+        """
+        Record entry.
+
+        Args:
+            path: Absolute path or path relative to the base directory
+            kind: Type of the entry, e.g. ``"dir"`` or ``"file"``
+            **info: Additional information to store with the entry
+        """
+        rel = os.path.relpath(str(path), str(self.basedir))
+        if kind == "file" and self.checksum and "checksum" not in info:
+            info.update(self._file_info(self.basedir / rel))
+        self.entries[rel] = dict(type=kind, **info)
+
+    def add_content(self, path: Union[str, PurePath], data: bytes) -> None:
+        """
+        Record file that was just written with ``data``, without reading it
+        again.
+        """
+        if not self.checksum:
+            self.add(path, "file")
+            return
+        h = new_checksum(self.checksum)
+        h.update(data)
+        self.add(path, "file", size=len(data), checksum=h.hexdigest())
+
+    def _file_info(self, path: Path) -> Dict[str, Any]:
+        try:
+            size = os.stat(str(path)).st_size
+            if not size:
+                # No need to open empty files
+                return {"size": 0, "checksum": self._empty_checksum()}
+            return {
+                "size": size,
+                "checksum": file_checksum(path, str(self.checksum)),
+            }
+        except OSError as e:
+            # E.g. files without read permission
+            return {"error": str(e)}
+
+    def _empty_checksum(self) -> str:
+        return new_checksum(str(self.checksum)).hexdigest()
+
+    def add_files(
+        self,
+        paths: Iterable[Union[str, PurePath]],
+        workers: Optional[int] = None,
+    ) -> None:
+        """
+        Record files. If checksums are recorded, the files are hashed in
+        parallel with ``workers`` threads, except for files whose checksum
+        was recorded already when they were written (:meth:`add_content`).
+        """
+        if not self.checksum:
+            for path in paths:
+                self.add(path, "file")
+            return
+        rels = [
+            rel
+            for rel in (
+                os.path.relpath(str(p), str(self.basedir)) for p in paths
+            )
+            if "checksum" not in self.entries.get(rel, {})
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            infos = executor.map(
+                self._file_info, (self.basedir / rel for rel in rels)
+            )
+            for rel, info in zip(rels, infos):
+                self.entries[rel] = dict(type="file", **info)
+
+    def paths(self, kind: str) -> List[Path]:
+        """All paths of entries of the given type."""
+        return [
+            self.basedir / rel
+            for rel, entry in self.entries.items()
+            if entry["type"] == kind
+        ]
+
+    @property
+    def dirs(self) -> List[Path]:
+        """All directories, as pathlib.Path objects."""
+        return self.paths("dir")
+
+    @property
+    def files(self) -> List[Path]:
+        """All files, as pathlib.Path objects."""
+        return self.paths("file")
+
+    @classmethod
+    def from_lists(
+        cls,
+        basedir: Union[str, PurePath],
+        dirs: Iterable[Union[str, PurePath]],
+        files: Iterable[Union[str, PurePath]],
+    ) -> "Manifest":
+        """
+        Create manifest from the lists of directories and files as returned
+        by :func:`randomfiletree.core.iterative_tree`.
+        """
+        manifest = cls(basedir)
+        for d in dirs:
+            manifest.add(d, "dir")
+        manifest.add_files(files)
+        return manifest
+
+    def save(self, path: Union[str, PurePath]) -> None:
+        """
+        Write manifest to file (one JSON object per line, the first line
+        holding the base directory and the checksum algorithm).
+        """
+        header: Dict[str, Any] = {"basedir": str(self.basedir)}
+        if self.checksum:
+            header["checksum"] = self.checksum
+        with open(str(path), "w") as f:
+            f.write(json.dumps(header) + "\n")
+            for rel, entry in self.entries.items():
+                f.write(json.dumps(dict(path=rel, **entry)) + "\n")
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, PurePath],
+        basedir: Optional[Union[str, PurePath]] = None,
+    ) -> "Manifest":
+        """
+        Read manifest from file.
+
+        Args:
+            path: File written by :meth:`save`
+            basedir: Base directory to use instead of the one recorded in the
+                file (e.g. for a copy of the tree)
+        """
+        with open(str(path)) as f:
+            header = json.loads(f.readline())
+            manifest = cls(
+                basedir if basedir is not None else header["basedir"],
+                checksum=header.get("checksum"),
+            )
+            for line in f:
+                entry = json.loads(line)
+                manifest.entries[entry.pop("path")] = entry
+        return manifest
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, Optional, Tuple, Union
+import copy
+import os
+import random
+import threading
+import time
+
+# ours
+from randomfiletree.distributions import BatchSampler
+
+#: Distribution of a number: Constant or arguments of
+#: :class:`~randomfiletree.distributions.BatchSampler`
+Distribution = Union[float, Dict[str, Any]]
+
+# Metadata can be set through the descriptor of the open file
+_HAS_FD = os.utime in os.supports_fd and hasattr(os, "fchmod")
+# ... or relative to the descriptor of the directory
+_HAS_DIR_FD = os.utime in os.supports_dir_fd and os.chmod in os.supports_dir_fd
+
+
+def parse_modes(text: str) -> Union[int, Dict[int, float]]:
+    """
+    Parse permission mix as used by the command line interface, e.g.
+    ``644:0.9,600:0.1`` (octal modes and their weights) or ``644``.
+    """
+    if ":" not in text and "," not in text:
+        return int(text, 8)
+    modes = {}
+    for item in filter(None, text.split(",")):
+        mode, sep, weight = item.partition(":")
+        modes[int(mode, 8)] = float(weight) if sep else 1.0
+    return modes
+
+
+class Metadata:
+    """
+    Random timestamps and permissions that are applied to files while they
+    are created (pass an instance as the ``metadata`` argument of
+    :func:`randomfiletree.core.iterative_tree`). Where possible they are set
+    through the descriptor of the open file (``futimens``, ``fchmod``) or
+    relative to the descriptor of its directory, so that no extra pass over
+    the tree and no extra path lookups are needed. The values are drawn in
+    batches.
+
+    Timestamps of directories are not changed, because creating entries in
+    a directory updates its modification time anyway.
+
+    Example::
+
+        Metadata(
+            mtime={"distribution": "lognormal", "mu": 14, "sigma": 2},
+            mode={0o644: 0.9, 0o600: 0.08, 0o755: 0.02},
+        )
+
+    Args:
+        mtime: Distribution of the age of the modification time in seconds
+            (constant or arguments of
+            :class:`~randomfiletree.distributions.BatchSampler`). Default:
+            Not changed.
+        atime: Distribution of the age of the access time in seconds.
+            Default: Same as the modification time (if that is changed).
+        mode: Permissions: Either one mode (e.g. ``0o644``) or a mapping
+            mode -> weight. Default: Not changed.
+        now: Time the ages refer to (seconds since the epoch). Default: Time
+            of creating this object.
+    """
+
+    def __init__(
+        self,
+        mtime: Optional[Distribution] = None,
+        atime: Optional[Distribution] = None,
+        mode: Union[int, Dict[int, float], None] = None,
+        now: Optional[float] = None,
+    ):
+        self.now_ns = int((time.time() if now is None else now) * 1e9)
+        self._mtime = None if mtime is None else BatchSampler.from_spec(mtime)
+        self._atime = None if atime is None else BatchSampler.from_spec(atime)
+        self._mode: Optional[BatchSampler] = None
+        if isinstance(mode, int):
+            self._mode = BatchSampler("constant", value=mode)
+        elif mode is not None:
+            self._mode = BatchSampler(
+                "choice", values=list(mode), weights=list(mode.values())
+            )
+        # Samplers are shared between the workers of parallel generators
+        self._lock = threading.Lock()
+
+    def spawn(self, rng: random.Random) -> "Metadata":
+        """
+        Independent copy (with the same reference time) that draws its
+        values with ``rng``, e.g. for one of several threads.
+        """
+        other = copy.copy(self)
+        for name in ("_mtime", "_atime", "_mode"):
+            sampler = getattr(self, name)
+            if sampler is not None:
+                setattr(other, name, sampler.spawn(rng))
+        other._lock = threading.Lock()
+        return other
+
+    def draw(self) -> Tuple[Optional[Tuple[int, int]], Optional[int]]:
+        """
+        Draw metadata of one file.
+
+        Returns:
+            ((atime, mtime) in nanoseconds or None, mode or None)
+        """
+        times = None
+        mode = None
+        with self._lock:
+            if self._mtime is not None or self._atime is not None:
+                mtime = self.now_ns
+                if self._mtime is not None:
+                    mtime -= self._mtime() * 1_000_000_000
+                atime = mtime
+                if self._atime is not None:
+                    atime = self.now_ns - self._atime() * 1_000_000_000
+                times = (atime, mtime)
+            if self._mode is not None:
+                mode = self._mode()
+        return times, mode
+
+    def apply(
+        self,
+        path: str,
+        fd: Optional[int] = None,
+        dir_fd: Optional[int] = None,
+    ) -> None:
+        """
+        Apply random metadata to file ``path``, through its open descriptor
+        ``fd`` or relative to the descriptor ``dir_fd`` of its directory if
+        given and supported by the platform.
+        """
+        times, mode = self.draw()
+        if fd is not None and _HAS_FD:
+            if mode is not None:
+                os.fchmod(fd, mode)
+            if times is not None:
+                os.utime(fd, ns=times)
+        elif dir_fd is not None and _HAS_DIR_FD:
+            name = os.path.basename(path)
+            if mode is not None:
+                os.chmod(name, mode, dir_fd=dir_fd)
+            if times is not None:
+                os.utime(name, ns=times, dir_fd=dir_fd)
+        else:
+            if mode is not None:
+                os.chmod(path, mode)
+            if times is not None:
+                os.utime(path, ns=times)
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import os
+import random
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import iterative_tree
+from randomfiletree.distributions import BatchSampler
+from randomfiletree.durability import Syncer
+from randomfiletree.manifest import Manifest
+from randomfiletree.metadata import Metadata
+from randomfiletree.spec import TreeSpec
+from randomfiletree.stats import TreeStats
+
+# Numbers of subdirectories and files per directory are counted exactly up to
+# this value
+_EXACT_COUNTS = 1024
+
+# Directories that are scanned at the same time per worker
+_IN_FLIGHT = 4
+
+# Maximal deviation of the number of directories of a scaled tree from the
+# scaled number, as share of the latter, when the scaling is spread over
+# several depths
+_MAX_DIR_BIAS = 0.05
+
+
+class Histogram:
+    """
+    Counts of non-negative integers in a bounded number of bins: Values
+    below ``exact`` have their own bin, and the ranges from one power of two
+    to the next above are split into ``subbins`` bins of equal width.
+
+    Args:
+        exact: Values below this have their own bin
+        subbins: Number of bins per power of two
+    """
+
+    def __init__(self, exact: int = 1, subbins: int = 8):
+        self.exact = exact
+        self.subbins = subbins
+        #: Lower bound of the bin -> count
+        self.counts: Dict[int, int] = {}
+        #: Sum of all values
+        self.total = 0
+
+    def _width(self, value: int) -> int:
+        return max((1 << (value.bit_length() - 1)) // self.subbins, 1)
+
+    def _bin(self, value: int) -> int:
+        if value < self.exact:
+            return value
+        width = self._width(value)
+        return value - value % width
+
+    def _high(self, low: int) -> int:
+        return low + 1 if low < self.exact else low + self._width(low)
+
+    def add(self, value: int, count: int = 1) -> None:
+        """Add ``count`` occurrences of ``value``."""
+        key = self._bin(value)
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.total += value * count
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the counts of another histogram with the same bins."""
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total += other.total
+
+    @property
+    def n(self) -> int:
+        """Number of values."""
+        return sum(self.counts.values())
+
+    @property
+    def mean(self) -> float:
+        """Mean of the values."""
+        n = self.n
+        return self.total / n if n else 0.0
+
+    def distribution(self) -> Union[int, Dict[str, Any]]:
+        """
+        Distribution fitted to the values: The histogram itself (uniform
+        within the bins), as arguments of
+        :class:`~randomfiletree.distributions.BatchSampler`.
+        """
+        if not self.counts:
+            return 0
+        if len(self.counts) == 1:
+            low = next(iter(self.counts))
+            if self._high(low) == low + 1:
+                return low
+        keys = sorted(self.counts)
+        return {
+            "distribution": "histogram",
+            "low": keys,
+            "high": [self._high(k) for k in keys],
+            "weights": [self.counts[k] for k in keys],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Histogram as dictionary that can be serialized to JSON."""
+        return {
+            "exact": self.exact,
+            "subbins": self.subbins,
+            "counts": {str(k): v for k, v in sorted(self.counts.items())},
+            "total": self.total,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        """Inverse of :meth:`to_dict`."""
+        histogram = cls(data["exact"], data["subbins"])
+        histogram.counts = {int(k): v for k, v in data["counts"].items()}
+        histogram.total = data["total"]
+        return histogram
+
+
+class DepthProfile:
+    """
+    Statistics of the directories of one depth of a tree.
+
+    Attributes:
+        folders: :class:`Histogram` of the numbers of subdirectories per
+            directory
+        files: :class:`Histogram` of the numbers of files per directory
+        sizes: :class:`Histogram` of the sizes of the files in bytes
+    """
+
+    def __init__(self) -> None:
+        self.folders = Histogram(_EXACT_COUNTS)
+        self.files = Histogram(_EXACT_COUNTS)
+        self.sizes = Histogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Profile as dictionary that can be serialized to JSON."""
+        return {
+            "folders": self.folders.to_dict(),
+            "files": self.files.to_dict(),
+            "sizes": self.sizes.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DepthProfile":
+        """Inverse of :meth:`to_dict`."""
+        level = cls()
+        level.folders = Histogram.from_dict(data["folders"])
+        level.files = Histogram.from_dict(data["files"])
+        level.sizes = Histogram.from_dict(data["sizes"])
+        return level
+
+
+def _scan_dir(path: str) -> Tuple[List[str], int, Histogram, bool]:
+    """Subdirectories, number of files and histogram of the file sizes of
+    one directory, and whether it could be read.
+    """
+    subdirs: List[str] = []
+    n_files = 0
+    sizes = Histogram()
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return subdirs, n_files, sizes, False
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    sizes.add(entry.stat(follow_symlinks=False).st_size)
+                    n_files += 1
+            except OSError:
+                # Removed while scanning
+                continue
+    return subdirs, n_files, sizes, True
+
+
+class _Scaled:
+    """Number of entries drawn from ``sampler`` and multiplied by
+    ``factor``. Randomized rounding keeps the expected number.
+    """
+
+    def __init__(self, sampler: BatchSampler, factor: float):
+        self.sampler = sampler
+        self.factor = factor
+
+    def __call__(self, *args: Any) -> int:
+        n = self.sampler()
+        if self.factor != 1:
+            scaled = n * self.factor
+            n = int(scaled)
+            n += random.random() < scaled - n
+        return n
+
+
+class TreeProfile:
+    """
+    Shape of an existing tree: Per depth histograms of the numbers of
+    subdirectories and files per directory and of the file sizes. Profiles
+    are collected in one pass over the tree (see :meth:`scan`), can be saved
+    as JSON and used to create anonymized replicas of the tree at any scale
+    (see :meth:`generate`).
+
+    A profile does not contain any names, so it can be shared without
+    revealing the contents of the tree.
+
+    Attributes:
+        levels: :class:`DepthProfile` per depth (the base directory has depth
+            0)
+        errors: Number of directories that could not be read during the scan
+    """
+
+    def __init__(self) -> None:
+        self.levels: List[DepthProfile] = []
+        self.errors = 0
+
+    def _level(self, depth: int) -> DepthProfile:
+        while len(self.levels) <= depth:
+            self.levels.append(DepthProfile())
+        return self.levels[depth]
+
+    @classmethod
+    def scan(
+        cls, basedir: Union[str, PurePath], workers: int = 8
+    ) -> "TreeProfile":
+        """
+        Profile an existing tree in one pass. Directories are read in
+        parallel, depth first, and only the histograms and the directories
+        that still have to be read are kept in memory, so that trees with
+        hundreds of millions of entries can be profiled. Symbolic links are
+        not followed.
+
+        Args:
+            basedir: Base directory of the tree
+            workers: Number of directories that are read in parallel
+        """
+        profile = cls()
+        stack: List[Tuple[str, int]] = [(str(basedir), 0)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: Dict[Any, int] = {}
+            while stack or pending:
+                while stack and len(pending) < _IN_FLIGHT * workers:
+                    path, depth = stack.pop()
+                    pending[executor.submit(_scan_dir, path)] = depth
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for job in done:
+                    depth = pending.pop(job)
+                    subdirs, n_files, sizes, ok = job.result()
+                    if not ok:
+                        profile.errors += 1
+                        continue
+                    level = profile._level(depth)
+                    level.folders.add(len(subdirs))
+                    level.files.add(n_files)
+                    level.sizes.merge(sizes)
+                    stack.extend((path, depth + 1) for path in subdirs)
+        return profile
+
+    @property
+    def n_dirs(self) -> int:
+        """Number of directories (without the base directory)."""
+        return sum(level.folders.total for level in self.levels)
+
+    @property
+    def n_files(self) -> int:
+        """Number of files."""
+        return sum(level.files.total for level in self.levels)
+
+    @property
+    def total_size(self) -> int:
+        """Total size of the files in bytes."""
+        return sum(level.sizes.total for level in self.levels)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Profile as dictionary that can be serialized to JSON."""
+        return {"levels": [level.to_dict() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TreeProfile":
+        """Inverse of :meth:`to_dict`."""
+        profile = cls()
+        profile.levels = [DepthProfile.from_dict(d) for d in data["levels"]]
+        return profile
+
+    def save(self, path: Union[str, PurePath]) -> None:
+        """Write profile to JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: Union[str, PurePath]) -> "TreeProfile":
+        """Read profile from JSON file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def format(self) -> str:
+        """Per depth summary as human readable text."""
+        lines = [
+            f"{self.n_dirs} directories, {self.n_files} files, "
+            f"{self.total_size} bytes",
+            f"{'depth':>5} {'dirs':>10} {'subdirs/dir':>12} "
+            f"{'files/dir':>10} {'mean size':>12}",
+        ]
+        for depth, level in enumerate(self.levels):
+            lines.append(
+                f"{depth:>5} {level.folders.n:>10} {level.folders.mean:>12.2f} "
+                f"{level.files.mean:>10.2f} {level.sizes.mean:>12.0f}"
+            )
+        return "\n".join(lines)
+
+    def _dir_bias(self, scale: float, scale_depth: int) -> float:
+        """Expected deviation of the number of directories from the scaled
+        number if the scaling is spread down to ``scale_depth``.
+        """
+        factor = scale ** (1 / (scale_depth + 1))
+        return sum(
+            self.levels[depth].folders.n * abs(factor**depth - scale)
+            for depth in range(1, min(scale_depth + 1, len(self.levels)))
+        )
+
+    def _scale_depth(self, scale: float) -> int:
+        """Deepest depth that the scaling can be spread down to while the
+        number of directories stays within ``_MAX_DIR_BIAS`` of the scaled
+        number. Spreading it keeps the variance of small scales low.
+        """
+        if scale >= 1 or scale == 0:
+            return 0
+        limit = _MAX_DIR_BIAS * scale * self.n_dirs
+        scale_depth = 0
+        # The deviation grows with the depth
+        while (
+            scale_depth + 1 < len(self.levels)
+            and self._dir_bias(scale, scale_depth + 1) <= limit
+        ):
+            scale_depth += 1
+        return scale_depth
+
+    def generate(
+        self,
+        basedir: Union[str, PurePath],
+        scale: float = 1.0,
+        scale_depth: Optional[int] = None,
+        manifest: Optional[Manifest] = None,
+        stats: Optional[TreeStats] = None,
+        durability: str = "none",
+        metadata: Optional[Metadata] = None,
+    ) -> Tuple[List[Path], List[Path]]:
+        """
+        Create a tree with the shape of the profile, using random names and
+        random file content.
+
+        The tree is created level by level: Every directory is filled once,
+        right after it was created, with numbers of subdirectories and files
+        and file sizes drawn from the histograms of its depth. Only the new
+        directories of one level are visited to create the next one.
+
+        To scale the tree, the numbers of subdirectories of the directories
+        down to ``scale_depth`` are multiplied by the same factor, so that
+        the numbers of directories below ``scale_depth`` are multiplied by
+        ``scale``, and the numbers of files per directory are scaled such
+        that the numbers of files of all depths are multiplied by ``scale``.
+        Directories below ``scale_depth`` keep their shape. Only the numbers
+        of directories of the depths above ``scale_depth`` deviate from the
+        scaled numbers.
+
+        Args:
+            basedir: Directory to create files and folders in
+            scale: Scale factor of the number of entries, e.g. 0.1 or 10
+            scale_depth: Deepest depth of the directories whose numbers of
+                subdirectories are scaled (between 0 and the depth of the
+                profile). Default: 0 for scales of at least 1, else the
+                deepest depth for which the total number of directories is
+                within 5% of the scaled number, to keep the variance low.
+            manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+                created directories and files in
+            stats: :class:`~randomfiletree.stats.TreeStats` to collect
+                statistics of the created directories and files in
+            durability: When to flush the created entries to disk, see
+                :func:`randomfiletree.core.iterative_tree`
+            metadata: Random timestamps and permissions of the created
+                files, see :func:`randomfiletree.core.iterative_tree`
+
+        Returns:
+            (List of dirs, List of files), all as pathlib.Path objects.
+        """
+        if scale < 0:
+            raise ValueError("'scale' must not be negative.")
+        if scale_depth is None:
+            scale_depth = self._scale_depth(scale)
+        if not 0 <= scale_depth < max(len(self.levels), 1):
+            raise ValueError(
+                f"'scale_depth' must be between 0 and "
+                f"{max(len(self.levels) - 1, 0)}."
+            )
+        basedir = Path(basedir)
+        basedir.mkdir(parents=True, exist_ok=True)
+        spec = TreeSpec(
+            {
+                "depth": {
+                    str(depth): {
+                        "folders": level.folders.distribution(),
+                        "files": level.files.distribution(),
+                        "size": level.sizes.distribution(),
+                    }
+                    for depth, level in enumerate(self.levels)
+                }
+            }
+        )
+        payload = None
+        if any(level.sizes.total for level in self.levels):
+            payload = spec._payload(basedir, manifest)
+        factor = scale ** (1 / (scale_depth + 1))
+        syncer = Syncer(durability, stats)
+        # The file systems are flushed once for all directories
+        sub_durability = "none" if durability == "end" else durability
+        if stats is not None:
+            stats.start()
+        alldirs: List[Path] = []
+        allfiles: List[Path] = []
+        level_dirs = [basedir]
+        for depth, level in enumerate(spec.levels):
+            if not level_dirs:
+                break
+            scaled = depth <= scale_depth
+            nfolders_func = _Scaled(level.folders, factor if scaled else 1)
+            nfiles_func = _Scaled(
+                level.files,
+                scale / factor ** min(depth, scale_depth + 1) if factor else 0,
+            )
+            level_stats = None if stats is None else TreeStats()
+            new_dirs: List[Path] = []
+            for directory in level_dirs:
+                dirs, files = iterative_tree(
+                    basedir=directory,
+                    nfolders_func=nfolders_func,
+                    nfiles_func=nfiles_func,
+                    # Only fill the directory itself
+                    maxdepth=1,
+                    payload=payload,
+                    stats=level_stats,
+                    durability=sub_durability,
+                    metadata=metadata,
+                )
+                # Sorted, so that the tree is reproducible with random.seed
+                new_dirs.extend(sorted(dirs))
+                allfiles.extend(files)
+            alldirs.extend(new_dirs)
+            level_dirs = new_dirs
+            if stats is not None and level_stats is not None:
+                level_stats.elapsed = 0
+                stats.merge(level_stats, depth_offset=depth)
+        syncer.finish([str(basedir)])
+        if stats is not None:
+            stats.stop()
+        if manifest is not None:
+            for d in alldirs:
+                manifest.add(d, "dir")
+            manifest.add_files(allfiles)
+        return alldirs, allfiles
+
+
+def clone_tree(
+    source: Union[str, PurePath],
+    basedir: Union[str, PurePath],
+    scale: float = 1.0,
+    workers: int = 8,
+    **kwargs: Any,
+) -> Tuple[List[Path], List[Path]]:
+    """
+    Create an anonymized replica of the shape of an existing tree at a
+    scale factor, see :class:`TreeProfile`.
+
+    Example::
+
+        clone_tree("/mnt/production/volume", "/tmp/replica", scale=0.1)
+
+    Args:
+        source: Base directory of the tree to clone
+        basedir: Directory to create files and folders in
+        scale: Scale factor of the number of entries
+        workers: Number of directories that are read in parallel while
+            profiling the source
+        **kwargs: Further arguments of :meth:`TreeProfile.generate`
+
+    Returns:
+        (List of dirs, List of files), all as pathlib.Path objects.
+    """
+    return TreeProfile.scan(source, workers=workers).generate(
+        basedir, scale=scale, **kwargs
+    )
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+
+from typing import Iterator, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import mmap
+import os
+import random
+import time
+from pathlib import PurePath
+
+# ours
+from randomfiletree.core import ScanCache, _scan_tree_strings
+from randomfiletree.latency import LatencyRecorder
+from randomfiletree.weighted import AliasTable, Weight, WeightedSelector
+
+#: Ways to read the files, see :func:`read_workload`
+READ_METHODS = ("buffer", "mmap")
+
+# Number of indices a reader draws at once
+_STREAM_BATCH = 256
+
+
+class ReadReport:
+    """
+    Result of :func:`read_workload`.
+
+    Attributes:
+        latency: :class:`~randomfiletree.latency.LatencyRecorder` with the
+            latency of every read of a whole file (op ``read``)
+        elapsed: Total run time in seconds
+        bytes_read: Total number of bytes read
+        errors: Number of selected files that could not be read (e.g.
+            because they were removed, replaced by directories or are not
+            readable)
+    """
+
+    def __init__(self) -> None:
+        self.latency = LatencyRecorder()
+        self.elapsed = 0.0
+        self.bytes_read = 0
+        self.errors = 0
+
+    @property
+    def n_reads(self) -> int:
+        """Number of files that were read."""
+        return self.latency.count("read")
+
+    @property
+    def reads_per_second(self) -> float:
+        """Achieved rate of file reads."""
+        return self.n_reads / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Achieved throughput in MB/s (10^6 bytes per second)."""
+        return self.bytes_read / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        """Summary as human readable text."""
+        return "\n".join(
+            [
+                f"Read {self.n_reads} files ({self.bytes_read} bytes) in "
+                f"{self.elapsed:.3f} s: {self.reads_per_second:.0f} files/s, "
+                f"{self.mb_per_second:.1f} MB/s, {self.errors} errors",
+                self.latency.format(),
+            ]
+        )
+
+
+def _stream(
+    rng: random.Random, n: int, table: Optional[AliasTable]
+) -> Iterator[int]:
+    """Endless stream of random indices, drawn in batches."""
+    rnd = rng.random
+    while True:
+        if table is None:
+            yield from [int(rnd() * n) for _ in range(_STREAM_BATCH)]
+        else:
+            yield from table.choose(_STREAM_BATCH, rng=rng)
+
+
+def _read_buffer(path: str, buffer: bytearray) -> int:
+    n = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            got = f.readinto(buffer)
+            if not got:
+                return n
+            n += got
+
+
+def _read_mmap(path: str, buffer: bytearray) -> int:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if not size:
+            return 0
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            source = memoryview(mm)
+            target = memoryview(buffer)
+            try:
+                # Copy the file through the buffer to fault in every page
+                for offset in range(0, size, len(buffer)):
+                    chunk = source[offset : offset + len(buffer)]
+                    target[: len(chunk)] = chunk
+                    chunk.release()
+            finally:
+                source.release()
+        return size
+    finally:
+        os.close(fd)
+
+
+def _reader(
+    paths: List[str],
+    table: Optional[AliasTable],
+    seed: int,
+    method: str,
+    buffer_size: int,
+    claim: Iterator[int],
+    n_reads: Optional[int],
+    deadline: Optional[float],
+) -> ReadReport:
+    """Read files from the random stream until ``n_reads`` files were read
+    by all readers together or the deadline is reached.
+    """
+    report = ReadReport()
+    read = _read_buffer if method == "buffer" else _read_mmap
+    buffer = bytearray(buffer_size)
+    record = report.latency.record
+    for i in _stream(random.Random(seed), len(paths), table):
+        # Reads are claimed from a shared counter
+        if n_reads is not None and next(claim) >= n_reads:
+            break
+        start = time.perf_counter()
+        if deadline is not None and start >= deadline:
+            break
+        try:
+            report.bytes_read += read(paths[i], buffer)
+        except OSError:
+            report.errors += 1
+            continue
+        record("read", time.perf_counter() - start)
+    return report
+
+
+def read_workload(
+    basedir: Union[str, PurePath],
+    n_reads: Optional[int] = None,
+    duration: Optional[float] = None,
+    workers: int = 4,
+    weight: Optional[Weight] = None,
+    exponent: float = 1.0,
+    method: str = "buffer",
+    buffer_size: int = 1024**2,
+    cache: Optional[ScanCache] = None,
+    selector: Optional[WeightedSelector] = None,
+) -> ReadReport:
+    """
+    Read random files of an existing tree with a pool of readers and measure
+    the throughput and the latency of every file read.
+
+    The tree is only scanned (or taken from ``cache``) once. Every reader
+    draws the indices of the files to read in batches from its own random
+    generator (seeded from :mod:`random`), so that selecting paths is cheap
+    and does not need any locking.
+
+    Args:
+        basedir: Directory to read files from
+        n_reads: Total number of files to read (including files that were
+            not found)
+        duration: Stop after this many seconds. At least one of ``n_reads``
+            and ``duration`` is required.
+        workers: Number of parallel readers
+        weight: Select files uniformly (None) or with probabilities
+            proportional to a weight (see
+            :class:`~randomfiletree.weighted.WeightedSelector`)
+        exponent: Exponent for the ``"depth"`` and ``"zipf"`` weights
+        method: ``buffer`` (read into a buffer that is reused for all reads)
+            or ``mmap`` (map the file and copy it through the buffer)
+        buffer_size: Size of the buffer of every reader in bytes
+        cache: :class:`~randomfiletree.core.ScanCache` to get the files of
+            the tree from (for uniform selection)
+        selector: :class:`~randomfiletree.weighted.WeightedSelector` of the
+            tree to reuse (for weighted selection). Overrides ``weight``.
+
+    Returns:
+        :class:`ReadReport`
+    """
+    if n_reads is None and duration is None:
+        raise ValueError("Need 'n_reads' or 'duration'.")
+    if method not in READ_METHODS:
+        raise ValueError("Unknown value for 'method' parameter.")
+    if selector is None and weight is not None:
+        selector = WeightedSelector(basedir, weight=weight, exponent=exponent)
+    table: Optional[AliasTable] = None
+    if selector is not None:
+        if selector.file_table is None:
+            raise ValueError(f"{basedir} does not have any files to read.")
+        paths = [str(f) for f in selector.files]
+        table = selector.file_table
+    elif cache is not None:
+        paths = [str(f) for f in cache.scan(basedir)[1]]
+    else:
+        paths = _scan_tree_strings(basedir)[1]
+    if not paths:
+        raise ValueError(f"{basedir} does not have any files to read.")
+    report = ReadReport()
+    claim = itertools.count()
+    start = time.perf_counter()
+    deadline = None if duration is None else start + duration
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = [
+            executor.submit(
+                _reader,
+                paths,
+                table,
+                random.getrandbits(64),
+                method,
+                buffer_size,
+                claim,
+                n_reads,
+                deadline,
+            )
+            for _ in range(workers)
+        ]
+        for job in jobs:
+            part = job.result()
+            report.latency.merge(part.latency)
+            report.bytes_read += part.bytes_read
+            report.errors += part.errors
+    report.elapsed = time.perf_counter() - start
+    return report
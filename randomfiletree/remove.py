@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+from typing import Dict, List, Optional, Tuple, Union
+from concurrent.futures import Executor, ThreadPoolExecutor
+import errno
+import os
+import stat
+from pathlib import PurePath
+
+# ours
+from randomfiletree.manifest import Manifest
+
+
+def _scan_dir(path: str) -> Tuple[List[str], List[str]]:
+    """(subdirectories, other entries) of a directory, without following
+    symlinks.
+    """
+    dirs = []
+    others = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            else:
+                others.append(entry.path)
+    return dirs, others
+
+
+def _scan_levels(
+    executor: Executor, basedir: str
+) -> Tuple[List[str], List[List[str]]]:
+    """Scan tree, one level at a time (in parallel within each level).
+
+    Returns:
+        (List of files, list of directories per depth)
+    """
+    files: List[str] = []
+    levels: List[List[str]] = []
+    level = [basedir]
+    while level:
+        next_level: List[str] = []
+        for dirs, others in executor.map(_scan_dir, level):
+            next_level.extend(dirs)
+            files.extend(others)
+        if next_level:
+            levels.append(next_level)
+        level = next_level
+    return files, levels
+
+
+def _unlink(path: str) -> Optional[str]:
+    """Remove file. Returns the path if it turned out to be a directory."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        if os.path.islink(path) or not os.path.isdir(path):
+            raise
+        return path
+    return None
+
+
+def _is_dir(path: str) -> Optional[bool]:
+    """Whether ``path`` is a directory (and not a symlink), or None if it
+    does not exist.
+    """
+    try:
+        return stat.S_ISDIR(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return None
+
+
+def _manifest_levels(
+    executor: Executor, basedir: str, manifest: Manifest
+) -> Tuple[List[str], List[List[str]]]:
+    """Entries of the manifest, checked against the tree one level at a
+    time (in parallel within each level). Directories that were replaced
+    (e.g. by a symlink) are removed like files, without the entries below
+    them, which are not part of the tree anymore.
+
+    Returns:
+        (List of files, list of directories per depth)
+    """
+    rel_files = []
+    rel_dirs = set()
+    for rel, entry in manifest.entries.items():
+        rel = os.path.normpath(rel)
+        if os.path.isabs(rel) or rel.split(os.sep)[0] == os.pardir:
+            raise ValueError(
+                f"Entry '{rel}' of the manifest is outside of '{basedir}'."
+            )
+        if rel == os.curdir:
+            continue
+        if entry["type"] == "dir":
+            rel_dirs.add(rel)
+        else:
+            rel_files.append(rel)
+        # Parents of all entries are checked, also if they are not listed
+        parent = os.path.dirname(rel)
+        while parent and parent not in rel_dirs:
+            rel_dirs.add(parent)
+            parent = os.path.dirname(parent)
+    by_depth: Dict[int, List[str]] = {}
+    for rel in rel_dirs:
+        by_depth.setdefault(rel.count(os.sep), []).append(rel)
+    files = []
+    levels = []
+    # Directories that are not (real) directories anymore
+    replaced = set()
+    for depth in range(max(by_depth, default=-1) + 1):
+        level = []
+        for rel in by_depth.get(depth, []):
+            if os.path.dirname(rel) in replaced:
+                replaced.add(rel)
+            else:
+                level.append(rel)
+        paths = [os.path.join(basedir, rel) for rel in level]
+        for rel, path, is_dir in zip(
+            level, paths, executor.map(_is_dir, paths)
+        ):
+            if is_dir:
+                continue
+            replaced.add(rel)
+            if is_dir is not None:
+                files.append(path)
+        levels.append(
+            [path for rel, path in zip(level, paths) if rel not in replaced]
+        )
+    files.extend(
+        os.path.join(basedir, rel)
+        for rel in rel_files
+        if os.path.dirname(rel) not in replaced
+    )
+    return files, levels
+
+
+def _rmdir(path: str) -> Optional[str]:
+    """Remove empty directory. Returns the path if the directory was not
+    empty.
+    """
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        if e.errno in (errno.ENOTEMPTY, errno.EEXIST):
+            return path
+        raise
+    return None
+
+
+def _remove(
+    executor: Executor, files: List[str], levels: List[List[str]]
+) -> None:
+    """Remove files, then directories, deepest level first. Directories that
+    turn out to contain entries that we did not know about are scanned and
+    removed before moving on to their parents.
+    """
+    for leftover in executor.map(_unlink, files):
+        if leftover is not None:
+            # File that was replaced by a directory
+            _remove(executor, *_scan_levels(executor, leftover))
+            os.rmdir(leftover)
+    for level in reversed(levels):
+        for leftover in executor.map(_rmdir, level):
+            if leftover is not None:
+                _remove(executor, *_scan_levels(executor, leftover))
+                os.rmdir(leftover)
+
+
+def remove_tree(
+    basedir: Union[str, PurePath],
+    manifest: Optional[Manifest] = None,
+    workers: Optional[int] = None,
+) -> None:
+    """
+    Remove a directory tree (including ``basedir`` itself), using several
+    threads in parallel. Children are always removed before their parents.
+
+    Args:
+        basedir: Directory to remove
+        manifest: Manifest of the tree. If given, the entries are taken from
+            it instead of scanning the tree (entries that are not in the
+            manifest are still found and removed). Directories that were
+            replaced, e.g. by a symlink, are removed without following
+            them. Entries outside of ``basedir`` raise ValueError.
+        workers: Number of worker threads. If None, the default of
+            :class:`concurrent.futures.ThreadPoolExecutor` is used.
+    """
+    basedir = str(basedir)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if manifest is None:
+            files, levels = _scan_levels(executor, basedir)
+        else:
+            files, levels = _manifest_levels(executor, basedir, manifest)
+        levels.insert(0, [basedir])
+        _remove(executor, files, levels)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
+import itertools
+import json
+import os
+import string
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import iterative_tree, random_string
+from randomfiletree.distributions import BatchSampler
+from randomfiletree.manifest import Manifest, new_checksum
+from randomfiletree.metadata import Metadata
+from randomfiletree.stats import TreeStats
+
+#: Keys of a level (the default level or one depth) of a tree spec
+LEVEL_KEYS = ("folders", "files", "size", "name")
+
+#: Top level keys of a tree spec
+SPEC_KEYS = ("repeat", "maxdepth", "default", "depth")
+
+# Files are filled with (repetitions of) this many random bytes
+_CHUNK_SIZE = 1024**2
+
+_DEFAULT_LEVEL: Dict[str, Any] = {
+    "folders": {"distribution": "gauss", "mean": 1, "sigma": 1},
+    "files": {"distribution": "gauss", "mean": 2, "sigma": 1},
+    "size": 0,
+    "name": "{random}",
+}
+
+
+class _Level:
+    """Compiled description of the entries created in directories of one
+    depth.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        unknown = set(spec) - set(LEVEL_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown keys in spec: {', '.join(unknown)}")
+        self.folders = BatchSampler.from_spec(spec["folders"])
+        self.files = BatchSampler.from_spec(spec["files"])
+        self.size = BatchSampler.from_spec(spec["size"])
+        self.name = spec["name"]
+        fields = {f for _, f, _, _ in string.Formatter().parse(self.name) if f}
+        unknown = fields - {"random", "n", "depth"}
+        if unknown:
+            raise ValueError(
+                f"Unknown fields in name pattern '{self.name}': "
+                f"{', '.join(map(str, unknown))}"
+            )
+        self.uses_random = "random" in fields
+        self.is_default = spec["name"] == "{random}" and spec["size"] == 0
+
+
+class TreeSpec:
+    """
+    Declarative description of a tree that is compiled once into a table of
+    per-depth samplers (drawing their values in batches) to drive
+    :func:`randomfiletree.core.iterative_tree`.
+
+    Example (JSON)::
+
+        {
+            "repeat": 3,
+            "maxdepth": 4,
+            "default": {
+                "folders": {"distribution": "gauss", "mean": 1, "sigma": 1},
+                "files": {"distribution": "uniform", "low": 0, "high": 10},
+                "size": {"distribution": "choice", "values": [0, 4096]},
+                "name": "{random}.txt"
+            },
+            "depth": {
+                "0": {"folders": 10, "files": 0}
+            }
+        }
+
+    Args:
+        spec: Dictionary with the keys
+
+            * ``repeat``, ``maxdepth``: See
+              :func:`randomfiletree.core.iterative_tree`
+            * ``default``: Description of the entries to create in a
+              directory (see below)
+            * ``depth``: Mapping depth -> description that overrides the
+              default for directories of that depth (the base directory has
+              depth 0)
+
+            A description has the keys ``folders`` (number of subdirectories
+            to create), ``files`` (number of files to create), ``size`` (file
+            size in bytes) and ``name`` (file name pattern with the fields
+            ``{random}`` (random string), ``{n}`` (running number) and
+            ``{depth}``). Numbers are either constants or dictionaries with
+            the key ``distribution`` and the arguments of
+            :class:`randomfiletree.distributions.BatchSampler`.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        unknown = set(spec) - set(SPEC_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown keys in spec: {', '.join(unknown)}")
+        self.repeat: int = spec.get("repeat", 1)
+        self.maxdepth: Optional[int] = spec.get("maxdepth")
+        default = dict(_DEFAULT_LEVEL, **spec.get("default", {}))
+        self.default = _Level(default)
+        overrides = {int(k): v for k, v in spec.get("depth", {}).items()}
+        self.levels: List[_Level] = [
+            (
+                _Level(dict(default, **overrides[depth]))
+                if depth in overrides
+                else self.default
+            )
+            for depth in range(max(overrides, default=-1) + 1)
+        ]
+        self._counter = itertools.count()
+        self._data = memoryview(os.urandom(_CHUNK_SIZE))
+
+    @classmethod
+    def load(cls, path: Union[str, PurePath]) -> "TreeSpec":
+        """
+        Load spec from JSON file or (if the file name ends with ``.toml``)
+        TOML file.
+        """
+        path = Path(path)
+        if path.suffix == ".toml":
+            try:
+                import tomllib
+            except ImportError:  # pragma: no cover (Python < 3.11)
+                try:
+                    import tomli as tomllib  # type: ignore
+                except ImportError:
+                    raise ImportError(
+                        "Reading TOML specs requires Python >= 3.11 or tomli"
+                    )
+            with path.open("rb") as f:
+                return cls(tomllib.load(f))
+        with path.open() as f:
+            return cls(json.load(f))
+
+    def level(self, depth: int) -> _Level:
+        if depth < len(self.levels):
+            return self.levels[depth]
+        return self.default
+
+    def nfolders(self, depth: int) -> int:
+        """Number of folders to create in a directory of depth ``depth``."""
+        return self.level(depth).folders()
+
+    def nfiles(self, depth: int) -> int:
+        """Number of files to create in a directory of depth ``depth``."""
+        return self.level(depth).files()
+
+    def _write(self, path: Path, size: int, checksum: Any = None) -> int:
+        """Write ``size`` bytes to file ``path`` and add them to the
+        ``checksum`` object (if any). Returns the number of bytes written.
+        """
+        written = 0
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            while written < size:
+                chunk = self._data[: min(size - written, _CHUNK_SIZE)]
+                n = os.write(fd, chunk)
+                if checksum is not None:
+                    checksum.update(chunk[:n])
+                written += n
+        finally:
+            os.close(fd)
+        return written
+
+    def _payload(
+        self, basedir: Path, manifest: Optional[Manifest] = None
+    ) -> Any:
+        base_parts = len(basedir.parts)
+        algorithm = None if manifest is None else manifest.checksum
+
+        def payload(directory: Path) -> Generator[Path, None, None]:
+            depth = len(directory.parts) - base_parts
+            level = self.level(depth)
+            while True:
+                name = level.name.format(
+                    random=random_string() if level.uses_random else "",
+                    n=next(self._counter),
+                    depth=depth,
+                )
+                path = directory / name
+                if manifest is None or algorithm is None:
+                    self._write(path, level.size())
+                else:
+                    # Checksums of the data as it is written, so that the
+                    # file does not have to be read again
+                    checksum = new_checksum(algorithm)
+                    size = self._write(path, level.size(), checksum)
+                    manifest.add(
+                        path, "file", size=size, checksum=checksum.hexdigest()
+                    )
+                yield path
+
+        return payload
+
+    def generate(
+        self,
+        basedir: Union[str, PurePath],
+        manifest: Optional[Manifest] = None,
+        stats: Optional[TreeStats] = None,
+        durability: str = "none",
+        metadata: Optional[Metadata] = None,
+    ) -> Tuple[List[Path], List[Path]]:
+        """
+        Create tree according to this spec.
+
+        Args:
+            basedir: Directory to create files and folders in
+            manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+                created directories and files in
+            stats: :class:`~randomfiletree.stats.TreeStats` to collect
+                statistics of the created directories and files in
+            durability: When to flush the created entries to disk, see
+                :func:`randomfiletree.core.iterative_tree`
+            metadata: Random timestamps and permissions of the created
+                files, see :func:`randomfiletree.core.iterative_tree`
+
+        Returns:
+            (List of dirs, List of files), all as pathlib.Path objects.
+        """
+        basedir = Path(basedir)
+        payload = None
+        if not all(level.is_default for level in self.levels + [self.default]):
+            payload = self._payload(basedir, manifest)
+        return iterative_tree(
+            basedir=basedir,
+            nfolders_func=self.nfolders,
+            nfiles_func=self.nfiles,
+            repeat=self.repeat,
+            maxdepth=self.maxdepth,
+            payload=payload,
+            manifest=manifest,
+            stats=stats,
+            durability=durability,
+            metadata=metadata,
+        )
+
+
+def iterative_distribution_tree(
+    basedir: Union[str, PurePath],
+    folders: Union[float, Dict[str, Any]] = _DEFAULT_LEVEL["folders"],
+    files: Union[float, Dict[str, Any]] = _DEFAULT_LEVEL["files"],
+    size: Union[float, Dict[str, Any]] = 0,
+    repeat: int = 1,
+    maxdepth: Optional[int] = None,
+    manifest: Optional[Manifest] = None,
+    stats: Optional[TreeStats] = None,
+    durability: str = "none",
+    metadata: Optional[Metadata] = None,
+) -> Tuple[List[Path], List[Path]]:
+    """
+    Like :func:`randomfiletree.core.iterative_gaussian_tree`, but the numbers
+    of folders and files and the file sizes can follow any of the
+    distributions of :class:`randomfiletree.distributions.BatchSampler`,
+    e.g. heavy-tailed ones.
+
+    Example::
+
+        iterative_distribution_tree(
+            "/path/to/basedir",
+            folders={"distribution": "zipf", "a": 2.5, "max": 100},
+            files={"distribution": "negative_binomial", "k": 2, "p": 0.2},
+            size={"distribution": "lognormal", "mu": 8, "sigma": 2},
+            repeat=4,
+        )
+
+    Args:
+        basedir: Directory to create files and folders in
+        folders: Distribution of the number of folders to create in each
+            directory (constant or arguments of
+            :class:`~randomfiletree.distributions.BatchSampler`)
+        files: Distribution of the number of files to create in each
+            directory
+        size: Distribution of the file sizes in bytes
+        repeat: Walk this often through the directory tree to create new
+            subdirectories and files
+        maxdepth: Maximum depth to descend into current file tree. If None,
+            infinity.
+        manifest: :class:`~randomfiletree.manifest.Manifest` to record the
+            created directories and files in
+        stats: :class:`~randomfiletree.stats.TreeStats` to collect
+            statistics of the created directories and files in
+        durability: When to flush the created entries to disk, see
+            :func:`randomfiletree.core.iterative_tree`
+        metadata: Random timestamps and permissions of the created files,
+            see :func:`randomfiletree.core.iterative_tree`
+
+    Returns:
+        (List of dirs, List of files), all as pathlib.Path objects.
+    """
+    spec = TreeSpec(
+        {
+            "repeat": repeat,
+            "maxdepth": maxdepth,
+            "default": {"folders": folders, "files": files, "size": size},
+        }
+    )
+    return spec.generate(
+        basedir,
+        manifest=manifest,
+        stats=stats,
+        durability=durability,
+        metadata=metadata,
+    )
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+from typing import Any, Counter, Dict, List
+import collections
+import time
+
+
+def _add_at(counts: List[int], index: int, value: int) -> None:
+    if index >= len(counts):
+        counts.extend([0] * (index + 1 - len(counts)))
+    counts[index] += value
+
+
+class TreeStats:
+    """
+    Statistics of a generated tree, collected while the tree is created
+    (pass an instance as the ``stats`` argument of
+    :func:`randomfiletree.core.iterative_tree`), so that the tree does not
+    have to be scanned again. The memory needed only grows with the depth of
+    the tree and the largest fan-out.
+
+    Depths are counted such that the direct children of the base directory
+    have depth 1.
+
+    Attributes:
+        dirs_per_depth: Number of created directories per depth
+        files_per_depth: Number of created files per depth
+        bytes_per_depth: Total size of the created files per depth
+        dir_fanout: Histogram: Number of new subdirectories created in a
+            directory -> number of times this happened
+        file_fanout: Histogram: Number of new files created in a directory
+            -> number of times this happened
+        elapsed: Time spent for the generation in seconds
+        sync_time: Part of ``elapsed`` spent for flushing entries to disk
+            (see :class:`~randomfiletree.durability.Syncer`)
+        n_syncs: Number of flushes (``fsync`` or ``syncfs`` calls)
+    """
+
+    def __init__(self) -> None:
+        self.dirs_per_depth: List[int] = []
+        self.files_per_depth: List[int] = []
+        self.bytes_per_depth: List[int] = []
+        self.dir_fanout: Counter[int] = collections.Counter()
+        self.file_fanout: Counter[int] = collections.Counter()
+        self.elapsed = 0.0
+        self.sync_time = 0.0
+        self.n_syncs = 0
+        self._start = 0.0
+
+    def start(self) -> None:
+        """Start timer (called by the generator)."""
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        """Stop timer (called by the generator)."""
+        self.elapsed += time.perf_counter() - self._start
+
+    def add_dirs(self, depth: int, n: int) -> None:
+        """Record that ``n`` directories were created in one directory of
+        depth ``depth - 1``.
+        """
+        _add_at(self.dirs_per_depth, depth, n)
+        self.dir_fanout[n] += 1
+
+    def add_files(self, depth: int, n: int, size: int = 0) -> None:
+        """Record that ``n`` files of total size ``size`` were created in one
+        directory of depth ``depth - 1``.
+        """
+        _add_at(self.files_per_depth, depth, n)
+        _add_at(self.bytes_per_depth, depth, size)
+        self.file_fanout[n] += 1
+
+    def merge(self, other: "TreeStats", depth_offset: int = 0) -> None:
+        """Add the statistics of another tree (e.g. a part of the same
+        tree that was generated separately).
+
+        Args:
+            other: Statistics to add
+            depth_offset: Depth of the base directory of the other tree
+                in this tree
+        """
+        for mine, theirs in (
+            (self.dirs_per_depth, other.dirs_per_depth),
+            (self.files_per_depth, other.files_per_depth),
+            (self.bytes_per_depth, other.bytes_per_depth),
+        ):
+            for depth, value in enumerate(theirs):
+                _add_at(mine, depth + depth_offset, value)
+        self.dir_fanout.update(other.dir_fanout)
+        self.file_fanout.update(other.file_fanout)
+        self.elapsed += other.elapsed
+        self.sync_time += other.sync_time
+        self.n_syncs += other.n_syncs
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as dictionary that can be serialized to JSON."""
+        return {
+            "dirs_per_depth": self.dirs_per_depth,
+            "files_per_depth": self.files_per_depth,
+            "bytes_per_depth": self.bytes_per_depth,
+            "dir_fanout": {str(k): v for k, v in self.dir_fanout.items()},
+            "file_fanout": {str(k): v for k, v in self.file_fanout.items()},
+            "elapsed": self.elapsed,
+            "sync_time": self.sync_time,
+            "n_syncs": self.n_syncs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TreeStats":
+        """Inverse of :meth:`to_dict`."""
+        stats = cls()
+        stats.dirs_per_depth = list(data["dirs_per_depth"])
+        stats.files_per_depth = list(data["files_per_depth"])
+        stats.bytes_per_depth = list(data["bytes_per_depth"])
+        for mine, theirs in (
+            (stats.dir_fanout, data["dir_fanout"]),
+            (stats.file_fanout, data["file_fanout"]),
+        ):
+            mine.update({int(k): v for k, v in theirs.items()})
+        stats.elapsed = data["elapsed"]
+        stats.sync_time = data.get("sync_time", 0.0)
+        stats.n_syncs = data.get("n_syncs", 0)
+        return stats
+
+    @property
+    def n_dirs(self) -> int:
+        """Total number of created directories."""
+        return sum(self.dirs_per_depth)
+
+    @property
+    def n_files(self) -> int:
+        """Total number of created files."""
+        return sum(self.files_per_depth)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of all created files."""
+        return sum(self.bytes_per_depth)
+
+    @property
+    def max_depth(self) -> int:
+        """Maximal depth of the created directories and files."""
+        for depth in range(
+            max(len(self.dirs_per_depth), len(self.files_per_depth)) - 1,
+            0,
+            -1,
+        ):
+            if (
+                depth < len(self.dirs_per_depth)
+                and self.dirs_per_depth[depth]
+                or depth < len(self.files_per_depth)
+                and self.files_per_depth[depth]
+            ):
+                return depth
+        return 0
+
+    def format(self) -> str:
+        """Statistics as human readable text."""
+        lines = [
+            f"Created {self.n_dirs} directories and {self.n_files} files "
+            f"({self.total_bytes} bytes) in {self.elapsed:.3f} s",
+            f"{'depth':>5} {'dirs':>10} {'files':>10} {'bytes':>12}",
+        ]
+        for depth in range(1, self.max_depth + 1):
+            counts = [
+                c[depth] if depth < len(c) else 0
+                for c in (
+                    self.dirs_per_depth,
+                    self.files_per_depth,
+                    self.bytes_per_depth,
+                )
+            ]
+            lines.append(
+                f"{depth:>5} {counts[0]:>10} {counts[1]:>10} {counts[2]:>12}"
+            )
+        for name, fanout in (
+            ("Subdirectories", self.dir_fanout),
+            ("Files", self.file_fanout),
+        ):
+            histogram = ", ".join(
+                f"{n}: {count}" for n, count in sorted(fanout.items())
+            )
+            lines.append(f"{name} per directory: {histogram}")
+        if self.n_syncs:
+            times = "time" if self.n_syncs == 1 else "times"
+            lines.append(
+                f"Flushed to disk {self.n_syncs} {times} in "
+                f"{self.sync_time:.3f} s"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+import functools
+import os
+import random
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import (
+    _list_names,
+    _mkdir,
+    _touch,
+    iterative_tree,
+    random_string,
+)
+from randomfiletree.content import ContentPayload
+from randomfiletree.distributions import BatchSampler
+from randomfiletree.durability import Syncer
+from randomfiletree.manifest import Manifest
+from randomfiletree.metadata import Metadata
+from randomfiletree.stats import TreeStats
+
+
+def _spawn(obj: Any, rng: random.Random) -> Any:
+    """``obj`` for one top level directory: Samplers, metadata and content
+    payloads are copied, so that they draw with ``rng``, other objects are
+    shared.
+    """
+    if isinstance(obj, (BatchSampler, Metadata, ContentPayload)):
+        return obj.spawn(rng)
+    return obj
+
+
+def _subtree(
+    basedir: Path,
+    nfolders_func: Callable,
+    nfiles_func: Callable,
+    repeat: int,
+    maxdepth: Optional[int],
+    filename: Callable,
+    payload: Optional[Callable[[Path], Generator[Path, None, None]]],
+    durability: str,
+    metadata: Optional[Metadata],
+    dirname: Callable,
+) -> Tuple[List[Path], List[Path], TreeStats]:
+    """Fill one top level directory of a striped tree."""
+    stats = TreeStats()
+    if repeat <= 0:
+        return [], [], stats
+    dirs, files = iterative_tree(
+        basedir,
+        # Depths are relative to the virtual root of the striped tree
+        nfolders_func=lambda depth: nfolders_func(depth + 1),
+        nfiles_func=lambda depth: nfiles_func(depth + 1),
+        repeat=repeat,
+        maxdepth=maxdepth,
+        filename=filename,
+        payload=payload,
+        stats=stats,
+        durability=durability,
+        metadata=metadata,
+        dirname=dirname,
+    )
+    return dirs, files, stats
+
+
+def striped_tree(
+    basedirs: Sequence[Union[str, PurePath]],
+    nfolders_func: Callable,
+    nfiles_func: Callable,
+    repeat: int = 1,
+    maxdepth: Optional[int] = None,
+    filename: Callable = random_string,
+    payload: Optional[Callable[[Path], Generator[Path, None, None]]] = None,
+    workers_per_root: int = 4,
+    manifest: Optional[Manifest] = None,
+    stats: Optional[TreeStats] = None,
+    durability: str = "none",
+    metadata: Optional[Metadata] = None,
+) -> Tuple[List[Path], List[Path]]:
+    """
+    Create one random tree striped across several base directories (e.g. on
+    different disks or mounts), so that they can be loaded in parallel.
+
+    The tree is generated as if :func:`randomfiletree.core.iterative_tree`
+    was called on one virtual root directory, but the top level
+    subdirectories of that root (and the files in it) are distributed round
+    robin over ``basedirs``. Every base directory has its own pool of
+    ``workers_per_root`` threads that fill its top level subdirectories in
+    parallel.
+
+    Every top level subdirectory is filled with its own
+    :class:`random.Random` generator, seeded from :mod:`random` in the
+    calling thread, and its own copies of ``metadata`` and of
+    ``nfolders_func``, ``nfiles_func`` and ``payload`` if they are
+    :class:`~randomfiletree.distributions.BatchSampler` or
+    :class:`~randomfiletree.content.ContentPayload` objects. Thus the tree is
+    reproducible with :func:`random.seed`. Other callables (and a custom
+    ``filename``) are shared by the workers and must be thread safe.
+
+    Args:
+        basedirs: Base directories to distribute the tree over
+        workers_per_root: Number of worker threads per base directory
+
+        For the other arguments, see
+        :func:`randomfiletree.core.iterative_tree`. ``manifest`` and
+        ``stats`` cover the combined tree. The base directory of the
+        manifest must be a common parent of all ``basedirs`` (e.g.
+        ``os.path.commonpath(basedirs)``). With the ``end`` durability
+        policy, every file system is flushed once after all parts are done.
+
+    Returns:
+        (List of dirs, List of files) of all base directories, all as
+        pathlib.Path objects.
+    """
+    if not basedirs:
+        raise ValueError("Need at least one base directory.")
+    syncer = Syncer(durability, stats)
+    # The file systems are flushed once for all parts
+    sub_durability = "none" if durability == "end" else durability
+    roots = [Path(b) for b in basedirs]
+    for root in roots:
+        root.mkdir(parents=True, exist_ok=True)
+    if stats is not None:
+        stats.start()
+    if maxdepth and maxdepth <= 1:
+        # Top level directories are not descended into
+        sub_maxdepth: Optional[int] = None
+        sub_repeat = 0
+    else:
+        # Like for iterative_tree, 0 means no limit
+        sub_maxdepth = maxdepth - 1 if maxdepth else None
+        sub_repeat = repeat
+    alldirs: List[Path] = []
+    allfiles: List[Path] = []
+    executors = [
+        ThreadPoolExecutor(max_workers=workers_per_root) for _ in roots
+    ]
+    payloads = [payload(root) for root in roots] if payload else []
+    # Payloads create their files before yielding them, so list the existing
+    # ones to count only new files
+    existing: List[Set[str]] = [set() for _ in roots]
+    if payload and stats is not None:
+        existing = [
+            {
+                os.path.join(str(root), name)
+                for name in _list_names(str(root), None)
+            }
+            for root in roots
+        ]
+    jobs: List["Future[Tuple[List[Path], List[Path], TreeStats]]"] = []
+    try:
+        i_dir = 0
+        i_file = 0
+        for i in range(repeat):
+            # The virtual root: Create top level directories and files.
+            # Directories created in pass i are visited in the remaining
+            # passes.
+            n_folders = nfolders_func(0)
+            created_folders = 0
+            for _ in range(n_folders):
+                root = roots[i_dir % len(roots)]
+                executor = executors[i_dir % len(roots)]
+                i_dir += 1
+                name = random_string()
+                created_folders += _mkdir(str(root), None, name)
+                path = root / name
+                alldirs.append(path)
+                rng = random.Random(random.getrandbits(64))
+                names = functools.partial(random_string, rng=rng)
+                jobs.append(
+                    executor.submit(
+                        _subtree,
+                        path,
+                        _spawn(nfolders_func, rng),
+                        _spawn(nfiles_func, rng),
+                        sub_repeat - i - 1,
+                        sub_maxdepth,
+                        names if filename is random_string else filename,
+                        _spawn(payload, rng),
+                        sub_durability,
+                        _spawn(metadata, rng),
+                        names,
+                    )
+                )
+            n_files = nfiles_func(0)
+            created_files = 0
+            size = 0
+            new_files: List[List[str]] = [[] for _ in roots]
+            for _ in range(n_files):
+                i_root = i_file % len(roots)
+                root = roots[i_root]
+                i_file += 1
+                if payload is None:
+                    name = filename()
+                    created_files += _touch(str(root), None, name, metadata)
+                    allfiles.append(root / name)
+                else:
+                    allfiles.append(next(payloads[i_root]))
+                    new_path = str(allfiles[-1])
+                    if stats is not None and new_path not in existing[i_root]:
+                        existing[i_root].add(new_path)
+                        created_files += 1
+                        size += os.stat(new_path).st_size
+                    if metadata is not None:
+                        metadata.apply(str(allfiles[-1]))
+                new_files[i_root].append(str(allfiles[-1]))
+                syncer.file_created(new_files[i_root][-1], str(root), None)
+            for i_root, root in enumerate(roots):
+                syncer.directory_filled(
+                    str(root),
+                    None,
+                    new_files[i_root],
+                    # Only whether directories were created matters
+                    created_folders,
+                )
+            if stats is not None:
+                stats.add_dirs(1, created_folders)
+                stats.add_files(1, created_files, size)
+        for job in jobs:
+            dirs, files, part_stats = job.result()
+            alldirs.extend(dirs)
+            allfiles.extend(files)
+            if stats is not None:
+                part_stats.elapsed = 0
+                stats.merge(part_stats, depth_offset=1)
+    finally:
+        for executor in executors:
+            executor.shutdown()
+    syncer.finish([str(root) for root in roots])
+    if stats is not None:
+        stats.stop()
+    alldirs = list(set(alldirs))
+    allfiles = list(set(allfiles))
+    if manifest is not None:
+        for d in alldirs:
+            manifest.add(d, "dir")
+        manifest.add_files(allfiles)
+    return alldirs, allfiles
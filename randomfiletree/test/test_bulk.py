@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+
+# ours
+from randomfiletree.core import iterative_gaussian_tree
+from randomfiletree.bulk import bulk_sample_elements, numpy
+
+
+class TestBulkSample(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def check(self, use_numpy: bool) -> None:
+        iterative_gaussian_tree(self.basedir.name, 5, 5, 3)
+        for replace in [False, True]:
+            samples = bulk_sample_elements(
+                self.basedir.name, 20, 3, 4, replace, use_numpy=use_numpy
+            )
+            self.assertEqual(len(samples), 20)
+            for i in range(len(samples)):
+                dirs, files = samples[i]
+                self.assertEqual(len(dirs), 3)
+                self.assertEqual(len(files), 4)
+                if not replace:
+                    self.assertEqual(len(set(files)), 4)
+                for f in files:
+                    self.assertTrue(f.is_file())
+        n_files = len(samples.all_files)
+        samples = bulk_sample_elements(
+            self.basedir.name,
+            5,
+            0,
+            n_files + 1,
+            use_numpy=use_numpy,
+            onfail="ignore",
+        )
+        self.assertEqual(len(set(samples.files(0))), n_files)
+        with self.assertRaises(ValueError):
+            bulk_sample_elements(
+                self.basedir.name, 5, 0, n_files + 1, use_numpy=use_numpy
+            )
+
+    def test_python(self) -> None:
+        self.check(use_numpy=False)
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_numpy(self) -> None:
+        self.check(use_numpy=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
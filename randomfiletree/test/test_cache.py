@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import random
+from pathlib import Path
+from typing import Any, List, Tuple
+from unittest import mock
+
+# ours
+from randomfiletree.cache import TreeCache
+from randomfiletree.stats import TreeStats
+
+
+class TestTreeCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = TreeCache(os.path.join(self.tmpdir.name, "cache"))
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def tree(
+        self, name: str, seed: int = 0, **kwargs: Any
+    ) -> Tuple[List[Path], List[Path]]:
+        return self.cache.iterative_gaussian_tree(
+            os.path.join(self.tmpdir.name, name), seed, 3, 2, 3, **kwargs
+        )
+
+    def relative(self, name: str, paths: List[Path]) -> List[str]:
+        base = os.path.join(self.tmpdir.name, name)
+        return sorted(os.path.relpath(str(p), base) for p in paths)
+
+    def test_hit(self) -> None:
+        state = random.getstate()
+        dirs1, files1 = self.tree("a")
+        self.assertEqual(random.getstate(), state)
+        dirs2, files2 = self.tree("b")
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+        self.assertEqual(self.relative("a", dirs1), self.relative("b", dirs2))
+        self.assertEqual(self.relative("a", files1), self.relative("b", files2))
+        for f in files2:
+            self.assertTrue(f.is_file())
+        stats = TreeStats()
+        self.tree("c", stats=stats)
+        self.assertEqual(stats.n_files, len(files1))
+        self.tree("d", seed=1)
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 2)
+
+    def test_key(self) -> None:
+        key = TreeCache.key(seed=0, nfiles=3)
+        self.assertEqual(TreeCache.key(nfiles=3, seed=0), key)
+        self.assertNotEqual(TreeCache.key(seed=1, nfiles=3), key)
+        with mock.patch("randomfiletree.cache.__version__", "0.0.0"):
+            self.assertNotEqual(TreeCache.key(seed=0, nfiles=3), key)
+        with mock.patch("randomfiletree.cache.DEFAULT_BACKEND", "other"):
+            self.assertNotEqual(TreeCache.key(seed=0, nfiles=3), key)
+
+    def test_clone_methods(self) -> None:
+        for clone in ["copy", "hardlink", "auto"]:
+            _, files = self.tree(clone, clone=clone)
+            for f in files:
+                self.assertTrue(f.is_file())
+        with self.assertRaises(ValueError):
+            self.tree("d", clone="symlink")
+
+    def test_modified_clone(self) -> None:
+        # Files cloned with "auto" don't share their content with the cache
+        _, files = self.tree("a")
+        for f in files:
+            self.assertEqual(f.stat().st_nlink, 1)
+            f.write_text("data")
+        _, files = self.tree("b")
+        for f in files:
+            self.assertEqual(f.read_text(), "")
+
+    def test_not_empty(self) -> None:
+        self.tree("a")
+        with self.assertRaises(ValueError):
+            self.tree("a")
+
+    def test_durability(self) -> None:
+        stats = TreeStats()
+        _, files = self.tree("a", stats=stats, durability="directory")
+        self.assertGreaterEqual(stats.n_syncs, len(files) + 1)
+        stats = TreeStats()
+        self.tree("b", stats=stats, durability="end")
+        self.assertEqual(stats.n_syncs, 1)
+
+    def test_evict(self) -> None:
+        self.cache.max_size = 0
+        self.tree("a", seed=0)
+        self.tree("b", seed=1)
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+        self.cache.clear()
+        self.assertEqual(self.cache.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
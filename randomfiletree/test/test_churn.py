@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import time
+
+# ours
+from randomfiletree.core import (
+    _scan_tree,
+    iterative_gaussian_tree,
+    random_string,
+)
+from randomfiletree.churn import IndexedList, churn
+
+
+class TestIndexedList(unittest.TestCase):
+    def test_add_remove(self) -> None:
+        lst = IndexedList([1, 2, 3, 3])
+        self.assertEqual(len(lst), 3)
+        lst.remove(1)
+        self.assertEqual(sorted(lst), [2, 3])
+        self.assertNotIn(1, lst)
+        lst.add(4)
+        lst.remove(4)
+        self.assertEqual(sorted(lst), [2, 3])
+        self.assertIn(lst.choice(), [2, 3])
+
+
+class TestChurn(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_index_consistent(self) -> None:
+        iterative_gaussian_tree(self.basedir.name, 3, 2, 3)
+        report = churn(self.basedir.name, 200)
+        self.assertEqual(report.n_ops, 200)
+        dirs, files = _scan_tree(self.basedir.name)
+        self.assertEqual(
+            sorted(map(str, files)), sorted(map(str, report.files))
+        )
+
+    def test_name_of_directory(self) -> None:
+        os.mkdir(os.path.join(self.basedir.name, "sub"))
+        open(os.path.join(self.basedir.name, "file"), "w").close()
+        names = iter(["sub"] * 20)
+
+        def filename() -> str:
+            # The name of the directory first, then free ones
+            return next(names, random_string())
+
+        report = churn(
+            self.basedir.name,
+            50,
+            mix={"create": 1, "rename": 1},
+            filename=filename,
+        )
+        self.assertEqual(report.n_ops, 50)
+        self.assertTrue(os.path.isdir(os.path.join(self.basedir.name, "sub")))
+        dirs, files = _scan_tree(self.basedir.name)
+        self.assertEqual(
+            sorted(map(str, files)), sorted(map(str, report.files))
+        )
+
+    def test_mix(self) -> None:
+        report = churn(self.basedir.name, 20, mix={"create": 1, "delete": 0})
+        self.assertEqual(report.latency.count("create"), 20)
+        self.assertEqual(len(report.files), 20)
+        with self.assertRaises(ValueError):
+            churn(self.basedir.name, 20, mix={"chmod": 1})
+
+    def test_rate(self) -> None:
+        start = time.perf_counter()
+        report = churn(self.basedir.name, 10, rate=100)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+        self.assertGreater(report.latency.percentile("create", 50), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
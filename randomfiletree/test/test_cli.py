@@ -3,9 +3,26 @@
 import unittest
 import subprocess
 import tempfile
+import os
 
 # ours
-from randomfiletree.cli import parser, cli
+from randomfiletree.remove import remove_tree
+from randomfiletree.cli import (
+    parser,
+    cli,
+    clean_parser,
+    clean_cli,
+    clone_parser,
+    clone_cli,
+    flat_parser,
+    flat_cli,
+    profile_parser,
+    profile_cli,
+    read_parser,
+    read_cli,
+    verify_parser,
+    verify_cli,
+)
 
 
 class TestCli(unittest.TestCase):
@@ -17,13 +34,190 @@ class TestCli(unittest.TestCase):
         with tempfile.TemporaryDirectory() as dirname:
             subprocess.run(["python3", "-m", "randomfiletree", dirname])
 
+    def test_subcommand_name(self) -> None:
+        with tempfile.TemporaryDirectory() as dirname:
+            subprocess.run(
+                ["randomfiletree", "./clean"], cwd=dirname, check=True
+            )
+            self.assertTrue(os.path.isdir(os.path.join(dirname, "clean")))
+
     def test_parser(self) -> None:
         p = parser()
         with tempfile.TemporaryDirectory() as dirname:
             cli(p.parse_args([dirname]))
             cli(p.parse_args([dirname, "-f", "0.5", "-d", "3", "-r", "3"]))
+            cli(p.parse_args([dirname, "--stats"]))
+            cli(p.parse_args([dirname, "--durability", "directory"]))
+            cli(
+                p.parse_args(
+                    [dirname, "--mtime-distribution", "100", "--modes", "600"]
+                )
+            )
+            cli(
+                p.parse_args(
+                    [
+                        dirname,
+                        "--files-distribution",
+                        "poisson:lam=2",
+                        "--size-distribution",
+                        "lognormal:mu=5,sigma=1",
+                    ]
+                )
+            )
             cli(
                 p.parse_args(
                     [dirname, "-f", "0.5", "-d", "3", "--maxdepth", "2"]
                 )
             )
+
+    def test_clean(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dirname = os.path.join(tmpdir, "tree")
+            manifest = os.path.join(tmpdir, "manifest.jsonl")
+            cli(
+                parser().parse_args(
+                    [dirname, "-r", "3", "--manifest", manifest]
+                )
+            )
+            self.assertTrue(os.path.exists(manifest))
+            clean_cli(
+                clean_parser().parse_args([dirname, "--manifest", manifest])
+            )
+            self.assertFalse(os.path.exists(dirname))
+            cli(parser().parse_args([dirname, "-r", "3"]))
+            subprocess.run(["randomfiletree", "clean", dirname], check=True)
+            self.assertFalse(os.path.exists(dirname))
+
+    def test_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = os.path.join(tmpdir, "cache")
+            for name in ["a", "b"]:
+                dirname = os.path.join(tmpdir, name)
+                cli(
+                    parser().parse_args(
+                        [dirname, "-r", "3", "--seed", "1", "--cache", cache]
+                    )
+                )
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(tmpdir, "a"))),
+                sorted(os.listdir(os.path.join(tmpdir, "b"))),
+            )
+            self.assertEqual(len(os.listdir(cache)), 1)
+
+    def test_spec(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dirname = os.path.join(tmpdir, "tree")
+            spec = os.path.join(tmpdir, "spec.json")
+            with open(spec, "w") as f:
+                f.write('{"default": {"folders": 0, "files": 3}}')
+            cli(parser().parse_args([dirname, "--spec", spec]))
+            self.assertEqual(len(os.listdir(dirname)), 3)
+
+    def test_stripe(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            roots = [os.path.join(tmpdir, name) for name in ["a", "b"]]
+            manifest = os.path.join(tmpdir, "manifest.jsonl")
+            cli(
+                parser().parse_args(
+                    [roots[0], "--stripe", roots[1], "-d", "4", "-f", "4"]
+                    + ["--manifest", manifest]
+                )
+            )
+            for root in roots:
+                self.assertTrue(os.listdir(root))
+            self.assertTrue(os.path.exists(manifest))
+
+    def test_content(self) -> None:
+        with tempfile.TemporaryDirectory() as dirname:
+            cli(
+                parser().parse_args(
+                    [dirname, "-f", "4", "--content", "json,csv:2"]
+                    + ["--content-size", "uniform:low=100,high=1000"]
+                )
+            )
+            suffixes = {
+                os.path.splitext(name)[1]
+                for _, _, files in os.walk(dirname)
+                for name in files
+            }
+            self.assertTrue(suffixes)
+            self.assertTrue(suffixes <= {".json", ".csv"})
+            with self.assertRaises(SystemExit):
+                cli(
+                    parser().parse_args(
+                        [dirname, "--content", "text", "--cache", "--seed", "1"]
+                    )
+                )
+
+    def test_profile_clone(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "source")
+            profile = os.path.join(tmpdir, "profile.json")
+            cli(parser().parse_args([source, "-d", "2", "-f", "3"]))
+            profile_cli(profile_parser().parse_args([source, "-o", profile]))
+            for i, path in enumerate([source, profile]):
+                clone = os.path.join(tmpdir, str(i))
+                clone_cli(
+                    clone_parser().parse_args(
+                        [path, clone, "--scale", "2", "--seed", "1"]
+                    )
+                )
+                self.assertTrue(os.listdir(clone))
+
+    def test_links(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dirname = os.path.join(tmpdir, "tree")
+            manifest = os.path.join(tmpdir, "manifest.jsonl")
+            cli(
+                parser().parse_args(
+                    [dirname, "-f", "10", "--manifest", manifest]
+                    + ["--hardlinks", "0.5", "--dangling-symlinks", "0.1"]
+                )
+            )
+            verify_cli(
+                verify_parser().parse_args([dirname, "--manifest", manifest])
+            )
+            with self.assertRaises(SystemExit):
+                cli(
+                    parser().parse_args(
+                        [dirname, "--symlinks", "0.5", "--spec", manifest]
+                    )
+                )
+
+    def test_flat(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dirname = os.path.join(tmpdir, "flat")
+            flat_cli(flat_parser().parse_args([dirname, "-n", "50"]))
+            self.assertEqual(len(os.listdir(dirname)), 50)
+
+    def test_read(self) -> None:
+        with tempfile.TemporaryDirectory() as dirname:
+            cli(parser().parse_args([dirname, "-f", "3", "-r", "2"]))
+            read_cli(read_parser().parse_args([dirname, "-n", "10"]))
+            read_cli(
+                read_parser().parse_args(
+                    [dirname, "--duration", "0.1", "--weight", "depth"]
+                )
+            )
+
+    def test_verify(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dirname = os.path.join(tmpdir, "tree")
+            manifest = os.path.join(tmpdir, "manifest.jsonl")
+            cli(
+                parser().parse_args(
+                    [dirname, "--manifest", manifest, "--checksum", "crc32"]
+                    + ["-f", "3", "--files-sigma", "0"]
+                    + ["--size-distribution", "100"]
+                )
+            )
+            verify_cli(
+                verify_parser().parse_args([dirname, "--manifest", manifest])
+            )
+            remove_tree(dirname)
+            with self.assertRaises(SystemExit):
+                verify_cli(
+                    verify_parser().parse_args(
+                        [dirname, "--manifest", manifest]
+                    )
+                )
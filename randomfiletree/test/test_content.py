@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import csv
+import io
+import json
+import random
+import struct
+import zlib
+
+# ours
+from randomfiletree.content import (
+    CONTENT_TYPES,
+    ContentPayload,
+    parse_content_types,
+)
+from randomfiletree.core import iterative_tree
+
+
+class TestContent(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_parse_content_types(self) -> None:
+        self.assertEqual(
+            parse_content_types("text,json:2,png"),
+            {"text": 1.0, "json": 2.0, "png": 1.0},
+        )
+
+    def test_unknown_type(self) -> None:
+        with self.assertRaises(ValueError):
+            ContentPayload({"text": 1, "docx": 1})
+
+    def test_render(self) -> None:
+        payload = ContentPayload(size=2000)
+        text = payload.render("text").decode()
+        self.assertTrue(1000 < len(text) < 4000)
+        self.assertTrue(text.endswith(".\n"))
+        lines = payload.render("log").decode().splitlines()
+        self.assertTrue(len(lines) > 5)
+        self.assertEqual(lines, sorted(lines))
+        records = json.loads(payload.render("json"))
+        self.assertTrue(len(records) > 5)
+        self.assertEqual([r["id"] for r in records], list(range(len(records))))
+        rows = list(csv.reader(io.StringIO(payload.render("csv").decode())))
+        self.assertEqual(rows[0][0], "id")
+        self.assertTrue(all(len(row) == 6 for row in rows))
+
+    def test_png(self) -> None:
+        data = ContentPayload().render("png")
+        self.assertTrue(data.startswith(b"\x89PNG\r\n\x1a\n"))
+        self.assertTrue(data.endswith(b"IEND\xaeB`\x82"))
+        # Walk the chunks and check their checksums
+        offset = 8
+        kinds = []
+        while offset < len(data):
+            (length,) = struct.unpack(">I", data[offset : offset + 4])
+            chunk = data[offset + 4 : offset + 8 + length]
+            (crc,) = struct.unpack(
+                ">I", data[offset + 8 + length : offset + 12 + length]
+            )
+            self.assertEqual(zlib.crc32(chunk), crc)
+            kinds.append(chunk[:4])
+            offset += 12 + length
+        self.assertEqual(kinds, [b"IHDR", b"IDAT", b"tEXt", b"IEND"])
+
+    def test_pdf(self) -> None:
+        data = ContentPayload().render("pdf")
+        self.assertTrue(data.startswith(b"%PDF-1.4\n"))
+        self.assertTrue(data.endswith(b"%%EOF\n"))
+        startxref = int(data.rsplit(b"startxref\n", 1)[1].split()[0])
+        self.assertTrue(data[startxref:].startswith(b"xref"))
+        # Offsets of the cross-reference table point to the objects
+        entries = data[startxref:].split(b"\n")[3:8]
+        for i, entry in enumerate(entries, 1):
+            offset = int(entry.split()[0])
+            self.assertTrue(data[offset:].startswith(b"%d 0 obj" % i))
+
+    def test_reproducible(self) -> None:
+        data = []
+        for _ in range(2):
+            random.seed(7)
+            payload = ContentPayload()
+            data.append([payload.render(t) for t in CONTENT_TYPES])
+        self.assertEqual(data[0], data[1])
+
+    def test_tree(self) -> None:
+        payload = ContentPayload({"json": 1, "png": 1}, size=500)
+        _, files = iterative_tree(
+            self.basedir.name,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 5,
+            repeat=2,
+            payload=payload,
+        )
+        self.assertEqual(len(files), 20)
+        suffixes = set()
+        for f in files:
+            suffixes.add(f.suffix)
+            if f.suffix == ".json":
+                json.loads(f.read_text())
+            else:
+                self.assertTrue(f.read_bytes().startswith(b"\x89PNG"))
+        self.assertEqual(suffixes, {".json", ".png"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,9 +7,12 @@ import pathlib
 import random
 import os
 from typing import Generator, List, Tuple
+from unittest import mock
 
 # ours
 from randomfiletree.core import (
+    ScanCache,
+    _scan_tree,
     iterative_gaussian_tree,
     random_string,
     sample_random_elements,
@@ -80,6 +83,13 @@ class TestTreeCreation(unittest.TestCase):
         ) - self.basedir.name.count(os.sep)
         self.assertLessEqual(max_depth, 4)
 
+    def test_returned_paths(self) -> None:
+        dirs, files = iterative_gaussian_tree(self.basedir.name, 3, 2, 3)
+        self.assertEqual(sorted(map(str, dirs)), sorted(self.get_content()[0]))
+        self.assertEqual(sorted(map(str, files)), sorted(self.get_content()[1]))
+        for file in files:
+            self.assertTrue(file.is_file())
+
     def test_fname(self) -> None:
         suffix = ".jpg"
         iterative_gaussian_tree(
@@ -94,6 +104,20 @@ class TestTreeCreation(unittest.TestCase):
         for file in files:
             self.assertEqual(pathlib.Path(file).suffix, suffix)
 
+    def tree(self, seed: int) -> List[str]:
+        """Relative paths of the directories of a tree created from seed."""
+        self.basedir.cleanup()
+        self.basedir = tempfile.TemporaryDirectory()
+        random.seed(seed)
+        iterative_gaussian_tree(self.basedir.name, 3, 2, 3)
+        dirs, _ = self.get_content()
+        return sorted(os.path.relpath(d, self.basedir.name) for d in dirs)
+
+    def test_independent_of_numpy(self) -> None:
+        tree = self.tree(4)
+        with mock.patch("randomfiletree.distributions.numpy", None):
+            self.assertEqual(self.tree(4), tree)
+
     def test_payload(self) -> None:
         content = "testtest"
         suffix = ".txt"
@@ -171,5 +195,58 @@ class TestChooseSample(unittest.TestCase):
         self.assertEqual(len(files), 0)
 
 
+class TestScanCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+        self.cache = ScanCache(maxsize=2, racy_seconds=0)
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def assertScanEqual(self) -> None:
+        dirs, files = self.cache.scan(self.basedir.name)
+        expected_dirs, expected_files = _scan_tree(self.basedir.name)
+        self.assertEqual(sorted(dirs), sorted(expected_dirs))
+        self.assertEqual(sorted(files), sorted(expected_files))
+
+    def test_refresh(self) -> None:
+        iterative_gaussian_tree(self.basedir.name, 3, 2, 3)
+        self.assertScanEqual()
+        self.assertIs(
+            self.cache.scan(self.basedir.name),
+            self.cache.scan(self.basedir.name),
+        )
+        # Make sure that changes are visible in the mtimes even on file
+        # systems with coarse timestamps
+        for d in _scan_tree(self.basedir.name)[0] + [self.basedir.name]:
+            os.utime(d, (0, 0))
+        iterative_gaussian_tree(self.basedir.name, 3, 2, 1)
+        self.assertScanEqual()
+        dirs, _ = sample_random_elements(self.basedir.name, 3, 0)
+        # Rename nested directories before their parents
+        for d in sorted(dirs, key=lambda d: len(d.parts), reverse=True):
+            os.utime(os.path.dirname(d), (0, 0))
+            os.rename(d, str(d) + "_renamed")
+        self.assertScanEqual()
+
+    def test_choose_sample(self) -> None:
+        iterative_gaussian_tree(self.basedir.name, 5, 5, 3)
+        dirs, files = choose_random_elements(
+            self.basedir.name, 5, 3, cache=self.cache
+        )
+        self.assertEqual(len(dirs), 5)
+        dirs, files = sample_random_elements(
+            self.basedir.name, 2, 2, cache=self.cache
+        )
+        self.assertEqual(len(set(files)), 2)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_lru(self) -> None:
+        for _ in range(3):
+            with tempfile.TemporaryDirectory() as dirname:
+                self.cache.scan(dirname)
+        self.assertEqual(len(self.cache), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import random
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+# ours
+from randomfiletree.distributions import (
+    DISTRIBUTIONS,
+    BatchSampler,
+    numpy,
+    parse_distribution,
+)
+
+
+class TestBatchSampler(unittest.TestCase):
+    def test_clip(self) -> None:
+        sampler = BatchSampler("gauss", mean=5, sigma=10, min=2, max=6)
+        values = sampler.sample(3000)
+        self.assertEqual(min(values), 2)
+        self.assertEqual(max(values), 6)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            BatchSampler("unknown")
+        with self.assertRaises(TypeError):
+            BatchSampler("gauss", mu=3)
+        with self.assertRaises(ValueError):
+            BatchSampler("zipf", a=1)
+
+    def test_spawn(self) -> None:
+        sampler = BatchSampler("poisson", lam=5, use_numpy=False, max=7)
+        values = [sampler.spawn(random.Random(3)).sample(100) for _ in range(2)]
+        self.assertEqual(values[0], values[1])
+        self.assertLessEqual(max(values[0]), 7)
+
+    def test_threads(self) -> None:
+        # Batches are refilled by one thread at a time
+        sampler = BatchSampler("constant", value=1, batch_size=3)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(sampler.sample, [1000] * 8))
+        self.assertEqual(sum(map(sum, results)), 8000)
+
+    def check_means(self, use_numpy: bool) -> None:
+        expected: Dict[str, Tuple[Dict[str, Any], float]] = {
+            "poisson": ({"lam": 3}, 3),
+            "poisson_large": ({"lam": 40}, 40),
+            "negative_binomial": ({"k": 2, "p": 0.25}, 6),
+            "lognormal": ({"mu": 3, "sigma": 0.5}, 22.8),
+            "pareto": ({"alpha": 3, "xmin": 10}, 15),
+            "zipf": ({"a": 4}, 1.1),
+            "histogram": (
+                {"low": [0, 10], "high": [1, 20], "weights": [1, 1]},
+                7.25,
+            ),
+        }
+        for name, (params, mean) in expected.items():
+            sampler = BatchSampler(
+                name.replace("_large", ""),
+                use_numpy=use_numpy,
+                batch_size=20000,
+                **params
+            )
+            # Integer conversion truncates continuous values
+            self.assertAlmostEqual(
+                statistics.mean(sampler.sample(20000)),
+                mean,
+                delta=0.1 * mean + 0.6,
+                msg=name,
+            )
+
+    def test_means_python(self) -> None:
+        self.check_means(use_numpy=False)
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_means_numpy(self) -> None:
+        self.check_means(use_numpy=True)
+
+    def test_numpy_complete(self) -> None:
+        from randomfiletree.distributions import NUMPY_DISTRIBUTIONS
+
+        self.assertEqual(set(DISTRIBUTIONS), set(NUMPY_DISTRIBUTIONS))
+
+
+class TestParseDistribution(unittest.TestCase):
+    def test_parse(self) -> None:
+        self.assertEqual(
+            parse_distribution("lognormal:mu=8,sigma=2"),
+            {"distribution": "lognormal", "mu": 8, "sigma": 2},
+        )
+        self.assertEqual(
+            parse_distribution("3"), {"distribution": "constant", "value": 3}
+        )
+        self.assertEqual(parse_distribution("zipf"), {"distribution": "zipf"})
+        with self.assertRaises(ValueError):
+            parse_distribution("poisson:3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+
+# ours
+from randomfiletree.core import iterative_gaussian_tree, iterative_tree
+from randomfiletree.durability import Syncer, sync_filesystem
+from randomfiletree.links import Links
+from randomfiletree.stats import TreeStats
+
+
+class TestDurability(unittest.TestCase):
+    def generate(self, durability: str) -> TreeStats:
+        stats = TreeStats()
+        with tempfile.TemporaryDirectory() as dirname:
+            iterative_tree(
+                dirname,
+                nfolders_func=lambda depth: 2,
+                nfiles_func=lambda depth: 3,
+                repeat=2,
+                stats=stats,
+                durability=durability,
+            )
+        return stats
+
+    def test_policies(self) -> None:
+        # Directories are filled 4 times (the base directory twice), always
+        # with new subdirectories
+        stats = self.generate("none")
+        self.assertEqual(stats.n_syncs, 0)
+        self.assertEqual(stats.sync_time, 0)
+        stats = self.generate("file")
+        self.assertEqual(stats.n_files, 12)
+        self.assertEqual(stats.n_syncs, 2 * 12 + 4)
+        stats = self.generate("directory")
+        self.assertEqual(stats.n_syncs, 12 + 4)
+        self.assertIn("Flushed to disk 16 times in", stats.format())
+        stats = self.generate("end")
+        self.assertEqual(stats.n_syncs, 1)
+        self.assertGreater(stats.sync_time, 0)
+        self.assertIn("Flushed to disk 1 time in", stats.format())
+        self.assertEqual(TreeStats.from_dict(stats.to_dict()).n_syncs, 1)
+
+    def test_payload(self) -> None:
+        stats = TreeStats()
+        with tempfile.TemporaryDirectory() as dirname:
+
+            def payload(directory):
+                for i in range(100):
+                    path = directory / f"{i}.txt"
+                    path.write_text("data")
+                    yield path
+
+            iterative_gaussian_tree(
+                dirname,
+                nfiles=3,
+                nfolders=0,
+                sigma_files=0,
+                sigma_folders=0,
+                payload=payload,
+                stats=stats,
+                durability="directory",
+            )
+        self.assertEqual(stats.n_syncs, 3 + 1)
+
+    def test_links(self) -> None:
+        def generate(durability: str, links: Links) -> TreeStats:
+            stats = TreeStats()
+            with tempfile.TemporaryDirectory() as dirname:
+                iterative_tree(
+                    dirname,
+                    nfolders_func=lambda depth: 0,
+                    nfiles_func=lambda depth: 10,
+                    repeat=2,
+                    stats=stats,
+                    durability=durability,
+                    links=links,
+                )
+            return stats
+
+        # The first entry is a regular file, all others are links. The
+        # second pass only creates links.
+        stats = generate("file", Links(hardlinks=1))
+        self.assertEqual(stats.n_syncs, 2 * 20)
+        stats = generate("directory", Links(hardlinks=1))
+        self.assertEqual(stats.n_syncs, 2 * (10 + 1))
+        # Symbolic links are flushed with their directory
+        stats = generate("file", Links(symlinks=1))
+        self.assertEqual(stats.n_syncs, 2 + 1 + 1)
+        stats = generate("directory", Links(symlinks=1))
+        self.assertEqual(stats.n_syncs, 2 + 1)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            Syncer("always")
+
+    def test_sync_filesystem(self) -> None:
+        with tempfile.TemporaryDirectory() as dirname:
+            sync_filesystem(dirname)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import random
+
+# ours
+from randomfiletree.flat import flat_tree
+from randomfiletree.manifest import Manifest
+from randomfiletree.stats import TreeStats
+
+
+class TestFlatTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirname = os.path.join(self.tmpdir.name, "flat")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_flat(self) -> None:
+        manifest = Manifest(self.dirname)
+        stats = TreeStats()
+        report = flat_tree(
+            self.dirname,
+            2500,
+            workers=3,
+            batch_size=100,
+            size=10,
+            report_every=1000,
+            manifest=manifest,
+            stats=stats,
+        )
+        self.assertEqual(report.created, 2500)
+        self.assertEqual(len(os.listdir(self.dirname)), 2500)
+        self.assertEqual(
+            sorted(os.listdir(self.dirname)), sorted(report.names())
+        )
+        self.assertEqual([n for n, _ in report.curve], [1000, 2000, 2500])
+        self.assertTrue(all(rate > 0 for _, rate in report.curve))
+        self.assertEqual(len(manifest.files), 2500)
+        self.assertEqual(stats.n_files, 2500)
+        self.assertEqual(stats.total_bytes, 25000)
+        for f in report.files[:10]:
+            self.assertEqual(f.stat().st_size, 10)
+        self.assertIn("entries/s", report.format())
+
+    def test_reproducible(self) -> None:
+        random.seed(0)
+        report = flat_tree(self.dirname, 100, batch_size=7)
+        random.seed(0)
+        report = flat_tree(self.dirname, 120, batch_size=7)
+        # Same names as before are skipped
+        self.assertEqual(report.created, 20)
+        self.assertEqual(len(os.listdir(self.dirname)), 120)
+
+    def test_sequential(self) -> None:
+        report = flat_tree(
+            self.dirname, 11, names="sequential", prefix="f", durability="file"
+        )
+        self.assertEqual(list(report.names())[:2], ["f00", "f01"])
+        self.assertEqual(len(os.listdir(self.dirname)), 11)
+        with self.assertRaises(ValueError):
+            flat_tree(self.dirname, 1, names="other")
+
+
+if __name__ == "__main__":
+    unittest.main()
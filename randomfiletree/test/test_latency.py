@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+
+# ours
+from randomfiletree.latency import LatencyRecorder, percentile
+
+
+class TestLatency(unittest.TestCase):
+    def test_percentile(self) -> None:
+        values = list(range(101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([], 50), 0)
+        # Nearest rank: Smallest value with at least q% of the values at or
+        # below it
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 51), 3)
+        self.assertEqual(percentile([1, 2, 3, 4], 0), 1)
+
+    def test_recorder(self) -> None:
+        recorder = LatencyRecorder()
+        for i in range(10):
+            recorder.record("read", i / 1000)
+        self.assertEqual(recorder.count("read"), 10)
+        self.assertEqual(recorder.summary()["read"]["max"], 0.009)
+        self.assertIn("read", recorder.format())
+        other = LatencyRecorder()
+        other.record("read", 1)
+        other.record("write", 1)
+        recorder.merge(other)
+        self.assertEqual(recorder.count("read"), 11)
+        self.assertEqual(recorder.count("write"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
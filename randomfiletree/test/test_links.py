@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import errno
+import os
+from pathlib import Path
+from unittest import mock
+
+# ours
+from randomfiletree.core import iterative_gaussian_tree, iterative_tree
+from randomfiletree.links import Links
+from randomfiletree.manifest import Manifest
+from randomfiletree.remove import remove_tree
+
+
+class TestLinks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            Links(hardlinks=0.8, symlinks=0.3)
+        with self.assertRaises(ValueError):
+            Links(dangling=-0.1)
+        with self.assertRaises(ValueError):
+            Links(hardlinks=0.5, pool_size=0)
+
+    def test_index(self) -> None:
+        links = Links(symlinks=1, pool_size=2, index_size=10)
+        self.assertIsNone(links.draw())
+        for i in range(100):
+            links.add(str(i))
+        self.assertEqual(links.pool, ["0", "1"])
+        self.assertEqual(len(links.index), 10)
+        self.assertEqual(len(set(links.index)), 10)
+        self.assertEqual(links.draw(), "symlink")
+
+    def test_tree(self) -> None:
+        manifest = Manifest(self.basedir.name)
+        links = Links(hardlinks=0.5, symlinks=0.2, dangling=0.1, pool_size=3)
+        dirs, files = iterative_tree(
+            self.basedir.name,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 20,
+            repeat=3,
+            manifest=manifest,
+            links=links,
+        )
+        types = [entry["type"] for entry in manifest.entries.values()]
+        n_hardlinks = types.count("hardlink")
+        n_symlinks = types.count("symlink")
+        self.assertEqual(types.count("file"), len(files))
+        self.assertEqual(
+            len(files) + n_hardlinks + n_symlinks, 20 * (1 + 3 + 9)
+        )
+        self.assertGreater(n_hardlinks, 0)
+        self.assertGreater(n_symlinks, 0)
+        # Hardlinks share the inodes of the pool
+        inodes = set()
+        dangling = 0
+        for rel, entry in manifest.entries.items():
+            path = Path(self.basedir.name, rel)
+            if entry["type"] == "hardlink":
+                inodes.add(path.stat().st_ino)
+                self.assertTrue(
+                    path.samefile(Path(self.basedir.name, entry["target"]))
+                )
+            elif entry["type"] == "symlink":
+                self.assertTrue(path.is_symlink())
+                self.assertEqual(os.readlink(str(path)), entry["target"])
+                dangling += not path.exists()
+        self.assertLessEqual(len(inodes), 3)
+        self.assertGreater(dangling, 0)
+        self.assertLess(dangling, n_symlinks)
+        # Links are removed with the tree
+        remove_tree(self.basedir.name, manifest=manifest)
+        self.assertFalse(os.path.exists(self.basedir.name))
+
+    def test_link_limit(self) -> None:
+        link = os.link
+        full = os.path.join(self.basedir.name, "full")
+
+        def limited_link(source, *args, **kwargs):
+            if source == full:
+                raise OSError(errno.EMLINK, "Too many links")
+            return link(source, *args, **kwargs)
+
+        links = Links(hardlinks=1, pool_size=2)
+        for name in ["full", "other", "new"]:
+            Path(self.basedir.name, name).touch()
+        other = os.path.join(self.basedir.name, "other")
+        links.add(full)
+        links.add(other)
+        with mock.patch("randomfiletree.links.os.link", limited_link):
+            for i in range(5):
+                self.assertEqual(
+                    links.create(
+                        "hardlink", self.basedir.name, None, f"link{i}"
+                    ),
+                    ("hardlink", other),
+                )
+        # The full file is replaced in the pool by the next new file
+        links.add(os.path.join(self.basedir.name, "new"))
+        self.assertNotIn(full, links.pool)
+        self.assertEqual(len(links.pool), 2)
+
+    def test_link_limit_tree(self) -> None:
+        # Regular files are created once all files of the pool are full
+        with mock.patch(
+            "randomfiletree.links.os.link",
+            side_effect=OSError(errno.EMLINK, "Too many links"),
+        ):
+            _, files = iterative_tree(
+                self.basedir.name,
+                nfolders_func=lambda depth: 0,
+                nfiles_func=lambda depth: 20,
+                links=Links(hardlinks=1, pool_size=3),
+            )
+        self.assertEqual(len(files), 20)
+        self.assertEqual(len(os.listdir(self.basedir.name)), 20)
+
+    def test_payload(self) -> None:
+        def payload(directory):
+            for i in range(100):
+                path = directory / f"{i}.txt"
+                path.write_text("data")
+                yield path
+
+        manifest = Manifest(self.basedir.name)
+        _, files = iterative_gaussian_tree(
+            self.basedir.name,
+            nfiles=30,
+            nfolders=0,
+            sigma_files=0,
+            sigma_folders=0,
+            payload=payload,
+            manifest=manifest,
+            links=Links(hardlinks=0.5),
+        )
+        self.assertEqual(len(manifest), 30)
+        for f in files:
+            self.assertEqual(f.read_text(), "data")
+        self.assertEqual(len(os.listdir(self.basedir.name)), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
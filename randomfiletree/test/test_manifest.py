@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+from unittest import mock
+
+# ours
+from randomfiletree.content import ContentPayload
+from randomfiletree.core import iterative_gaussian_tree, iterative_tree
+from randomfiletree.flat import flat_tree
+from randomfiletree.manifest import Manifest, file_checksum
+from randomfiletree.spec import iterative_distribution_tree
+from randomfiletree.verify import verify
+
+
+def _not_read(path, algorithm):
+    raise AssertionError(f"{path} was read")
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_generation(self) -> None:
+        manifest = Manifest(self.basedir.name)
+        dirs, files = iterative_gaussian_tree(
+            self.basedir.name, 3, 2, 3, manifest=manifest
+        )
+        self.assertEqual(sorted(manifest.dirs), sorted(dirs))
+        self.assertEqual(sorted(manifest.files), sorted(files))
+
+    def test_save_load(self) -> None:
+        manifest = Manifest.from_lists(
+            self.basedir.name,
+            [os.path.join(self.basedir.name, "a")],
+            [os.path.join(self.basedir.name, "a", "b")],
+        )
+        path = os.path.join(self.basedir.name, "manifest.jsonl")
+        manifest.save(path)
+        loaded = Manifest.load(path)
+        self.assertEqual(loaded.basedir, manifest.basedir)
+        self.assertEqual(loaded.entries, manifest.entries)
+        moved = Manifest.load(path, basedir="/elsewhere")
+        self.assertEqual([str(d) for d in moved.dirs], ["/elsewhere/a"])
+
+    def test_checksums(self) -> None:
+        path = os.path.join(self.basedir.name, "file")
+        with open(path, "wb") as f:
+            f.write(b"abc")
+        for algorithm, checksum in [
+            ("crc32", "352441c2"),
+            (
+                "sha256",
+                "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+            ),
+        ]:
+            manifest = Manifest(self.basedir.name, checksum=algorithm)
+            manifest.add_files([path])
+            self.assertEqual(
+                manifest.entries["file"],
+                {"type": "file", "size": 3, "checksum": checksum},
+            )
+            saved = os.path.join(self.basedir.name, "manifest.jsonl")
+            manifest.save(saved)
+            self.assertEqual(Manifest.load(saved).checksum, algorithm)
+        with self.assertRaises(ValueError):
+            Manifest(self.basedir.name, checksum="unknown")
+
+    def test_add_content(self) -> None:
+        path = os.path.join(self.basedir.name, "file")
+        with open(path, "wb") as f:
+            f.write(b"abc")
+        manifest = Manifest(self.basedir.name, checksum="blake2b")
+        manifest.add_content(path, b"abc")
+        self.assertEqual(
+            manifest.entries["file"]["checksum"], file_checksum(path, "blake2b")
+        )
+        self.assertEqual(manifest.entries["file"]["size"], 3)
+
+    def test_unreadable(self) -> None:
+        for name in ["empty", "full"]:
+            with open(os.path.join(self.basedir.name, name), "wb") as f:
+                f.write(b"abc" if name == "full" else b"")
+
+        def unreadable(path, algorithm):
+            raise PermissionError(13, "Permission denied", str(path))
+
+        manifest = Manifest(self.basedir.name, checksum="crc32")
+        with mock.patch("randomfiletree.manifest.file_checksum", unreadable):
+            manifest.add_files(
+                os.path.join(self.basedir.name, name)
+                for name in ["empty", "full"]
+            )
+        # Empty files are not opened
+        self.assertEqual(
+            manifest.entries["empty"],
+            {"type": "file", "size": 0, "checksum": "00000000"},
+        )
+        self.assertIn("Permission denied", manifest.entries["full"]["error"])
+
+    def test_checksums_while_writing(self) -> None:
+        generators = {
+            "spec": lambda path, manifest: iterative_distribution_tree(
+                path, files=3, size=1000, manifest=manifest
+            ),
+            "content": lambda path, manifest: iterative_tree(
+                path,
+                nfolders_func=lambda depth: 2,
+                nfiles_func=lambda depth: 3,
+                repeat=2,
+                payload=ContentPayload(manifest=manifest),
+                manifest=manifest,
+            ),
+            "flat": lambda path, manifest: flat_tree(
+                path, 100, size=1000, manifest=manifest
+            ),
+            "empty": lambda path, manifest: iterative_gaussian_tree(
+                path, 3, 2, 3, sigma_files=0, manifest=manifest
+            ),
+        }
+        for name, generate in generators.items():
+            path = os.path.join(self.basedir.name, name)
+            manifest = Manifest(path, checksum="sha256")
+            with mock.patch("randomfiletree.manifest.file_checksum", _not_read):
+                generate(path, manifest)
+            self.assertGreater(len(manifest.files), 0)
+            self.assertTrue(verify(path, manifest).ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import stat
+import time
+
+# ours
+from randomfiletree.core import iterative_tree
+from randomfiletree.flat import flat_tree
+from randomfiletree.metadata import Metadata, parse_modes
+
+
+class TestMetadata(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_parse_modes(self) -> None:
+        self.assertEqual(parse_modes("644"), 0o644)
+        self.assertEqual(
+            parse_modes("644:0.9,600:0.1"), {0o644: 0.9, 0o600: 0.1}
+        )
+
+    def test_draw(self) -> None:
+        metadata = Metadata(mtime=100, atime=10, mode=0o600, now=1000)
+        self.assertEqual(metadata.draw(), ((990 * 10**9, 900 * 10**9), 0o600))
+        self.assertEqual(Metadata().draw(), (None, None))
+
+    def test_tree(self) -> None:
+        now = time.time()
+        metadata = Metadata(
+            mtime={"distribution": "uniform", "low": 1000, "high": 2000},
+            mode={0o640: 1, 0o600: 1},
+        )
+
+        def payload(directory):
+            for i in range(100):
+                path = directory / f"{i}.txt"
+                path.write_text("data")
+                yield path
+
+        for i, files_payload in enumerate([None, payload]):
+            _, files = iterative_tree(
+                os.path.join(self.basedir.name, str(i)),
+                nfolders_func=lambda depth: 2,
+                nfiles_func=lambda depth: 5,
+                repeat=2,
+                payload=files_payload,
+                metadata=metadata,
+            )
+            modes = set()
+            for f in files:
+                st = f.stat()
+                self.assertTrue(now - 2001 < st.st_mtime < now - 999)
+                self.assertEqual(st.st_atime, st.st_mtime)
+                modes.add(stat.S_IMODE(st.st_mode))
+            self.assertEqual(modes, {0o640, 0o600})
+
+    def test_existing(self) -> None:
+        # Files that are created again keep random timestamps
+        metadata = Metadata(mtime=3600)
+        _, files = iterative_tree(
+            self.basedir.name,
+            nfolders_func=lambda depth: 1,
+            nfiles_func=lambda depth: 2,
+            repeat=3,
+            filename=lambda: "file",
+            metadata=metadata,
+        )
+        for f in files:
+            self.assertLess(f.stat().st_mtime, time.time() - 3500)
+
+    def test_payload_subdirectory(self) -> None:
+        def payload(directory):
+            (directory / "sub").mkdir(exist_ok=True)
+            for i in range(100):
+                path = directory / "sub" / f"{i}.txt"
+                path.write_text("data")
+                yield path
+
+        _, files = iterative_tree(
+            self.basedir.name,
+            nfolders_func=lambda depth: 0,
+            nfiles_func=lambda depth: 3,
+            payload=payload,
+            metadata=Metadata(mtime=3600, mode=0o600),
+        )
+        self.assertEqual(len(files), 3)
+        for f in files:
+            st = f.stat()
+            self.assertLess(st.st_mtime, time.time() - 3500)
+            self.assertEqual(stat.S_IMODE(st.st_mode), 0o600)
+
+    def test_flat(self) -> None:
+        report = flat_tree(
+            self.basedir.name,
+            100,
+            size=10,
+            metadata=Metadata(mtime=3600, mode=0o600),
+        )
+        for f in report.files:
+            st = f.stat()
+            self.assertLess(st.st_mtime, time.time() - 3500)
+            self.assertEqual(stat.S_IMODE(st.st_mode), 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import random
+
+# ours
+from randomfiletree.core import iterative_tree
+from randomfiletree.profile import Histogram, TreeProfile, clone_tree
+from randomfiletree.spec import iterative_distribution_tree
+from randomfiletree.stats import TreeStats
+
+
+class TestHistogram(unittest.TestCase):
+    def test_bins(self) -> None:
+        histogram = Histogram(exact=4, subbins=2)
+        for value in [0, 3, 3, 4, 5, 6, 7, 100]:
+            histogram.add(value)
+        self.assertEqual(histogram.counts, {0: 1, 3: 2, 4: 2, 6: 2, 96: 1})
+        self.assertEqual(histogram.n, 8)
+        self.assertEqual(histogram.total, 128)
+        self.assertEqual(
+            histogram.distribution(),
+            {
+                "distribution": "histogram",
+                "low": [0, 3, 4, 6, 96],
+                "high": [1, 4, 6, 8, 128],
+                "weights": [1, 2, 2, 2, 1],
+            },
+        )
+        self.assertEqual(
+            Histogram.from_dict(histogram.to_dict()).counts, histogram.counts
+        )
+
+    def test_constant(self) -> None:
+        histogram = Histogram(exact=16)
+        histogram.add(3, count=10)
+        self.assertEqual(histogram.distribution(), 3)
+        self.assertEqual(Histogram().distribution(), 0)
+
+
+class TestTreeProfile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.basedir.name, "source")
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_scan(self) -> None:
+        iterative_tree(
+            self.source,
+            nfolders_func=lambda depth: 3,
+            nfiles_func=lambda depth: 2,
+            repeat=3,
+        )
+        profile = TreeProfile.scan(self.source, workers=2)
+        self.assertEqual(
+            [level.folders.n for level in profile.levels], [1, 9, 27, 27]
+        )
+        self.assertEqual(profile.n_dirs, 63)
+        self.assertEqual(profile.n_files, 42)
+        self.assertEqual(profile.total_size, 0)
+        self.assertEqual(profile.errors, 0)
+        self.assertIn("63 directories, 42 files", profile.format())
+
+    def test_save_load(self) -> None:
+        iterative_distribution_tree(
+            self.source, files=3, size={"distribution": "uniform", "high": 1e4}
+        )
+        profile = TreeProfile.scan(self.source)
+        path = os.path.join(self.basedir.name, "profile.json")
+        profile.save(path)
+        loaded = TreeProfile.load(path)
+        self.assertEqual(loaded.to_dict(), profile.to_dict())
+        self.assertEqual(loaded.total_size, profile.total_size)
+
+    def test_clone(self) -> None:
+        # Trees with constant shapes per depth are cloned exactly (up to
+        # the width of the bins of the file sizes)
+        for i in range(3):
+            for j in range(2):
+                subdir = os.path.join(self.source, str(i), str(j))
+                os.makedirs(subdir)
+                for k in range(4):
+                    with open(os.path.join(subdir, str(k)), "wb") as fh:
+                        fh.write(b"x" * 100)
+        stats = TreeStats()
+        dirs, files = clone_tree(
+            self.source, os.path.join(self.basedir.name, "clone"), stats=stats
+        )
+        self.assertEqual(len(dirs), 9)
+        self.assertEqual(len(files), 24)
+        self.assertEqual(stats.dirs_per_depth, [0, 3, 6, 0])
+        self.assertEqual(stats.files_per_depth, [0, 0, 0, 24])
+        for f in files:
+            self.assertTrue(96 <= f.stat().st_size < 104)
+
+    def test_scale(self) -> None:
+        random.seed(3)
+        for i in range(150):
+            subdirs = [os.path.join(self.source, str(i))] + [
+                os.path.join(self.source, str(i), str(j))
+                for j in range(random.randint(1, 3))
+            ]
+            for subdir in subdirs:
+                os.makedirs(subdir, exist_ok=True)
+                for k in range(random.randint(0, 4)):
+                    with open(os.path.join(subdir, f"f{k}"), "wb") as fh:
+                        fh.write(b"x" * 100)
+        profile = TreeProfile.scan(self.source)
+        for scale in [0.2, 2]:
+            clone = os.path.join(self.basedir.name, str(scale))
+            dirs, files = profile.generate(clone, scale=scale)
+            self.assertAlmostEqual(
+                len(dirs) / profile.n_dirs, scale, delta=0.15 * scale
+            )
+            self.assertAlmostEqual(
+                len(files) / profile.n_files, scale, delta=0.15 * scale
+            )
+            self.assertLessEqual(
+                len(TreeProfile.scan(clone).levels), len(profile.levels)
+            )
+        # Scaling spread over both levels keeps the number of files
+        clone = os.path.join(self.basedir.name, "spread")
+        _, files = profile.generate(clone, scale=0.2, scale_depth=1)
+        self.assertAlmostEqual(
+            len(files) / profile.n_files, 0.2, delta=0.15 * 0.2
+        )
+
+    def test_invalid_scale(self) -> None:
+        with self.assertRaises(ValueError):
+            TreeProfile().generate(self.basedir.name, scale=-1)
+        with self.assertRaises(ValueError):
+            TreeProfile().generate(self.basedir.name, scale_depth=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+
+# ours
+from randomfiletree.core import ScanCache, iterative_tree
+from randomfiletree.read import read_workload
+from randomfiletree.weighted import WeightedSelector
+
+
+class TestReadWorkload(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+        self.sizes = [0, 10, 5000, 300000]
+
+        def payload(directory):
+            for i, size in enumerate(self.sizes * 100):
+                path = directory / f"{i}.bin"
+                path.write_bytes(os.urandom(size))
+                yield path
+
+        iterative_tree(
+            self.basedir.name,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 4,
+            repeat=2,
+            payload=payload,
+        )
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_methods(self) -> None:
+        for method in ["buffer", "mmap"]:
+            report = read_workload(
+                self.basedir.name,
+                n_reads=50,
+                workers=3,
+                method=method,
+                buffer_size=4096,
+            )
+            self.assertEqual(report.n_reads, 50)
+            self.assertEqual(report.errors, 0)
+            self.assertGreater(report.bytes_read, 0)
+            self.assertGreater(report.mb_per_second, 0)
+            self.assertIn("MB/s", report.format())
+
+    def test_weighted(self) -> None:
+        selector = WeightedSelector(self.basedir.name, weight="size")
+        report = read_workload(self.basedir.name, n_reads=20, selector=selector)
+        # Only the largest files have a noticeable weight
+        self.assertGreater(report.bytes_read, 20 * 5000)
+
+    def test_errors(self) -> None:
+        selector = WeightedSelector(self.basedir.name, weight="size")
+        # Files are replaced by directories after the scan
+        for root, _, files in os.walk(self.basedir.name):
+            for name in files:
+                os.remove(os.path.join(root, name))
+                os.mkdir(os.path.join(root, name))
+        report = read_workload(
+            self.basedir.name, n_reads=20, workers=2, selector=selector
+        )
+        self.assertEqual(report.n_reads, 0)
+        self.assertEqual(report.errors, 20)
+
+    def test_duration(self) -> None:
+        report = read_workload(
+            self.basedir.name, duration=0.1, cache=ScanCache()
+        )
+        self.assertGreater(report.n_reads, 0)
+        self.assertLess(report.elapsed, 1)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            read_workload(self.basedir.name)
+        with self.assertRaises(ValueError):
+            read_workload(self.basedir.name, n_reads=1, method="aio")
+        with tempfile.TemporaryDirectory() as empty:
+            with self.assertRaises(ValueError):
+                read_workload(empty, n_reads=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+
+# ours
+from randomfiletree.core import iterative_gaussian_tree
+from randomfiletree.manifest import Manifest
+from randomfiletree.remove import remove_tree
+
+
+class TestRemoveTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.basedir = os.path.join(self.tmpdir.name, "tree")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_remove_scan(self) -> None:
+        iterative_gaussian_tree(self.basedir, 3, 2, 3)
+        remove_tree(self.basedir, workers=4)
+        self.assertFalse(os.path.exists(self.basedir))
+
+    def test_remove_manifest(self) -> None:
+        manifest = Manifest(self.basedir)
+        iterative_gaussian_tree(self.basedir, 3, 2, 3, manifest=manifest)
+        remove_tree(self.basedir, manifest=manifest, workers=4)
+        self.assertFalse(os.path.exists(self.basedir))
+
+    def test_remove_manifest_unknown_entries(self) -> None:
+        manifest = Manifest(self.basedir)
+        iterative_gaussian_tree(self.basedir, 3, -10, 1, manifest=manifest)
+        iterative_gaussian_tree(self.basedir, 3, 2, 3)
+        os.symlink(self.tmpdir.name, os.path.join(self.basedir, "link"))
+        remove_tree(self.basedir, manifest=manifest)
+        self.assertFalse(os.path.exists(self.basedir))
+        self.assertTrue(os.path.exists(self.tmpdir.name))
+
+    def test_remove_manifest_replaced(self) -> None:
+        outside = os.path.join(self.tmpdir.name, "outside")
+        os.makedirs(os.path.join(self.basedir, "a", "b"))
+        os.makedirs(os.path.join(outside, "b"))
+        for path in ["a/f", "a/b/g", "c"]:
+            with open(os.path.join(self.basedir, path), "w"):
+                pass
+        with open(os.path.join(outside, "f"), "w"):
+            pass
+        manifest = Manifest(self.basedir)
+        for path, kind in [
+            ("a", "dir"),
+            ("a/b", "dir"),
+            ("a/f", "file"),
+            ("a/b/g", "file"),
+            ("c", "file"),
+        ]:
+            manifest.add(os.path.join(self.basedir, path), kind)
+        # Directory replaced by a symlink, file replaced by a directory
+        os.rename(
+            os.path.join(self.basedir, "a"), os.path.join(self.tmpdir.name, "a")
+        )
+        os.symlink(outside, os.path.join(self.basedir, "a"))
+        os.unlink(os.path.join(self.basedir, "c"))
+        os.makedirs(os.path.join(self.basedir, "c", "d"))
+        remove_tree(self.basedir, manifest=manifest)
+        self.assertFalse(os.path.exists(self.basedir))
+        self.assertEqual(sorted(os.listdir(outside)), ["b", "f"])
+
+    def test_remove_manifest_outside(self) -> None:
+        iterative_gaussian_tree(self.basedir, 3, 2, 1)
+        manifest = Manifest(self.basedir)
+        manifest.entries["../outside"] = {"type": "file"}
+        with self.assertRaises(ValueError):
+            remove_tree(self.basedir, manifest=manifest)
+        self.assertTrue(os.path.exists(self.basedir))
+
+
+if __name__ == "__main__":
+    unittest.main()
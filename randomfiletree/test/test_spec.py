@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import pathlib
+
+# ours
+from randomfiletree.core import _scan_tree
+from randomfiletree.spec import TreeSpec, iterative_distribution_tree
+from randomfiletree.stats import TreeStats
+
+
+class TestTreeSpec(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_per_depth(self) -> None:
+        spec = TreeSpec(
+            {
+                "repeat": 3,
+                "default": {"folders": 0, "files": 1, "size": 10},
+                "depth": {
+                    "0": {"folders": 3, "files": 0},
+                    "1": {"folders": 2, "name": "f{n}_{depth}.log"},
+                },
+            }
+        )
+        stats = TreeStats()
+        dirs, files = spec.generate(self.basedir.name, stats=stats)
+        self.assertEqual(stats.dirs_per_depth[1:3], [9, 18])
+        self.assertEqual(stats.files_per_depth[1:4], [0, 9, 6])
+        self.assertEqual(len(dirs), 27)
+        self.assertEqual(len(files), 15)
+        for f in files:
+            self.assertEqual(f.stat().st_size, 10)
+            depth = len(f.parts) - len(pathlib.Path(self.basedir.name).parts)
+            if depth == 2:
+                self.assertTrue(f.name.endswith("_1.log"))
+        self.assertEqual(len(_scan_tree(self.basedir.name)[1]), 15)
+
+    def test_default(self) -> None:
+        spec = TreeSpec({"repeat": 2, "maxdepth": 2})
+        spec.generate(self.basedir.name)
+        with self.assertRaises(ValueError):
+            TreeSpec({"repat": 2})
+        with self.assertRaises(ValueError):
+            TreeSpec({"default": {"name": "{unknown}"}})
+
+    def test_load(self) -> None:
+        path = os.path.join(self.basedir.name, "spec.toml")
+        with open(path, "w") as f:
+            f.write(
+                "repeat = 2\n"
+                "[default]\n"
+                'files = {distribution = "uniform", low = 1, high = 3}\n'
+            )
+        try:
+            spec = TreeSpec.load(path)
+        except ImportError:
+            self.skipTest("No TOML parser available")
+        self.assertEqual(spec.repeat, 2)
+        self.assertIn(spec.nfiles(0), [1, 2, 3])
+
+    def test_distribution_tree(self) -> None:
+        stats = TreeStats()
+        dirs, files = iterative_distribution_tree(
+            self.basedir.name,
+            folders={"distribution": "zipf", "a": 2, "max": 5},
+            files={"distribution": "poisson", "lam": 3},
+            size={"distribution": "pareto", "alpha": 2, "xmin": 10},
+            repeat=3,
+            stats=stats,
+        )
+        self.assertGreater(len(dirs), 0)
+        self.assertLessEqual(max(stats.dir_fanout), 5)
+        for f in files:
+            self.assertGreaterEqual(f.stat().st_size, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import pathlib
+from typing import Generator
+
+# ours
+from randomfiletree.core import _scan_tree, iterative_gaussian_tree
+from randomfiletree.stats import TreeStats
+
+
+class TestTreeStats(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_counts(self) -> None:
+        stats = TreeStats()
+        iterative_gaussian_tree(self.basedir.name, 3, 2, 3, stats=stats)
+        dirs, files = _scan_tree(self.basedir.name)
+        self.assertEqual(stats.n_dirs, len(dirs))
+        self.assertEqual(stats.n_files, len(files))
+        base_depth = len(pathlib.Path(self.basedir.name).parts)
+        for depth in range(1, stats.max_depth + 1):
+            self.assertEqual(
+                stats.dirs_per_depth[depth],
+                sum(len(d.parts) - base_depth == depth for d in dirs),
+            )
+        self.assertEqual(
+            sum(n * c for n, c in stats.file_fanout.items()), len(files)
+        )
+        self.assertIn("directories", stats.format())
+
+    def test_payload_size(self) -> None:
+        def callback(
+            target_dir: pathlib.Path,
+        ) -> Generator[pathlib.Path, None, None]:
+            i = 0
+            while True:
+                i += 1
+                path = target_dir / f"{i}.txt"
+                path.write_text("1234")
+                yield path
+
+        stats = TreeStats()
+        iterative_gaussian_tree(
+            self.basedir.name, 3, 2, 3, payload=callback, stats=stats
+        )
+        self.assertEqual(stats.total_bytes, 4 * stats.n_files)
+        # Files that are overwritten in later passes are counted once
+        _, files = _scan_tree(self.basedir.name)
+        self.assertEqual(stats.n_files, len(files))
+
+    def test_merge_serialize(self) -> None:
+        stats = TreeStats()
+        iterative_gaussian_tree(self.basedir.name, 3, 2, 3, stats=stats)
+        copy = TreeStats.from_dict(stats.to_dict())
+        self.assertEqual(copy.to_dict(), stats.to_dict())
+        copy.merge(stats)
+        self.assertEqual(copy.n_files, 2 * stats.n_files)
+        self.assertEqual(copy.dir_fanout[0], 2 * stats.dir_fanout[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import random
+from typing import List
+
+# ours
+from randomfiletree.core import _scan_tree
+from randomfiletree.distributions import BatchSampler
+from randomfiletree.manifest import Manifest
+from randomfiletree.stats import TreeStats
+from randomfiletree.striped import striped_tree
+
+
+class TestStripedTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.roots = [
+            os.path.join(self.tmpdir.name, name) for name in ["a", "b", "c"]
+        ]
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_striped(self) -> None:
+        manifest = Manifest(self.tmpdir.name)
+        stats = TreeStats()
+        dirs, files = striped_tree(
+            self.roots,
+            nfolders_func=BatchSampler("constant", value=3),
+            nfiles_func=BatchSampler("constant", value=2),
+            repeat=3,
+            workers_per_root=2,
+            manifest=manifest,
+            stats=stats,
+        )
+        # Same shape as a tree generated by iterative_tree
+        self.assertEqual(stats.dirs_per_depth, [0, 9, 27, 27])
+        self.assertEqual(stats.files_per_depth, [0, 6, 18, 18])
+        self.assertEqual(dict(stats.dir_fanout), {3: 21})
+        for root in self.roots:
+            self.assertEqual(
+                len(
+                    [
+                        e
+                        for e in os.listdir(root)
+                        if os.path.isdir(os.path.join(root, e))
+                    ]
+                ),
+                3,
+            )
+        all_dirs, all_files = [], []
+        for root in self.roots:
+            d, f = _scan_tree(root)
+            all_dirs.extend(d)
+            all_files.extend(f)
+        self.assertEqual(sorted(dirs), sorted(all_dirs))
+        self.assertEqual(sorted(files), sorted(all_files))
+        self.assertEqual(sorted(manifest.files), sorted(all_files))
+
+    def test_maxdepth(self) -> None:
+        dirs, files = striped_tree(
+            self.roots,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 0,
+            repeat=4,
+            maxdepth=1,
+        )
+        self.assertEqual(len(dirs), 8)
+
+    def test_maxdepth_zero(self) -> None:
+        # No limit, like for iterative_tree
+        dirs, _ = striped_tree(
+            self.roots,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 0,
+            repeat=3,
+            maxdepth=0,
+        )
+        self.assertEqual(len(dirs), 2 + (2 + 4) + (2 + 4 + 12))
+
+    def test_payload_stats(self) -> None:
+        def payload(directory):
+            i = 0
+            while True:
+                # Names repeat, so that only three files are created
+                path = directory / f"{i % 3}.txt"
+                path.write_text("data")
+                i += 1
+                yield path
+
+        stats = TreeStats()
+        striped_tree(
+            self.roots[:1],
+            nfolders_func=lambda depth: 0,
+            nfiles_func=lambda depth: 5,
+            payload=payload,
+            stats=stats,
+        )
+        self.assertEqual(stats.files_per_depth, [0, 3])
+        self.assertEqual(stats.bytes_per_depth, [0, 12])
+
+    def tree(self, name: str, seed: int) -> List[str]:
+        """Relative paths of a striped tree created from ``seed``."""
+        base = os.path.join(self.tmpdir.name, name)
+        roots = [os.path.join(base, str(i)) for i in range(2)]
+        random.seed(seed)
+        dirs, files = striped_tree(
+            roots,
+            nfolders_func=BatchSampler("gauss", mean=3, sigma=2),
+            nfiles_func=BatchSampler("gauss", mean=3, sigma=2),
+            repeat=4,
+            workers_per_root=4,
+        )
+        return sorted(os.path.relpath(str(p), base) for p in dirs + files)
+
+    def test_reproducible(self) -> None:
+        tree = self.tree("first", 5)
+        self.assertGreater(len(tree), 50)
+        self.assertEqual(self.tree("second", 5), tree)
+        self.assertNotEqual(self.tree("third", 6), tree)
+
+
+if __name__ == "__main__":
+    unittest.main()
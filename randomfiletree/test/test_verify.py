@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+import shutil
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+# ours
+from randomfiletree.core import iterative_tree
+from randomfiletree.links import Links
+from randomfiletree.manifest import Manifest
+from randomfiletree.verify import Mismatch, verify
+
+
+class TestVerify(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, "source")
+        self.copy = os.path.join(self.tmpdir.name, "copy")
+
+        def payload(directory):
+            for i in range(100):
+                path = directory / f"{i}.bin"
+                path.write_bytes(os.urandom(i * 100))
+                yield path
+
+        self.manifest = Manifest(self.source, checksum="blake2b")
+        iterative_tree(
+            self.source,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 5,
+            repeat=3,
+            payload=payload,
+            manifest=self.manifest,
+        )
+        path = os.path.join(self.tmpdir.name, "manifest.jsonl")
+        self.manifest.save(path)
+        self.manifest = Manifest.load(path)
+        shutil.copytree(self.source, self.copy)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_intact(self) -> None:
+        report = verify(self.copy, self.manifest, workers=3)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.n_entries, len(self.manifest))
+        self.assertGreater(report.bytes_read, 0)
+        self.assertIn("0 mismatches", report.format())
+
+    def test_mismatches(self) -> None:
+        files = sorted(
+            (f for f in self.manifest.files if f.stat().st_size),
+            key=str,
+        )
+        dirs = self.manifest.dirs
+        os.unlink(str(files[0]).replace(self.source, self.copy))
+        with open(str(files[1]).replace(self.source, self.copy), "ab") as f:
+            f.write(b"x")
+        with open(str(files[2]).replace(self.source, self.copy), "r+b") as fh:
+            first = fh.read(1)
+            fh.seek(0)
+            fh.write(bytes([first[0] ^ 1]))
+        leaf = max(dirs, key=lambda d: len(d.parts))
+        leaf_copy = str(leaf).replace(self.source, self.copy)
+        shutil.rmtree(leaf_copy)
+        with open(leaf_copy, "w"):
+            pass
+        found: List[Mismatch] = []
+        report = verify(self.copy, self.manifest, on_mismatch=found.append)
+        self.assertFalse(report.ok)
+        self.assertEqual(found, report.mismatches)
+        problems = sorted(m.problem for m in found)
+        self.assertEqual(problems[:4], ["checksum", "missing", "size", "type"])
+        report = verify(self.copy, self.manifest, checksums=False)
+        self.assertNotIn("checksum", [m.problem for m in report.mismatches])
+        self.assertEqual(report.bytes_read, 0)
+
+    def test_directory_replaced(self) -> None:
+        # Entries below a directory that was replaced by a file are missing
+        def below(directory: str) -> List[str]:
+            prefix = os.path.relpath(directory, self.source) + os.sep
+            return [p for p in self.manifest.entries if p.startswith(prefix)]
+
+        top = max(
+            (
+                str(d)
+                for d in self.manifest.dirs
+                if d.parent == Path(self.source)
+            ),
+            key=lambda d: len(below(d)),
+        )
+        top_copy = top.replace(self.source, self.copy)
+        shutil.rmtree(top_copy)
+        with open(top_copy, "w"):
+            pass
+        self.assertGreater(len(below(top)), 5)
+        problems = sorted(
+            m.problem for m in verify(self.copy, self.manifest).mismatches
+        )
+        self.assertEqual(problems, ["missing"] * len(below(top)) + ["type"])
+
+    def test_errors(self) -> None:
+        def unreadable(path, algorithm):
+            raise PermissionError(13, "Permission denied", str(path))
+
+        with mock.patch("randomfiletree.verify.file_checksum", unreadable):
+            report = verify(self.copy, self.manifest, workers=2)
+        self.assertEqual(
+            len(report.mismatches), len(self.manifest.paths("file"))
+        )
+        self.assertEqual({m.problem for m in report.mismatches}, {"error"})
+        self.assertIn("Permission denied", str(report.mismatches[0]))
+
+    def test_links(self) -> None:
+        source = os.path.join(self.tmpdir.name, "links")
+        manifest = Manifest(source, checksum="crc32")
+        iterative_tree(
+            source,
+            nfolders_func=lambda depth: 2,
+            nfiles_func=lambda depth: 10,
+            repeat=2,
+            manifest=manifest,
+            links=Links(hardlinks=0.3, symlinks=0.3, dangling=0.2),
+        )
+        self.assertTrue(verify(source, manifest).ok)
+        symlinks = sorted(manifest.paths("symlink"), key=str)
+        hardlinks = manifest.paths("hardlink")
+        os.unlink(str(symlinks[0]))
+        os.symlink("elsewhere", str(symlinks[0]))
+        os.unlink(str(symlinks[1]))
+        with open(str(symlinks[1]), "w"):
+            pass
+        os.unlink(str(hardlinks[0]))
+        # A copy with the same content is not a hardlink
+        content = hardlinks[1].read_bytes()
+        os.unlink(str(hardlinks[1]))
+        hardlinks[1].write_bytes(content)
+        problems = sorted(
+            m.problem for m in verify(source, manifest).mismatches
+        )
+        self.assertEqual(problems, ["missing", "target", "target", "type"])
+
+
+if __name__ == "__main__":
+    unittest.main()
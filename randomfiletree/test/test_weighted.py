@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+# std
+import unittest
+import tempfile
+import os
+from collections import Counter
+from typing import List
+
+# ours
+from randomfiletree.core import iterative_gaussian_tree
+from randomfiletree.weighted import (
+    AliasTable,
+    Weight,
+    WeightedSelector,
+    choose_weighted_elements,
+    sample_weighted_elements,
+)
+
+
+class TestAliasTable(unittest.TestCase):
+    def test_distribution(self) -> None:
+        table = AliasTable([1, 0, 3])
+        counts = Counter(table.choose(20000))
+        self.assertNotIn(1, counts)
+        self.assertAlmostEqual(counts[2] / counts[0], 3, delta=0.3)
+
+    def test_sample(self) -> None:
+        table = AliasTable([1000, 1, 1, 0])
+        self.assertEqual(sorted(table.sample(3)), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            table.sample(4)
+
+    def test_sample_skewed(self) -> None:
+        # Too many duplicates to reject them, so the keys are used
+        table = AliasTable([1 / r**2 for r in range(1, 2001)])
+        counts: Counter = Counter()
+        for _ in range(100):
+            sample = table.sample(100)
+            self.assertEqual(len(set(sample)), 100)
+            counts.update(sample)
+        self.assertEqual([counts[i] for i in range(10)], [100] * 10)
+        self.assertLess(sum(counts[i] for i in range(1900, 2000)), 20)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+        with self.assertRaises(ValueError):
+            AliasTable([1, -1])
+
+
+class TestWeightedSelection(unittest.TestCase):
+    def setUp(self) -> None:
+        self.basedir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.basedir.cleanup()
+
+    def test_size(self) -> None:
+        iterative_gaussian_tree(self.basedir.name, 5, 3, 2)
+        big = os.path.join(self.basedir.name, "big")
+        with open(big, "w") as f:
+            f.write("x" * 100)
+        _, files = choose_weighted_elements(self.basedir.name, 0, 10)
+        self.assertEqual(set(map(str, files)), {big})
+        _, files = sample_weighted_elements(
+            self.basedir.name, 0, 2, onfail="ignore"
+        )
+        self.assertEqual(list(map(str, files)), [big])
+        with self.assertRaises(ValueError):
+            sample_weighted_elements(self.basedir.name, 0, 2)
+
+    def test_depth_zipf(self) -> None:
+        iterative_gaussian_tree(self.basedir.name, 5, 3, 3)
+        weights: List[Weight] = ["depth", "zipf", lambda p: 1.0]
+        for weight in weights:
+            selector = WeightedSelector(self.basedir.name, weight=weight)
+            dirs, files = selector.sample(3, 3)
+            self.assertEqual(len(set(dirs)), 3)
+            self.assertEqual(len(set(files)), 3)
+            dirs, files = selector.choose(5, 5)
+            self.assertEqual(len(dirs), 5)
+        with self.assertRaises(ValueError):
+            WeightedSelector(self.basedir.name, weight="unknown")
+
+    def test_empty(self) -> None:
+        with self.assertRaises(ValueError):
+            choose_weighted_elements(self.basedir.name, 1, 1, weight="zipf")
+        dirs, files = choose_weighted_elements(
+            self.basedir.name, 1, 1, onfail="ignore"
+        )
+        self.assertEqual(len(dirs) + len(files), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
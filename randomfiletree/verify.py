@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import stat
+import time
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.manifest import Manifest, file_checksum
+
+# Number of entries checked by a worker at once
+_BATCH_SIZE = 256
+
+
+class Mismatch(NamedTuple):
+    """Difference between an entry of the manifest and the tree."""
+
+    #: Path of the entry
+    path: Path
+    #: ``missing``, ``type``, ``size``, ``checksum``, ``target`` (of a
+    #: symbolic link or hardlink) or ``error`` (the entry could not be
+    #: checked)
+    problem: str
+    #: Value recorded in the manifest
+    expected: Any = None
+    #: Value found in the tree (the error message for ``error``)
+    actual: Any = None
+
+    def __str__(self) -> str:
+        if self.problem == "missing":
+            return f"{self.path}: missing"
+        if self.problem == "error":
+            return f"{self.path}: error: {self.actual}"
+        return (
+            f"{self.path}: {self.problem} is {self.actual}, expected "
+            f"{self.expected}"
+        )
+
+
+class VerifyReport:
+    """
+    Result of :func:`verify`.
+
+    Attributes:
+        mismatches: All differences that were found
+        n_entries: Number of entries that were checked
+        bytes_read: Number of bytes that were read to compute checksums
+        elapsed: Total run time in seconds
+    """
+
+    def __init__(self) -> None:
+        self.mismatches: List[Mismatch] = []
+        self.n_entries = 0
+        self.bytes_read = 0
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if the tree matches the manifest."""
+        return not self.mismatches
+
+    @property
+    def entries_per_second(self) -> float:
+        """Number of checked entries per second."""
+        return self.n_entries / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Checksum throughput in MB/s (10^6 bytes per second)."""
+        return self.bytes_read / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        """Summary as human readable text."""
+        return (
+            f"Checked {self.n_entries} entries ({self.bytes_read} bytes) in "
+            f"{self.elapsed:.3f} s: {self.entries_per_second:.0f} entries/s, "
+            f"{self.mb_per_second:.1f} MB/s, "
+            f"{len(self.mismatches)} mismatches"
+        )
+
+
+def _check(
+    basedir: Path, rel: str, entry: Dict[str, Any], algorithm: Optional[str]
+) -> Tuple[Optional[Mismatch], int]:
+    """Check entry ``rel`` of the tree ``basedir``. Returns the mismatch (if
+    any) and the number of bytes read.
+    """
+    path = basedir / rel
+    try:
+        st = os.lstat(str(path))
+    except (FileNotFoundError, NotADirectoryError):
+        # A parent directory may have been replaced by a file
+        return Mismatch(path, "missing"), 0
+    kind = entry["type"]
+    if kind == "dir" and not stat.S_ISDIR(st.st_mode):
+        return Mismatch(path, "type", "dir", _kind(st.st_mode)), 0
+    if kind == "symlink":
+        if not stat.S_ISLNK(st.st_mode):
+            return Mismatch(path, "type", "link", _kind(st.st_mode)), 0
+        target = os.readlink(str(path))
+        if "target" in entry and target != entry["target"]:
+            return Mismatch(path, "target", entry["target"], target), 0
+        return None, 0
+    if kind not in ("file", "hardlink"):
+        return None, 0
+    if not stat.S_ISREG(st.st_mode):
+        return Mismatch(path, "type", "file", _kind(st.st_mode)), 0
+    if kind == "hardlink":
+        # Hardlinks share the inode of their target
+        linked = st.st_nlink > 1
+        if linked and "target" in entry:
+            try:
+                linked = os.path.samestat(
+                    st, os.stat(str(basedir / entry["target"]))
+                )
+            except FileNotFoundError:
+                linked = False
+        if not linked:
+            return (
+                Mismatch(path, "target", entry.get("target"), "not linked"),
+                0,
+            )
+    if "size" in entry and st.st_size != entry["size"]:
+        return Mismatch(path, "size", entry["size"], st.st_size), 0
+    if algorithm is None or "checksum" not in entry:
+        return None, 0
+    checksum = file_checksum(path, algorithm)
+    if checksum != entry["checksum"]:
+        return (
+            Mismatch(path, "checksum", entry["checksum"], checksum),
+            st.st_size,
+        )
+    return None, st.st_size
+
+
+def _kind(mode: int) -> str:
+    if stat.S_ISDIR(mode):
+        return "dir"
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISLNK(mode):
+        return "link"
+    return "other"
+
+
+def _check_batch(
+    basedir: Path,
+    entries: List[Tuple[str, Dict[str, Any]]],
+    algorithm: Optional[str],
+) -> Tuple[List[Mismatch], int]:
+    mismatches = []
+    n_bytes = 0
+    for rel, entry in entries:
+        try:
+            mismatch, n = _check(basedir, rel, entry, algorithm)
+        except OSError as e:
+            # E.g. files that are not readable
+            mismatch, n = Mismatch(basedir / rel, "error", actual=str(e)), 0
+        n_bytes += n
+        if mismatch is not None:
+            mismatches.append(mismatch)
+    return mismatches, n_bytes
+
+
+def verify(
+    basedir: Union[str, PurePath],
+    manifest: Manifest,
+    workers: Optional[int] = None,
+    checksums: bool = True,
+    on_mismatch: Optional[Callable[[Mismatch], None]] = None,
+) -> VerifyReport:
+    """
+    Check that a tree (e.g. a copy of a generated tree) matches its manifest:
+    All entries exist and have the recorded type, symbolic links have the
+    recorded target (dangling ones included), and files have the recorded
+    size and checksum (if the manifest was created with
+    ``checksum``, see :class:`~randomfiletree.manifest.Manifest`). Entries
+    are checked in parallel; entries that are not in the manifest are
+    ignored.
+
+    Args:
+        basedir: Base directory of the tree to check (overrides the base
+            directory of the manifest)
+        manifest: :class:`~randomfiletree.manifest.Manifest` of the tree
+        workers: Number of parallel workers
+        checksums: Compare checksums (else only existence, types and sizes)
+        on_mismatch: Function that is called with every
+            :class:`Mismatch` as soon as it is found
+
+    Returns:
+        :class:`VerifyReport`
+    """
+    basedir = Path(basedir)
+    algorithm = manifest.checksum if checksums else None
+    entries = list(manifest.entries.items())
+    report = VerifyReport()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = [
+            executor.submit(
+                _check_batch,
+                basedir,
+                entries[i : i + _BATCH_SIZE],
+                algorithm,
+            )
+            for i in range(0, len(entries), _BATCH_SIZE)
+        ]
+        for job in as_completed(jobs):
+            mismatches, n_bytes = job.result()
+            report.bytes_read += n_bytes
+            for mismatch in mismatches:
+                report.mismatches.append(mismatch)
+                if on_mismatch is not None:
+                    on_mismatch(mismatch)
+    report.n_entries = len(entries)
+    report.elapsed = time.perf_counter() - start
+    return report
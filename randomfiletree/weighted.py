@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+import heapq
+import math
+import os
+import random
+from pathlib import Path, PurePath
+
+# ours
+from randomfiletree.core import _scan_tree
+
+#: Type of the ``weight`` arguments
+Weight = Union[str, Callable[[Path], float]]
+
+
+class AliasTable:
+    """
+    Alias table (Vose's method) to draw indices ``0, ..., n - 1`` with
+    probabilities proportional to the given weights in O(1) per draw after
+    O(n) setup.
+
+    Args:
+        weights: Non-negative weights, at least one of them positive
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Need at least one positive weight.")
+        if min(weights) < 0:
+            raise ValueError("Weights must not be negative.")
+        self.weights = weights
+        self.n_positive = sum(1 for w in weights if w > 0)
+        self.prob = [w * n / total for w in weights]
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(self.prob) if p < 1]
+        large = [i for i, p in enumerate(self.prob) if p >= 1]
+        while small and large:
+            s = small.pop()
+            g = large[-1]
+            self.alias[s] = g
+            self.prob[g] -= 1 - self.prob[s]
+            if self.prob[g] < 1:
+                small.append(large.pop())
+        # Leftovers are only due to rounding errors
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self) -> int:
+        """Draw one index."""
+        i = int(random.random() * len(self.prob))
+        return i if random.random() < self.prob[i] else self.alias[i]
+
+    def choose(self, k: int, rng: Optional[random.Random] = None) -> List[int]:
+        """Draw ``k`` indices with replacement (using the random generator
+        ``rng`` instead of the global one, if given).
+        """
+        prob = self.prob
+        alias = self.alias
+        n = len(prob)
+        rnd = random.random if rng is None else rng.random
+        result = []
+        for _ in range(k):
+            i = int(rnd() * n)
+            result.append(i if rnd() < prob[i] else alias[i])
+        return result
+
+    def sample(self, k: int) -> List[int]:
+        """
+        Draw ``k`` distinct indices (successive draws without replacement).
+
+        Duplicates are rejected as long as this is cheap, otherwise the
+        sample is drawn in O(n log k) by assigning random keys
+        (Efraimidis-Spirakis).
+        """
+        if k > self.n_positive:
+            raise ValueError(
+                f"Cannot draw {k} distinct elements out of "
+                f"{self.n_positive} with positive weight."
+            )
+        seen = set()
+        result: List[int] = []
+        for _ in range(4 * k + 16):
+            if len(result) == k:
+                return result
+            i = self.draw()
+            if i not in seen:
+                seen.add(i)
+                result.append(i)
+        if len(result) == k:
+            return result
+        # Logarithms of the keys u ** (1 / w), which underflow for small
+        # weights
+        keys = (
+            (math.log(1.0 - random.random()) / w, i)
+            for i, w in enumerate(self.weights)
+            if w > 0
+        )
+        return [i for _, i in heapq.nlargest(k, keys)]
+
+
+def _weights(
+    basedir: str, paths: List[Path], weight: Weight, exponent: float
+) -> List[float]:
+    if callable(weight):
+        return [float(weight(p)) for p in paths]
+    if weight == "size":
+        return [float(os.lstat(str(p)).st_size) for p in paths]
+    if weight == "depth":
+        base_depth = len(Path(basedir).parts)
+        return [float(len(p.parts) - base_depth) ** exponent for p in paths]
+    if weight == "zipf":
+        ranks = list(range(1, len(paths) + 1))
+        random.shuffle(ranks)
+        return [1 / rank**exponent for rank in ranks]
+    raise ValueError("Unknown value for 'weight' parameter.")
+
+
+class WeightedSelector:
+    """
+    Select random files and directories of a tree with non-uniform
+    probabilities. The tree is scanned and the alias tables are built once
+    when creating the selector, so that it can be used for many draws.
+
+    Args:
+        basedir: Directory to scan
+        weight: Weight of each element. Either a function that takes the
+            path and returns the weight or one of ``"size"`` (file size in
+            bytes), ``"depth"`` (``depth ** exponent``, where the direct
+            children of ``basedir`` have depth 1) or ``"zipf"`` (popularity
+            following Zipf's law with the given exponent, i.e. the element
+            with rank ``r`` in a random ranking has weight
+            ``1 / r ** exponent``).
+        dir_weight: Weight of each directory. Default: Same as ``weight``.
+        exponent: Exponent for the ``"depth"`` and ``"zipf"`` weights
+    """
+
+    def __init__(
+        self,
+        basedir: Union[str, PurePath],
+        weight: Weight = "size",
+        dir_weight: Union[Weight, None] = None,
+        exponent: float = 1.0,
+    ):
+        self.basedir = str(basedir)
+        self.dirs, self.files = _scan_tree(self.basedir)
+        self.dir_table = self._table(self.dirs, dir_weight or weight, exponent)
+        self.file_table = self._table(self.files, weight, exponent)
+
+    def _table(
+        self, paths: List[Path], weight: Weight, exponent: float
+    ) -> Union[AliasTable, None]:
+        weights = _weights(self.basedir, paths, weight, exponent)
+        if sum(weights) <= 0:
+            return None
+        return AliasTable(weights)
+
+    def _check(
+        self, table: Union[AliasTable, None], n: int, what: str, onfail: str
+    ) -> int:
+        """Number of elements that can be drawn."""
+        if onfail not in ("raise", "ignore"):
+            raise ValueError("Unknown value for 'onfail' parameter.")
+        available = 0 if table is None else table.n_positive
+        if n and not available and onfail == "raise":
+            raise ValueError(
+                f"{self.basedir} does not have any {what} with positive "
+                "weight, so cannot select any."
+            )
+        return available
+
+    def choose(
+        self, n_dirs: int, n_files: int, onfail: str = "raise"
+    ) -> Tuple[List[Path], List[Path]]:
+        """
+        Select random files and directories (with replacement).
+
+        Args:
+            n_dirs: Number of directories to pick
+            n_files: Number of files to pick
+            onfail: What to do if there are no files or folders (with
+                positive weight) to pick from? Either 'raise' (raise
+                ValueError) or 'ignore' (return empty list)
+        Returns:
+            (List of dirs, List of files), all as pathlib.Path objects.
+        """
+        result: Tuple[List[Path], List[Path]] = ([], [])
+        for selected, paths, table, n, what in (
+            (result[0], self.dirs, self.dir_table, n_dirs, "subfolders"),
+            (result[1], self.files, self.file_table, n_files, "files"),
+        ):
+            if self._check(table, n, what, onfail) and table is not None:
+                selected.extend(paths[i] for i in table.choose(n))
+        return result
+
+    def sample(
+        self, n_dirs: int, n_files: int, onfail: str = "raise"
+    ) -> Tuple[List[Path], List[Path]]:
+        """
+        Select random distinct files and directories.
+
+        Args:
+            n_dirs: Number of directories to pick
+            n_files: Number of files to pick
+            onfail: What to do if there are not enough files or folders (with
+                positive weight) to pick from? Either 'raise' (raise
+                ValueError) or 'ignore' (return list with fewer elements)
+        Returns:
+            (List of dirs, List of files), all as pathlib.Path objects.
+        """
+        result: Tuple[List[Path], List[Path]] = ([], [])
+        for selected, paths, table, n, what in (
+            (result[0], self.dirs, self.dir_table, n_dirs, "subfolders"),
+            (result[1], self.files, self.file_table, n_files, "files"),
+        ):
+            available = self._check(table, n, what, onfail)
+            if n > available and onfail == "raise":
+                raise ValueError(
+                    f"{self.basedir} does not have enough {what} with "
+                    "positive weight, so cannot select enough."
+                )
+            if available and table is not None:
+                selected.extend(
+                    paths[i] for i in table.sample(min(n, available))
+                )
+        return result
+
+
+def choose_weighted_elements(
+    basedir: Union[str, PurePath],
+    n_dirs: int,
+    n_files: int,
+    weight: Weight = "size",
+    onfail: str = "raise",
+    exponent: float = 1.0,
+) -> Tuple[List[Path], List[Path]]:
+    """
+    Like :func:`randomfiletree.core.choose_random_elements`, but elements
+    are picked with probabilities proportional to their weight. To draw
+    repeatedly from the same tree, create a :class:`WeightedSelector`
+    once instead.
+
+    Args:
+        basedir: Directory to scan
+        n_dirs: Number of directories to pick
+        n_files: Number of files to pick
+        weight: See :class:`WeightedSelector`
+        onfail: What to do if there are no files or folders to pick from?
+            Either 'raise' (raise ValueError) or 'ignore' (return empty list)
+        exponent: See :class:`WeightedSelector`
+    Returns:
+        (List of dirs, List of files), all as pathlib.Path objects.
+    """
+    selector = WeightedSelector(basedir, weight=weight, exponent=exponent)
+    return selector.choose(n_dirs, n_files, onfail=onfail)
+
+
+def sample_weighted_elements(
+    basedir: Union[str, PurePath],
+    n_dirs: int,
+    n_files: int,
+    weight: Weight = "size",
+    onfail: str = "raise",
+    exponent: float = 1.0,
+) -> Tuple[List[Path], List[Path]]:
+    """
+    Like :func:`randomfiletree.core.sample_random_elements`, but elements
+    are picked with probabilities proportional to their weight. To draw
+    repeatedly from the same tree, create a :class:`WeightedSelector`
+    once instead.
+
+    Args:
+        basedir: Directory to scan
+        n_dirs: Number of directories to pick
+        n_files: Number of files to pick
+        weight: See :class:`WeightedSelector`
+        onfail: What to do if there are not enough files or folders to pick
+            from? Either 'raise' (raise ValueError) or 'ignore' (return list
+            with fewer elements)
+        exponent: See :class:`WeightedSelector`
+    Returns:
+        (List of dirs, List of files), all as pathlib.Path objects.
+    """
+    selector = WeightedSelector(basedir, weight=weight, exponent=exponent)
+    return selector.sample(n_dirs, n_files, onfail=onfail)
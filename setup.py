@@ -35,6 +35,7 @@ setuptools.setup(
         "randomfiletree": ["version.txt"],
     },
     install_requires=[],
+    extras_require={"numpy": ["numpy"]},
     license="MIT",
     entry_points={"console_scripts": ["randomfiletree=randomfiletree.cli:cli"]},
     keywords=keywords,